@@ -0,0 +1,50 @@
+import time
+import collections
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_FLUSH_INTERVAL_MS = 16
+
+
+# Junta os pacotes do lado do core: push() roda na thread do proxy/pipeline,
+# grava no PacketStore e enfileira so o numero da linha. O GUI chama drain()
+# num timer e recebe um lote inteiro por tick, em vez de um evento Qt por pacote.
+# Com um SpamFilter, linhas de IDs suprimidos nem entram na fila do GUI.
+class PacketBatcher:
+    def __init__(self, store, batch_size=DEFAULT_BATCH_SIZE, spam_filter=None):
+        self.store = store
+        self.batch_size = max(1, int(batch_size))
+        self.spam_filter = spam_filter
+        self.pushed = 0
+        self.suppressed = 0
+        self._pending = collections.deque()
+
+    def depth(self):
+        return len(self._pending)
+
+    def push(self, packet):
+        row = self.store.append_packet(packet)
+        spam_filter = self.spam_filter
+        if spam_filter is not None:
+            captured = packet.captured if packet.captured is not None else time.monotonic()
+            if not spam_filter.offer(packet.id, captured, row):
+                self.suppressed += 1
+                return row
+        self._pending.append(row)
+        self.pushed += 1
+        return row
+
+    def push_row(self, row):
+        self._pending.append(row)
+        self.pushed += 1
+
+    def clear(self):
+        self._pending.clear()
+
+    def drain(self, limit=None):
+        if limit is None:
+            limit = self.batch_size
+        pending = self._pending
+        rows = []
+        while pending and len(rows) < limit:
+            rows.append(pending.popleft())
+        return rows
@@ -0,0 +1,231 @@
+import os
+import mmap
+import bisect
+import time
+import struct
+import datetime
+import itertools
+from array import array
+from NetGarden.CORE.Packet import Packet
+from NetGarden.CORE.PacketStore import DIRECTIONS, DIRECTION_CODES, NO_SESSION, _SELECT_TABLES
+
+# Formato de captura (append-only, 3 arquivos):
+#   <nome>.ngcap      MAGIC + frames crus (length-prefix + BSON), em ordem de chegada
+#   <nome>.ngcap.idx  IDX_MAGIC + um registro de 40 bytes por pacote
+#   <nome>.ngcap.ids  IDS_MAGIC + IDs internados (uint16 tamanho + utf-8), na ordem do codigo
+#
+# Registro do indice: seq, offset no .ngcap, tamanho, hora (epoch, double),
+# codigo do ID (uint32) e direcao | (sessao + 1) << 8 (uint32). Tudo alinhado
+# em 4/8 bytes, entao as colunas saem do mmap com memoryview.cast + slice.
+MAGIC = b"NGCAP\x00\x01\x00"
+IDX_MAGIC = b"NGIDX\x00\x01\x00"
+IDS_MAGIC = b"NGIDS\x00\x01\x00"
+HEADER_SIZE = 8
+
+RECORD = struct.Struct("<qqqdII")
+RECORD_SIZE = RECORD.size
+_WORDS32 = RECORD_SIZE // 4
+_WORDS64 = RECORD_SIZE // 8
+
+CAPTURE_EXT = ".ngcap"
+FLUSH_INTERVAL = 1.0
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+def ids_path(path):
+    return path + ".ids"
+
+
+class CaptureWriter:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._data = open(path, "wb")
+        self._index = open(index_path(path), "wb")
+        self._ids = open(ids_path(path), "wb")
+        self._data.write(MAGIC)
+        self._index.write(IDX_MAGIC)
+        self._ids.write(IDS_MAGIC)
+        self._offset = HEADER_SIZE
+        self._id_codes = {}
+        self._last_flush = time.monotonic()
+
+    def append(self, direction, frame, packet_id="?", wall_time=None, session=None, seq=None):
+        code = self._id_codes.get(packet_id)
+        if code is None:
+            code = len(self._id_codes)
+            self._id_codes[packet_id] = code
+            raw_id = packet_id.encode("utf-8")[:0xFFFF]
+            self._ids.write(len(raw_id).to_bytes(2, "little") + raw_id)
+
+        offset = self._offset
+        length = len(frame)
+        self._data.write(frame)
+        self._offset += length
+
+        dir_session = DIRECTION_CODES.get(direction, 1) | ((NO_SESSION if session is None else session) + 1) << 8
+        self._index.write(RECORD.pack(
+            self.count if seq is None else seq,
+            offset,
+            length,
+            time.time() if wall_time is None else wall_time,
+            code,
+            dir_session
+        ))
+        self.count += 1
+
+        now = time.monotonic()
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+            self._last_flush = now
+        return offset
+
+    def flush(self):
+        # dados antes do indice: um registro nunca aponta pra bytes que ainda nao estao no disco
+        self._data.flush()
+        self._ids.flush()
+        self._index.flush()
+
+    def close(self):
+        for f in (self._data, self._ids, self._index):
+            try:
+                f.flush()
+                f.close()
+            except:
+                pass
+
+
+def _map(path, magic):
+    with open(path, "rb") as f:
+        if f.read(HEADER_SIZE) != magic:
+            raise ValueError(f"Not a NetGarden capture file: {path}")
+        if os.fstat(f.fileno()).st_size <= HEADER_SIZE:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+# Leitura offline de uma captura: os tres arquivos sao mapeados em memoria e
+# nada e decodificado na abertura. Expoe a mesma API de leitura do PacketStore
+# (id_of, direction_of, frame, packet...), entao o GUI usa um ou outro igual.
+class CaptureReader:
+    def __init__(self, path):
+        self.path = path
+        self._data = _map(path, MAGIC)
+        self._index = _map(index_path(path), IDX_MAGIC)
+
+        self.ids = []
+        ids_map = _map(ids_path(path), IDS_MAGIC)
+        if ids_map is not None:
+            pos = HEADER_SIZE
+            end = len(ids_map)
+            while pos + 2 <= end:
+                n = int.from_bytes(ids_map[pos:pos + 2], "little")
+                self.ids.append(ids_map[pos + 2:pos + 2 + n].decode("utf-8", "replace"))
+                pos += 2 + n
+            ids_map.close()
+        self._id_codes = {packet_id: code for code, packet_id in enumerate(self.ids)}
+
+        self._rows_by_id = None
+        self._count = 0
+        self.id_codes = array("I")
+        self.directions = b""
+        if self._index is not None and self._data is not None:
+            # registro incompleto no fim (captura interrompida) e ignorado
+            count = (len(self._index) - HEADER_SIZE) // RECORD_SIZE
+            body = memoryview(self._index)[HEADER_SIZE:HEADER_SIZE + count * RECORD_SIZE]
+            self._q = body.cast("q")
+            self._d = body.cast("d")
+            self._u = body.cast("I")
+            # o indice pode ter ido pro disco antes dos dados/IDs: corta o que nao tem dados
+            while count and (self._q[(count - 1) * _WORDS64 + 1] + self._q[(count - 1) * _WORDS64 + 2] > len(self._data)
+                             or self._u[(count - 1) * _WORDS32 + 8] >= len(self.ids)):
+                count -= 1
+            self._count = count
+            self.id_codes = self._u[8:count * _WORDS32:_WORDS32]
+            self.directions = body.cast("B")[36:count * RECORD_SIZE:RECORD_SIZE]
+
+    def __len__(self):
+        return self._count
+
+    def id_code(self, packet_id):
+        return self._id_codes.get(packet_id)
+
+    def rows_for_direction(self, direction, end=None):
+        count = self._count if end is None else min(end, self._count)
+        # compress roda em C: sem loop Python mesmo com milhoes de linhas
+        selectors = bytes(self.directions[:count]).translate(_SELECT_TABLES[DIRECTION_CODES[direction]])
+        return array("q", itertools.compress(range(count), selectors))
+
+    # indice ID -> linhas montado uma vez, no primeiro filtro
+    def rows_for_id(self, code, direction):
+        if self._rows_by_id is None:
+            rows_by_id = tuple([array("q") for _ in self.ids] for _ in DIRECTIONS)
+            for row, (code_, direction_) in enumerate(zip(self.id_codes, self.directions)):
+                rows_by_id[direction_][code_].append(row)
+            self._rows_by_id = rows_by_id
+        return self._rows_by_id[DIRECTION_CODES[direction]][code]
+
+    def frame(self, row):
+        base = row * _WORDS64
+        offset = self._q[base + 1]
+        return memoryview(self._data)[offset:offset + self._q[base + 2]]
+
+    def id_of(self, row):
+        return self.ids[self._u[row * _WORDS32 + 8]]
+
+    def direction_of(self, row):
+        return DIRECTIONS[self._u[row * _WORDS32 + 9] & 0xFF]
+
+    def session_of(self, row):
+        session = (self._u[row * _WORDS32 + 9] >> 8) - 1
+        return None if session == NO_SESSION else session
+
+    def seq_of(self, row):
+        return self._q[row * _WORDS64]
+
+    # seqs sao gravados em ordem crescente: busca binaria direto no mmap
+    def row_of_seq(self, seq):
+        seqs = self._q[0:self._count * _WORDS64:_WORDS64] if self._count else ()
+        row = bisect.bisect_left(seqs, seq)
+        if row < self._count and seqs[row] == seq:
+            return row
+        return -1
+
+    def wall_time_of(self, row):
+        return self._d[row * _WORDS64 + 3]
+
+    def timestamp_of(self, row):
+        return datetime.datetime.fromtimestamp(self.wall_time_of(row)).strftime("%H:%M:%S")
+
+    def packet(self, row):
+        pkt = Packet(
+            self.direction_of(row),
+            bytes(self.frame(row)),
+            packet_id=self.id_of(row),
+            timestamp=self.timestamp_of(row),
+            session=self.session_of(row),
+            seq=self.seq_of(row)
+        )
+        pkt.row = row
+        return pkt
+
+    def pin(self, row):
+        # tudo ja esta no disco
+        pass
+
+    def close(self):
+        # solta as views antes de fechar os mmaps
+        self.id_codes = array("I")
+        self.directions = b""
+        self._q = self._d = self._u = None
+        self._count = 0
+        for m in (self._data, self._index):
+            try:
+                if m is not None:
+                    m.close()
+            except:
+                pass
+
@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_ENTRIES = 4096
+# so frames pequenos entram: sao os repetidos (p, ST, mP parado) e a chave fica barata
+DEFAULT_CACHE_FRAME_BYTES = 4096
+
+
+def _frozen(*args, **kwargs):
+    raise TypeError("decoded documents are shared between packets and are read-only")
+
+
+# Documento decodificado compartilhado: quem recebe do cache nao pode alterar.
+# Continuam sendo dict/list (json.dumps, isinstance, inspector funcionam igual).
+class FrozenDoc(dict):
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _frozen
+    update = pop = popitem = clear = setdefault = _frozen
+
+    def __reduce__(self):
+        return (FrozenDoc, (dict(self),))
+
+
+class FrozenList(list):
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _frozen
+    append = extend = insert = remove = pop = clear = sort = reverse = _frozen
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDoc((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+# LRU de frame -> documento congelado. A chave e o proprio bytes do frame: o
+# dict usa o hash dele (calculado uma vez, em C) e compara os bytes so quando
+# o hash bate, entao nao ha colisao possivel entre frames diferentes.
+#
+# Frame so entra na segunda vez que aparece (o hash da primeira fica em _seen,
+# que e esvaziado quando enche):
+# trafego unico (chat, movimento) nao paga o freeze nem expulsa os repetidos.
+class DecodeCache:
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES, max_frame_bytes=DEFAULT_CACHE_FRAME_BYTES):
+        self.max_entries = max_entries
+        self.max_frame_bytes = max_frame_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    # decode(frame) so roda em miss; frames grandes passam direto sem contar
+    def get_or_decode(self, frame, decode):
+        if len(frame) > self.max_frame_bytes or not self.max_entries:
+            return decode(frame)
+        key = frame if type(frame) is bytes else bytes(frame)
+        items = self._items
+        with self._lock:
+            doc = items.get(key)
+            if doc is not None:
+                items.move_to_end(key)
+                self.hits += 1
+                return doc
+            self.misses += 1
+            # o hash do bytes fica guardado no objeto: nao recalcula
+            digest = hash(key)
+            seen = self._seen
+            if digest not in seen:
+                if len(seen) >= self.max_entries * 4:
+                    seen.clear()
+                seen.add(digest)
+                admit = False
+            else:
+                seen.discard(digest)
+                admit = True
+
+        if not admit:
+            return decode(key)
+        doc = freeze(decode(key))
+        with self._lock:
+            self._items[key] = doc
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return doc
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._seen.clear()
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,348 @@
+import errno
+import socket
+import selectors
+import threading
+import datetime
+import itertools
+import time
+from NetGarden.CORE.Pipeline import build_packet
+from NetGarden.CORE.Framing import FrameBuffer
+
+RECV_SIZE = 65536
+# acima disso paramos de ler do lado oposto ate o destino drenar
+HIGH_WATER = 8 * 1024 * 1024
+CONNECT_TIMEOUT = 10
+_CONNECT_PENDING = (0, errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK))
+
+
+class _Side:
+    def __init__(self, session, sock, direction):
+        self.session = session
+        self.sock = sock
+        # direcao dos frames lidos deste socket
+        self.direction = direction
+        self.peer = None
+        self.framer = FrameBuffer(on_invalid=self._on_invalid)
+        self.outgoing = bytearray()
+        self.eof = False
+        self.mask = 0
+        self.invalid_lengths = []
+
+    def _on_invalid(self, length):
+        self.invalid_lengths.append(length)
+
+
+class Session:
+    def __init__(self, session_id, addr, client_sock, server_sock):
+        self.id = session_id
+        self.addr = addr
+        self.client = _Side(self, client_sock, "client")
+        self.server = _Side(self, server_sock, "server")
+        self.client.peer = self.server
+        self.server.peer = self.client
+        self.connected = False
+        self.connect_started = time.monotonic()
+        self.closing = False
+        self.closed = False
+
+
+class ProxyEngine:
+    def __init__(self, listen_host, listen_port, server_host, server_port, on_packet, on_log, on_close=None, pipeline=None, metrics=None,
+                 upstream_pool=None):
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self.server_host = server_host
+        self.server_port = server_port
+        self.on_packet = on_packet
+        self.on_log = on_log
+        self.on_close = on_close
+        self.pipeline = pipeline
+        self.metrics = metrics
+        # UpstreamPool opcional: conexoes com o servidor ja abertas antes do accept
+        self.upstream_pool = upstream_pool
+        self.sessions = {}
+        self._ids = itertools.count(1)
+        self._thread = None
+        self._stop_flag = threading.Event()
+        self._selector = None
+
+    def log(self, msg):
+        if self.on_log:
+            self.on_log(msg)
+
+    def start(self):
+        self._stop_flag.clear()
+        if self.pipeline is not None:
+            self.pipeline.start()
+        if self.upstream_pool is not None:
+            self.upstream_pool.start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_flag.set()
+
+    def _now_ts(self):
+        return datetime.datetime.now().strftime("%H:%M:%S")
+
+    def _run(self):
+        listener = None
+        self._selector = selectors.DefaultSelector()
+
+        try:
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((self.listen_host, self.listen_port))
+            listener.listen(socket.SOMAXCONN)
+            listener.setblocking(False)
+            self._selector.register(listener, selectors.EVENT_READ, None)
+
+            self.log(f"[NetGarden] Listening on {self.listen_host}:{self.listen_port}")
+
+            while not self._stop_flag.is_set():
+                for key, events in self._selector.select(timeout=0.1):
+                    if key.data is None:
+                        self._accept(listener)
+                        continue
+                    side = key.data
+                    if side.session.closed:
+                        continue
+                    if events & selectors.EVENT_WRITE:
+                        self._on_writable(side)
+                    if events & selectors.EVENT_READ and not side.session.closed:
+                        self._on_readable(side)
+                self._check_connect_timeouts()
+
+        except Exception as e:
+            self.log(f"[ERROR] Proxy run error: {e}")
+
+        finally:
+            for session in list(self.sessions.values()):
+                self._close_session(session)
+            try:
+                if listener:
+                    listener.close()
+            except:
+                pass
+            try:
+                self._selector.close()
+            except:
+                pass
+
+            if self.upstream_pool is not None:
+                self.upstream_pool.stop()
+            if self.pipeline is not None:
+                self.pipeline.close()
+
+            try:
+                if self.on_close:
+                    self.on_close()
+            except:
+                pass
+
+    def _accept(self, listener):
+        try:
+            client_sock, addr = listener.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+
+        session_id = next(self._ids)
+        client_sock.setblocking(False)
+
+        pooled = self.upstream_pool.take() if self.upstream_pool is not None else None
+        if pooled is not None:
+            server_sock, connect_seconds = pooled
+            server_sock.setblocking(False)
+            session = Session(session_id, addr, client_sock, server_sock)
+            session.connected = True
+            self.sessions[session_id] = session
+            self.log(f"[NetGarden] Client connected: {addr} (session #{session_id})")
+            self.log(f"[NetGarden] Using pre-connected upstream {self.server_host}:{self.server_port}"
+                     f" (session #{session_id}, saved {connect_seconds * 1000:.1f} ms)")
+            self._update_interest(session.client)
+            self._update_interest(session.server)
+            return
+
+        server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_sock.setblocking(False)
+        session = Session(session_id, addr, client_sock, server_sock)
+        self.sessions[session_id] = session
+        self.log(f"[NetGarden] Client connected: {addr} (session #{session_id})")
+
+        err = server_sock.connect_ex((self.server_host, self.server_port))
+        if err not in _CONNECT_PENDING:
+            self.log(f"[ERROR] Connect to server failed (session #{session_id}): {err}")
+            self._close_session(session)
+            return
+
+        self._update_interest(session.client)
+        self._update_interest(session.server)
+
+    def _finish_connect(self, session):
+        err = session.server.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            self.log(f"[ERROR] Connect to server failed (session #{session.id}): {err}")
+            self._close_session(session)
+            return
+        session.connected = True
+        elapsed = time.monotonic() - session.connect_started
+        self.log(f"[NetGarden] Connected to server {self.server_host}:{self.server_port}"
+                 f" (session #{session.id}, {elapsed * 1000:.1f} ms)")
+        self._update_interest(session.client)
+        self._update_interest(session.server)
+
+    def _check_connect_timeouts(self):
+        now = time.monotonic()
+        for session in list(self.sessions.values()):
+            if not session.connected and now - session.connect_started > CONNECT_TIMEOUT:
+                self.log(f"[ERROR] Connect to server timed out (session #{session.id})")
+                self._close_session(session)
+
+    def _update_interest(self, side):
+        session = side.session
+        if session.closed:
+            return
+
+        mask = 0
+        if side is session.server and not session.connected:
+            mask = selectors.EVENT_WRITE
+        else:
+            if not side.eof and not session.closing and len(side.peer.outgoing) < HIGH_WATER:
+                # so le do client depois que o upstream estiver pronto pra receber
+                if side is session.server or session.connected:
+                    mask |= selectors.EVENT_READ
+            if side.outgoing and session.connected:
+                mask |= selectors.EVENT_WRITE
+
+        if mask == side.mask:
+            return
+        if side.mask == 0:
+            self._selector.register(side.sock, mask, side)
+        elif mask == 0:
+            self._selector.unregister(side.sock)
+        else:
+            self._selector.modify(side.sock, mask, side)
+        side.mask = mask
+
+    def _on_writable(self, side):
+        session = side.session
+        if side is session.server and not session.connected:
+            self._finish_connect(session)
+            return
+
+        self._flush(side)
+
+    def _flush(self, side):
+        session = side.session
+        if not side.outgoing or not session.connected or session.closed:
+            return
+
+        try:
+            sent = side.sock.send(side.outgoing)
+        except (BlockingIOError, InterruptedError):
+            return
+        except Exception as e:
+            self.log(f"[ERROR] Pipe error ({side.peer.direction}, session #{session.id}): {e}")
+            self._close_session(session)
+            return
+
+        del side.outgoing[:sent]
+        if session.closing and not side.outgoing:
+            self._close_session(session)
+            return
+        self._update_interest(side)
+        self._update_interest(side.peer)
+
+    def _on_readable(self, side):
+        session = side.session
+        try:
+            n = side.framer.recv_into(side.sock, RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except Exception as e:
+            self.log(f"[ERROR] Pipe error ({side.direction}, session #{session.id}): {e}")
+            self._close_session(session)
+            return
+
+        if not n:
+            self.log(f"[NetGarden] Pipe closed by peer: {side.direction} (session #{session.id})")
+            side.eof = True
+            session.closing = True
+            if not side.peer.outgoing:
+                self._close_session(session)
+            else:
+                self._update_interest(side)
+                self._update_interest(side.peer)
+            return
+
+        self._drain_frames(side)
+        self._update_interest(side)
+        self._update_interest(side.peer)
+
+    def _drain_frames(self, side):
+        direction = side.direction
+        session = side.session
+        metrics = self.metrics
+        ts = self._now_ts()
+
+        for frame in side.framer.frames():
+            if metrics is not None:
+                metrics.on_frame(session.id, direction, len(frame))
+            if self.pipeline is None:
+                scan_start = time.perf_counter()
+                pkt = build_packet(direction, bytes(frame), ts, session=session.id, on_log=self.on_log)
+                if metrics is not None:
+                    metrics.on_scan(session.id, direction, time.perf_counter() - scan_start)
+                try:
+                    self.on_packet(pkt)
+                except Exception as e:
+                    self.log(f"[ERROR] on_packet failed ({direction}, session #{session.id}): {e}")
+                self._forward(side.peer, frame)
+                continue
+
+            # forward-first: manda antes de enfileirar a copia de inspecao
+            self._forward(side.peer, frame)
+            self.pipeline.submit(direction, frame, ts, session=session.id)
+
+        while side.invalid_lengths:
+            length = side.invalid_lengths.pop(0)
+            if metrics is not None:
+                metrics.on_invalid(session.id, direction)
+            self.log(f"[ERROR] Invalid length={length} ({direction}, session #{session.id}), resetting buffer")
+
+    def _forward(self, side, frame):
+        # sem nada pendente tenta mandar direto da view; so o resto vai pro buffer
+        if not side.outgoing and side.session.connected and not side.session.closed:
+            send_start = time.perf_counter()
+            try:
+                sent = side.sock.send(frame)
+            except OSError:
+                # erro de verdade aparece no proximo _flush
+                sent = 0
+            if self.metrics is not None:
+                # direcao do frame e a do lado que leu (o peer de quem manda)
+                self.metrics.on_send(side.session.id, side.peer.direction, time.perf_counter() - send_start)
+            if sent == len(frame):
+                return
+            frame = frame[sent:]
+        side.outgoing.extend(frame)
+
+    def _close_session(self, session):
+        if session.closed:
+            return
+        session.closed = True
+        for side in (session.client, session.server):
+            try:
+                if side.mask:
+                    self._selector.unregister(side.sock)
+            except:
+                pass
+            side.mask = 0
+            try:
+                side.sock.close()
+            except:
+                pass
+        self.sessions.pop(session.id, None)
+        if self.metrics is not None:
+            self.metrics.close_session(session.id)
+        self.log(f"[NetGarden] Session #{session.id} closed ({len(self.sessions)} active)")
@@ -0,0 +1,226 @@
+import sys
+import bisect
+import operator
+import itertools
+import threading
+from array import array
+from NetGarden.CORE.Packet import decode_frame
+from NetGarden.CORE.Query import match_value
+
+DEFAULT_MAX_FRAME_BYTES = 256 * 1024
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_MAX_STRING = 256
+# teto de memoria das postings; passou disso o indice para de crescer
+DEFAULT_MAX_INDEX_BYTES = 64 * 1024 * 1024
+BATCH_ROWS = 256
+IDLE_WAIT = 0.25
+# custo aproximado de um caminho novo e de um valor de string novo (dict + array)
+_PATH_BYTES = 400
+_STRING_BYTES = 160
+# acima disso o double perde precisao e o valor nao bate com o decode direto
+_MAX_EXACT_INT = 1 << 53
+
+_COMPARE = {
+    "=": operator.eq, "!=": operator.ne,
+    ">": operator.gt, ">=": operator.ge,
+    "<": operator.lt, "<=": operator.le,
+}
+
+
+class _Postings:
+    __slots__ = ("values", "rows", "strings")
+
+    def __init__(self):
+        # numeros em colunas paralelas (valor, linha); strings/bools por valor exato
+        self.values = array("d")
+        self.rows = array("q")
+        self.strings = {}
+
+
+# Indice de campos: caminho de chaves (listas nao contam, "W.blocks.t") ->
+# valores escalares -> linhas do store. Uma thread vai decodificando as linhas
+# em ordem, em lotes, conforme o store cresce; [0, indexed) ja esta coberto.
+#
+# Linhas que o indice nao cobre inteiras (frame grande demais, campos demais,
+# string longa) vao pra `partial` e a busca decodifica essas na hora, do mesmo
+# jeito que as linhas alem de `indexed`.
+#
+# O GUI so chama start() quando aparece a primeira busca com campo, e o indice
+# para de crescer em max_bytes (estimado): dali pra frente a busca decodifica.
+class FieldIndex:
+    def __init__(self, store, max_frame_bytes=DEFAULT_MAX_FRAME_BYTES, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_string=DEFAULT_MAX_STRING, max_bytes=DEFAULT_MAX_INDEX_BYTES, on_log=None):
+        self.store = store
+        self.max_frame_bytes = max_frame_bytes
+        self.max_entries = max_entries
+        self.max_string = max_string
+        self.max_bytes = max_bytes
+        self.on_log = on_log
+        # estimativa do tamanho das postings (array + dict de strings)
+        self.bytes = 0
+        self.full = False
+
+        self.indexed = 0
+        self.partial = set()
+        self._paths = {}
+        # a busca segura o lock enquanto le; o indexador so pega entre lotes
+        self.lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def log(self, msg):
+        if self.on_log:
+            self.on_log(msg)
+
+    def start(self):
+        if self._thread is None and not self.full:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="field-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    # acorda o indexador (tem linha nova no store)
+    def notify(self):
+        self._wake.set()
+
+    def lag(self):
+        return max(0, len(self.store) - self.indexed)
+
+    def _run(self):
+        while not self._stop.is_set() and not self.full:
+            start = self.indexed
+            end = min(len(self.store), start + BATCH_ROWS)
+            if start >= end:
+                self._wake.wait(IDLE_WAIT)
+                self._wake.clear()
+                continue
+            try:
+                self.index_rows(start, end)
+            except Exception as e:
+                # store fechado no meio do lote
+                self.log(f"[ERROR] Field index stopped at row {start}: {e}")
+                return
+        if self.full:
+            self.log(f"[NetGarden] Field index reached {self.bytes // (1024 * 1024)} MB at row {self.indexed};"
+                     f" later rows are searched by decoding")
+
+    # decodifica fora do lock e so publica o lote inteiro no fim
+    def index_rows(self, start, end):
+        store = self.store
+        batch = []
+        partial = []
+        for row in range(start, end):
+            frame = store.frame(row)
+            if len(frame) > self.max_frame_bytes:
+                partial.append(row)
+                continue
+            try:
+                doc = decode_frame(frame)
+            except Exception:
+                continue
+            fields = []
+            if not self._collect(doc, (), fields):
+                partial.append(row)
+            batch.append((row, fields))
+
+        with self.lock:
+            paths = self._paths
+            added = 0
+            for row, fields in batch:
+                for path, value in fields:
+                    postings = paths.get(path)
+                    if postings is None:
+                        postings = paths[path] = _Postings()
+                        added += _PATH_BYTES
+                    if isinstance(value, float):
+                        postings.values.append(value)
+                        postings.rows.append(row)
+                        added += 16
+                    else:
+                        rows = postings.strings.get(value)
+                        if rows is None:
+                            postings.strings[value] = array("q", (row,))
+                            added += _STRING_BYTES + (len(value) if isinstance(value, str) else 0)
+                        elif rows[-1] != row:
+                            rows.append(row)
+                            added += 8
+            self.partial.update(partial)
+            self.indexed = end
+            self.bytes += added
+            if self.bytes >= self.max_bytes:
+                self.full = True
+
+    def _collect(self, node, path, out):
+        complete = True
+        for key, value in node.items():
+            if not self._collect_value(value, path + (key,), out):
+                complete = False
+        return complete
+
+    def _collect_value(self, value, path, out):
+        if isinstance(value, dict):
+            return self._collect(value, path, out)
+        if isinstance(value, list):
+            complete = True
+            for item in value:
+                if not self._collect_value(item, path, out):
+                    complete = False
+            return complete
+        if len(out) >= self.max_entries:
+            return False
+        if isinstance(value, bool):
+            out.append((path, value))
+        elif isinstance(value, (int, float)):
+            if isinstance(value, int) and abs(value) > _MAX_EXACT_INT:
+                return False
+            out.append((path, float(value)))
+        elif isinstance(value, str):
+            if len(value) > self.max_string:
+                return False
+            out.append((path, value))
+        # None, bytes, datetime, ObjectId...: nenhum operador casa com eles
+        return True
+
+    # linhas ja indexadas (>= start) com algum valor no caminho do termo que
+    # casa com ele (ignora a negacao do termo; chamar com o lock). As postings
+    # crescem em ordem de linha, entao o start e um bisect em cada array
+    def lookup(self, term, start=0):
+        postings = self._paths.get(term.path)
+        if postings is None:
+            return set()
+        want = term.value
+        first = bisect.bisect_left(postings.rows, start) if start else 0
+        pairs = zip(itertools.islice(postings.values, first, None), itertools.islice(postings.rows, first, None))
+        if isinstance(want, tuple):
+            lo, hi = want
+            hits = {row for value, row in pairs if lo <= value <= hi}
+        elif isinstance(want, float) and term.op in _COMPARE:
+            compare = _COMPARE[term.op]
+            hits = {row for value, row in pairs if compare(value, want)}
+        else:
+            hits = {row for value, row in pairs if match_value(term, value)}
+        for value, rows in postings.strings.items():
+            if rows[-1] >= start and match_value(term, value):
+                hits.update(rows[bisect.bisect_left(rows, start):] if start else rows)
+        return hits
+
+    def paths(self):
+        with self.lock:
+            return sorted(".".join(path) for path in self._paths)
+
+    def nbytes(self):
+        with self.lock:
+            total = sys.getsizeof(self._paths)
+            for postings in self._paths.values():
+                total += postings.values.itemsize * len(postings.values) + postings.rows.itemsize * len(postings.rows)
+                total += sys.getsizeof(postings.strings)
+                for rows in postings.strings.values():
+                    total += sys.getsizeof(rows)
+            return total
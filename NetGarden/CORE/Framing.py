@@ -0,0 +1,98 @@
+MAX_FRAME_LENGTH = 5_000_000
+HEADER_SIZE = 4
+
+
+# Buffer de framing (length-prefix little-endian de 4 bytes, incluindo o header).
+# Os dados entram direto no buffer via recv_into()/feed() e os frames saem como
+# memoryview, sem copia. Cada view so vale ate a proxima chamada de
+# recv_into()/feed(); quem precisar guardar o frame faz bytes(view).
+class FrameBuffer:
+    def __init__(self, initial_size=65536, max_frame=MAX_FRAME_LENGTH, on_invalid=None):
+        self.max_frame = max_frame
+        self.on_invalid = on_invalid
+        self.resets = 0
+        self._initial_size = max(initial_size, HEADER_SIZE)
+        self._buf = bytearray(self._initial_size)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def capacity(self):
+        return len(self._buf)
+
+    def clear(self):
+        self._start = 0
+        self._end = 0
+
+    def recv_into(self, sock, max_bytes=65536):
+        self._reserve(max_bytes)
+        n = sock.recv_into(self._view[self._end:self._end + max_bytes])
+        self._end += n
+        return n
+
+    def feed(self, data):
+        n = len(data)
+        self._reserve(n)
+        self._view[self._end:self._end + n] = data
+        self._end += n
+        return n
+
+    def frames(self):
+        while self._end - self._start >= HEADER_SIZE:
+            start = self._start
+            length = int.from_bytes(self._view[start:start + HEADER_SIZE], "little", signed=False)
+
+            if length < HEADER_SIZE or length > self.max_frame:
+                self.resets += 1
+                self.clear()
+                if self.on_invalid:
+                    self.on_invalid(length)
+                return
+
+            if self._end - start < length:
+                return
+
+            self._start = start + length
+            yield self._view[start:start + length]
+
+        if self._start == self._end:
+            self.clear()
+
+    def _pending_length(self):
+        if self._end - self._start < HEADER_SIZE:
+            return HEADER_SIZE
+        length = int.from_bytes(self._view[self._start:self._start + HEADER_SIZE], "little", signed=False)
+        if length < HEADER_SIZE or length > self.max_frame:
+            return HEADER_SIZE
+        return length
+
+    def _reserve(self, n):
+        if self._start == self._end:
+            self.clear()
+            # devolve a memoria depois de um frame gigante (ex: GWC)
+            if len(self._buf) > 16 * self._initial_size and n <= self._initial_size:
+                self._buf = bytearray(self._initial_size)
+                self._view = memoryview(self._buf)
+        if len(self._buf) - self._end >= n:
+            return
+
+        pending = self._end - self._start
+        # espaco pro frame incompleto inteiro + o proximo recv, assim o frame
+        # grande so e movido/realocado uma vez (nada de del buffer[:n] quadratico)
+        needed = max(pending + n, self._pending_length() + n)
+        if needed <= len(self._buf):
+            self._view[0:pending] = self._view[self._start:self._end]
+        else:
+            size = len(self._buf)
+            while size < needed:
+                size *= 2
+            buf = bytearray(size)
+            buf[0:pending] = self._view[self._start:self._end]
+            self._buf = buf
+            self._view = memoryview(buf)
+        self._start = 0
+        self._end = pending
@@ -0,0 +1,314 @@
+import os
+import time
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FRAME_SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# segundos
+DECODE_TIME_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+SEND_TIME_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class DirectionMetrics:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+        self.invalid_resets = 0
+        self.frame_sizes = Histogram(FRAME_SIZE_BUCKETS)
+        # scan do ID (todo frame inspecionado) e decode completo (so no pool):
+        # inline o corpo so e decodificado sob demanda, fora daqui
+        self.scan_times = Histogram(DECODE_TIME_BUCKETS)
+        self.decode_times = Histogram(DECODE_TIME_BUCKETS)
+        self.send_times = Histogram(SEND_TIME_BUCKETS)
+
+    def merge(self, other):
+        self.frames += other.frames
+        self.bytes += other.bytes
+        self.invalid_resets += other.invalid_resets
+        self.frame_sizes.merge(other.frame_sizes)
+        self.scan_times.merge(other.scan_times)
+        self.decode_times.merge(other.decode_times)
+        self.send_times.merge(other.send_times)
+
+
+# Metricas do core por sessao e direcao. Cada contador so e escrito pela thread
+# que cuida daquela direcao; leitura de outra thread (GUI/exporter) e so snapshot.
+# Sessoes fechadas sao somadas em "retired" pra os totais nao andarem pra tras.
+class ProxyMetrics:
+    def __init__(self):
+        self.started = time.monotonic()
+        self._sessions = {}
+        self._retired = {}
+        # decode da pipeline pode chegar depois do close_session: vai pro lixo
+        self._closed = set()
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def direction(self, session, direction):
+        key = (0 if session is None else session, direction)
+        metrics = self._sessions.get(key)
+        if metrics is None:
+            with self._lock:
+                if key[0] in self._closed:
+                    return DirectionMetrics()
+                metrics = self._sessions.setdefault(key, DirectionMetrics())
+        return metrics
+
+    def on_frame(self, session, direction, size):
+        m = self.direction(session, direction)
+        m.frames += 1
+        m.bytes += size
+        m.frame_sizes.observe(size)
+
+    def on_send(self, session, direction, seconds):
+        self.direction(session, direction).send_times.observe(seconds)
+
+    def on_scan(self, session, direction, seconds):
+        self.direction(session, direction).scan_times.observe(seconds)
+
+    def on_decode(self, session, direction, seconds):
+        self.direction(session, direction).decode_times.observe(seconds)
+
+    def on_invalid(self, session, direction):
+        self.direction(session, direction).invalid_resets += 1
+
+    def close_session(self, session):
+        session = 0 if session is None else session
+        with self._lock:
+            self._closed.add(session)
+            for key in [k for k in self._sessions if k[0] == session]:
+                retired = self._retired.setdefault(key[1], DirectionMetrics())
+                retired.merge(self._sessions.pop(key))
+
+    # gauge calculado na hora da leitura (ex: profundidade de fila)
+    def set_gauge(self, name, fn, help_text=""):
+        self._gauges[name] = (fn, help_text)
+
+    def sessions(self):
+        with self._lock:
+            return dict(self._sessions)
+
+    def totals(self):
+        with self._lock:
+            totals = {}
+            for direction, m in self._retired.items():
+                totals.setdefault(direction, DirectionMetrics()).merge(m)
+            for (_, direction), m in self._sessions.items():
+                totals.setdefault(direction, DirectionMetrics()).merge(m)
+            return totals
+
+    def gauges(self):
+        values = {}
+        for name, (fn, _) in list(self._gauges.items()):
+            try:
+                values[name] = fn()
+            except Exception:
+                values[name] = None
+        return values
+
+    # netgarden_X{direction} = total (com as sessoes ja fechadas);
+    # netgarden_session_X{session,direction} = so as sessoes abertas. Nomes
+    # separados: sum() de um deles nao conta o mesmo trafego duas vezes
+    def to_prometheus(self):
+        lines = []
+        totals = [(f'direction="{direction}"', m) for direction, m in sorted(self.totals().items())]
+        sessions = [(f'session="{session}",direction="{direction}"', m)
+                    for (session, direction), m in sorted(self.sessions().items())]
+
+        def counter(name, help_text, get):
+            for prefix, series in (("netgarden_", totals), ("netgarden_session_", sessions)):
+                lines.append(f"# HELP {prefix}{name} {help_text}")
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for labels, m in series:
+                    lines.append(f"{prefix}{name}{{{labels}}} {get(m)}")
+
+        def histogram(name, help_text, get):
+            for prefix, series in (("netgarden_", totals), ("netgarden_session_", sessions)):
+                lines.append(f"# HELP {prefix}{name} {help_text}")
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                _histogram_lines(lines, prefix + name, series, get)
+
+        counter("frames_total", "Frames relayed.", lambda m: m.frames)
+        counter("bytes_total", "Bytes relayed.", lambda m: m.bytes)
+        counter("invalid_length_resets_total", "Framing buffer resets after an invalid length prefix.",
+                lambda m: m.invalid_resets)
+        histogram("frame_size_bytes", "Frame size distribution.", lambda m: m.frame_sizes)
+        histogram("id_scan_seconds", "Time spent reading the packet ID of each inspected frame (header scan).",
+                  lambda m: m.scan_times)
+        histogram("decode_seconds", "Time spent fully decoding large frames on the decode pool.",
+                  lambda m: m.decode_times)
+        histogram("send_seconds", "Time blocked forwarding a frame to the destination.", lambda m: m.send_times)
+
+        for name, value in sorted(self.gauges().items()):
+            help_text = self._gauges[name][1] or name
+            lines.append(f"# HELP netgarden_{name} {help_text}")
+            lines.append(f"# TYPE netgarden_{name} gauge")
+            lines.append(f"netgarden_{name} {0 if value is None else value}")
+
+        lines.append("# HELP netgarden_uptime_seconds Seconds since the metrics were created.")
+        lines.append("# TYPE netgarden_uptime_seconds gauge")
+        lines.append(f"netgarden_uptime_seconds {time.monotonic() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(lines, name, series, get):
+    for labels, m in series:
+        h = get(m)
+        cumulative = 0
+        for bound, c in zip(h.buckets, h.counts):
+            cumulative += c
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+        lines.append(f"{name}_sum{{{labels}}} {h.sum:.9g}")
+        lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+
+# Sem metricas ligadas: mesma interface, nao faz nada (o Proxy chama sem checar None)
+class NullMetrics:
+    def on_frame(self, session, direction, size):
+        pass
+
+    def on_send(self, session, direction, seconds):
+        pass
+
+    def on_scan(self, session, direction, seconds):
+        pass
+
+    def on_decode(self, session, direction, seconds):
+        pass
+
+    def on_invalid(self, session, direction):
+        pass
+
+    def close_session(self, session):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+# Calcula bytes/s e frames/s entre duas leituras (o GUI e o modo stats usam isso;
+# o Prometheus calcula as taxas sozinho a partir dos contadores).
+class RateTracker:
+    def __init__(self):
+        self._last = {}
+        self._last_time = None
+
+    def rates(self, metrics):
+        now = time.monotonic()
+        current = {key: (m.frames, m.bytes) for key, m in metrics.sessions().items()}
+        elapsed = (now - self._last_time) if self._last_time else None
+        rates = {}
+        for key, (frames, nbytes) in current.items():
+            prev_frames, prev_bytes = self._last.get(key, (frames, nbytes))
+            if elapsed:
+                rates[key] = ((frames - prev_frames) / elapsed, (nbytes - prev_bytes) / elapsed)
+            else:
+                rates[key] = (0.0, 0.0)
+        self._last = current
+        self._last_time = now
+        return rates
+
+
+class MetricsExporter:
+    def __init__(self, metrics, path=None, port=0, host="127.0.0.1", interval=5.0, on_log=None):
+        self.metrics = metrics
+        self.path = path
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self.on_log = on_log
+        self._server = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self.port:
+            metrics = self.metrics
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = metrics.to_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            t = threading.Thread(target=self._server.serve_forever, daemon=True)
+            t.start()
+            self._threads.append(t)
+            if self.on_log:
+                self.on_log(f"[NetGarden] Metrics on http://{self.host}:{self.port}/metrics")
+
+        if self.path:
+            t = threading.Thread(target=self._write_loop, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            self.write_file()
+        self.write_file()
+
+    def write_file(self):
+        if not self.path:
+            return
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.metrics.to_prometheus())
+            # troca atomica, pra o node_exporter (textfile) nunca ler arquivo pela metade
+            os.replace(tmp, self.path)
+        except Exception as e:
+            if self.on_log:
+                self.on_log(f"[ERROR] Metrics write failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
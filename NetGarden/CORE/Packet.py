@@ -1,7 +1,199 @@
-class Packet:
-    def __init__(self, direction, raw_frame, parsed, packet_id="?", timestamp=""):
-        self.direction = direction
-        self.raw = raw_frame
-        self.parsed = parsed
-        self.id = packet_id
-        self.timestamp = timestamp
+import zlib
+import lzma
+import struct
+import itertools
+from bson import BSON
+from NetGarden.CORE.DecodeCache import DecodeCache
+
+_INT32 = struct.Struct("<i")
+_INT64 = struct.Struct("<q")
+_DOUBLE = struct.Struct("<d")
+
+# tamanho fixo do valor por tipo BSON (None = tamanho variavel)
+_FIXED_SIZES = {
+    0x01: 8, 0x06: 0, 0x07: 12, 0x08: 1, 0x09: 8, 0x0A: 0,
+    0x10: 4, 0x11: 8, 0x12: 8, 0x13: 16, 0x7F: 0, 0xFF: 0,
+}
+
+
+def _skip_cstring(buf, pos, end):
+    nul = buf.find(b"\x00", pos, end)
+    if nul < 0:
+        raise ValueError("unterminated cstring")
+    return nul + 1
+
+
+# menor prefixo de tamanho valido por tipo: string conta o \x00, documento o
+# header + \x00, code_w_scope o int32 + string + documento vazios
+_MIN_LENGTHS = {0x02: 1, 0x0D: 1, 0x0E: 1, 0x03: 5, 0x04: 5, 0x0F: 14, 0x05: 0, 0x0C: 1}
+
+
+def _length(buf, etype, pos, end):
+    if pos + 4 > end:
+        raise ValueError("BSON element overruns document")
+    length = _INT32.unpack_from(buf, pos)[0]
+    if length < _MIN_LENGTHS[etype]:
+        raise ValueError(f"bad BSON length {length} for type 0x{etype:02x}")
+    return length
+
+
+def _value_end(buf, etype, pos, end):
+    size = _FIXED_SIZES.get(etype)
+    if size is not None:
+        return pos + size
+    if etype in (0x02, 0x0D, 0x0E):
+        return pos + 4 + _length(buf, etype, pos, end)
+    if etype in (0x03, 0x04, 0x0F):
+        return pos + _length(buf, etype, pos, end)
+    if etype == 0x05:
+        return pos + 5 + _length(buf, etype, pos, end)
+    if etype == 0x0B:
+        return _skip_cstring(buf, _skip_cstring(buf, pos, end), end)
+    if etype == 0x0C:
+        return pos + 4 + _length(buf, etype, pos, end) + 12
+    raise ValueError(f"unknown BSON type 0x{etype:02x}")
+
+
+# Le so o campo ID de um frame (header de 4 bytes + documento BSON) pulando os
+# outros elementos. Retorna "?" se nao tem ID; ValueError se o documento esta corrompido.
+def scan_packet_id(frame):
+    buf = bytes(frame) if not isinstance(frame, (bytes, bytearray)) else frame
+    if len(buf) < 9:
+        raise ValueError("frame too short for a BSON document")
+
+    doc_len = _INT32.unpack_from(buf, 4)[0]
+    end = 4 + doc_len
+    if doc_len < 5 or end > len(buf) or buf[end - 1] != 0:
+        raise ValueError(f"bad BSON document length {doc_len}")
+
+    pos = 8
+    last = end - 1
+    while pos < last:
+        etype = buf[pos]
+        name_end = _skip_cstring(buf, pos + 1, last)
+        value_end = _value_end(buf, etype, name_end, last)
+        if value_end > last:
+            raise ValueError("BSON element overruns document")
+        # tamanho corrompido nunca pode fazer a varredura andar pra tras
+        if value_end <= pos:
+            raise ValueError("BSON element does not advance")
+
+        if name_end - pos - 2 == 2 and buf[pos + 1:name_end - 1] == b"ID":
+            if etype == 0x02:
+                return buf[name_end + 4:value_end - 1].decode("utf-8", "replace")
+            if etype == 0x10:
+                return str(_INT32.unpack_from(buf, name_end)[0])
+            if etype == 0x12:
+                return str(_INT64.unpack_from(buf, name_end)[0])
+            if etype == 0x01:
+                return str(_DOUBLE.unpack_from(buf, name_end)[0])
+            # tipo raro de ID: cai no decode completo
+            parsed = BSON(buf[4:end]).decode()
+            return str(parsed.get("ID"))
+
+        pos = value_end
+
+    return "?"
+
+
+# Blobs binarios comprimidos dentro do documento (mundo do GWC, por exemplo)
+# sao descomprimidos e, se o resultado for um documento BSON, entram no lugar
+# dos bytes. Qualquer outra coisa continua como bytes.
+MAX_INFLATE_BYTES = 256 * 1024 * 1024
+INFLATE_DEPTH = 3
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+
+
+def _is_bson(data):
+    return len(data) >= 5 and _INT32.unpack_from(data, 0)[0] == len(data) and data[-1] == 0
+
+
+def inflate_blob(data):
+    try:
+        if data[:1] == b"\x78" and int.from_bytes(data[:2], "big") % 31 == 0:
+            raw = zlib.decompressobj().decompress(data, MAX_INFLATE_BYTES)
+        elif data[:2] == b"\x1f\x8b":
+            raw = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data, MAX_INFLATE_BYTES)
+        elif data[:6] == _XZ_MAGIC:
+            raw = lzma.LZMADecompressor().decompress(data, MAX_INFLATE_BYTES)
+        elif data[:1] == b"\x5d" and data[1:3] == b"\x00\x00":
+            raw = lzma.LZMADecompressor(lzma.FORMAT_ALONE).decompress(data, MAX_INFLATE_BYTES)
+        else:
+            return None
+        if _is_bson(raw):
+            return BSON(raw).decode()
+    except Exception:
+        pass
+    return None
+
+
+# so olha dicts ate INFLATE_DEPTH: listas grandes (blocos do mundo) nao sao varridas
+def _inflate(doc, depth=INFLATE_DEPTH):
+    for key, value in doc.items():
+        if isinstance(value, bytes) and len(value) > 8:
+            inflated = inflate_blob(value)
+            if inflated is not None:
+                doc[key] = inflated
+        elif isinstance(value, dict) and depth > 1:
+            _inflate(value, depth - 1)
+    return doc
+
+
+def _decode(frame):
+    return _inflate(BSON(bytes(frame[4:])).decode())
+
+
+# cache do processo: frames pequenos identicos dividem o mesmo documento (read-only)
+decode_cache = DecodeCache()
+
+
+# frame (header de 4 bytes + BSON) -> documento, com blobs comprimidos abertos.
+# O documento e sempre somente leitura pra quem recebe: quando vem do cache e
+# um FrozenDoc dividido com outros pacotes (alterar levanta TypeError); fora do
+# cache vem um dict comum, mas quem precisa mexer copia nos dois casos.
+def decode_frame(frame):
+    return decode_cache.get_or_decode(frame, _decode)
+
+
+# Numero de sequencia global do processo, dado quando o frame e capturado.
+# Cresce sempre (mesmo entre sessoes e reinicios do proxy); frame descartado
+# pela fila de inspecao deixa um buraco, entao da pra ver o que se perdeu.
+_sequence = itertools.count(1)
+
+
+def next_seq():
+    return next(_sequence)
+
+
+# O Packet guarda so o frame cru; o documento so e decodificado quando alguem
+# pede .parsed (inspector, decoded view...), e nao fica preso no objeto.
+# .parsed segue o contrato do decode_frame: somente leitura (pode ser FrozenDoc).
+class Packet:
+    def __init__(self, direction, raw_frame, parsed=None, packet_id=None, timestamp="", session=None, captured=None, seq=None):
+        self.direction = direction
+        self.raw = raw_frame
+        self._parsed = parsed
+        if packet_id is None:
+            try:
+                packet_id = scan_packet_id(raw_frame)
+            except Exception:
+                packet_id = "?"
+        self.id = packet_id
+        self.timestamp = timestamp
+        self.session = session
+        # time.monotonic() da captura, numero de sequencia (next_seq) e linha no PacketStore
+        self.captured = captured
+        self.seq = seq
+        self.row = None
+
+    def decode(self):
+        return decode_frame(self.raw)
+
+    @property
+    def parsed(self):
+        if self._parsed is not None:
+            return self._parsed
+        try:
+            return self.decode()
+        except Exception:
+            return None
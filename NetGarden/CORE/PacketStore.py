@@ -0,0 +1,371 @@
+import os
+import time
+import tempfile
+import datetime
+import threading
+import itertools
+from array import array
+from NetGarden.CORE.Packet import Packet, next_seq
+
+DIRECTIONS = ("client", "server")
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTIONS)}
+
+ARENA_CHUNK_SIZE = 16 * 1024 * 1024
+# com retencao, cada chunk ocupa no maximo 1/RETENTION_CHUNKS do limite: o
+# chunk atual nunca e despejado, entao ele e o quanto o limite pode passar
+RETENTION_CHUNKS = 4
+MIN_CHUNK_SIZE = 64 * 1024
+# offsets sao globais: (chunk << 32) | posicao dentro do chunk
+_CHUNK_SHIFT = 32
+_CHUNK_MASK = (1 << _CHUNK_SHIFT) - 1
+NO_SESSION = -1
+# bytes.translate: codigo de direcao -> 1/0, pra selecionar linhas com itertools.compress
+_SELECT_TABLES = tuple(bytes(1 if b == code else 0 for b in range(256)) for code in range(len(DIRECTIONS)))
+# offsets negativos apontam pro arquivo de spill: -(posicao no arquivo) - 1
+
+
+# Armazenamento colunar dos pacotes capturados: cada pacote e uma linha
+# (indice inteiro) em arrays tipados, e os frames crus ficam num arena de
+# chunks de bytes. O GUI e as features se referem aos pacotes pelo numero da
+# linha; Packet so e montado sob demanda via packet(row).
+#
+# Com max_packets/max_bytes, os chunks mais antigos do arena sao despejados
+# num arquivo append-only (spill) e frame() passa a ler de la. Os metadados
+# continuam em memoria; linhas fixadas com pin() nunca saem da RAM. O despejo
+# e por chunk, e o chunk e dimensionado pelo limite (_size_chunks): no pior
+# caso a RAM passa do limite em 1/RETENTION_CHUNKS dele.
+class PacketStore:
+    def __init__(self, chunk_size=ARENA_CHUNK_SIZE, max_packets=0, max_bytes=0, spill_path=None):
+        self.chunk_size = chunk_size
+        self.max_packets = max_packets
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+        # tamanho e linhas por chunk novo (0 = sem limite de linhas)
+        self._chunk_bytes = chunk_size
+        self._chunk_rows = 0
+
+        self.seqs = array("q")
+        self.directions = array("B")
+        self.id_codes = array("I")
+        self.times = array("d")
+        self.sessions = array("i")
+        self.offsets = array("q")
+        self.lengths = array("I")
+
+        self.ids = []
+        self._id_codes = {}
+
+        # indice invertido: [direcao][codigo do ID] -> linhas (crescentes)
+        self._rows_by_id = tuple([] for _ in DIRECTIONS)
+
+        # seq -> linha: array denso a partir do primeiro seq visto (-1 = buraco)
+        self._seq_base = None
+        self._row_by_seq = array("q")
+
+        self._chunks = []
+        self._chunk_first_row = []
+        self._chunk_fill = 0
+        self._oldest_chunk = 0
+        self._resident_bytes = 0
+        self._resident_count = 0
+
+        self._pinned = set()
+        self._pinned_frames = {}
+        self._spill = None
+        self._spill_reader = None
+        self._spill_size = 0
+        self._spill_owned = False
+        self.spilled = 0
+        self.capture = None
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._count = 0
+
+        # converte time.monotonic() pra hora de parede na exibicao
+        self._wall_offset = time.time() - time.monotonic()
+        self._size_chunks()
+
+    def __len__(self):
+        return self._count
+
+    def intern_id(self, packet_id):
+        code = self._id_codes.get(packet_id)
+        if code is None:
+            code = len(self.ids)
+            self.ids.append(packet_id)
+            for rows_by_id in self._rows_by_id:
+                rows_by_id.append(array("q"))
+            self._id_codes[packet_id] = code
+        return code
+
+    def id_code(self, packet_id):
+        return self._id_codes.get(packet_id)
+
+    def append(self, direction, frame, packet_id="?", captured=None, session=None, seq=None):
+        length = len(frame)
+        with self._lock:
+            row = self._count
+            offset = self._store_frame(frame, length)
+
+            if seq is None:
+                seq = next_seq()
+            self.seqs.append(seq)
+            self._index_seq(seq, row)
+            direction_code = DIRECTION_CODES.get(direction, 1)
+            code = self.intern_id(packet_id)
+            self.directions.append(direction_code)
+            self.id_codes.append(code)
+            self._rows_by_id[direction_code][code].append(row)
+            self.times.append(time.monotonic() if captured is None else captured)
+            self.sessions.append(NO_SESSION if session is None else session)
+            self.offsets.append(offset)
+            self.lengths.append(length)
+
+            if self.capture is not None:
+                self.capture.append(
+                    direction, frame, packet_id,
+                    wall_time=self._wall_offset + self.times[row],
+                    session=session, seq=self.seqs[row]
+                )
+
+            # so publica a linha depois que todas as colunas foram escritas
+            self._count = row + 1
+            self._resident_count += 1
+
+            if self._over_budget():
+                self._evict()
+        return row
+
+    def append_packet(self, packet):
+        return self.append(
+            packet.direction,
+            packet.raw,
+            packet_id=packet.id,
+            captured=getattr(packet, "captured", None),
+            session=getattr(packet, "session", None),
+            seq=getattr(packet, "seq", None)
+        )
+
+    def _index_seq(self, seq, row):
+        if self._seq_base is None:
+            self._seq_base = seq
+        pos = seq - self._seq_base
+        if pos < 0:
+            return
+        index = self._row_by_seq
+        gap = pos - len(index)
+        if gap > 0:
+            # 0xff..ff = -1 em complemento de dois
+            index.frombytes(b"\xff" * (gap * index.itemsize))
+        if gap >= 0:
+            index.append(row)
+        else:
+            index[pos] = row
+
+    def rows_for_direction(self, direction, end=None):
+        count = self._count if end is None else min(end, self._count)
+        selectors = self.directions[:count].tobytes().translate(_SELECT_TABLES[DIRECTION_CODES[direction]])
+        return array("q", itertools.compress(range(count), selectors))
+
+    # linhas de um ID numa direcao, em ordem (o array e do store: nao alterar)
+    def rows_for_id(self, code, direction):
+        return self._rows_by_id[DIRECTION_CODES[direction]][code]
+
+    # linha do pacote com esse seq, ou -1 se nao esta neste store
+    def row_of_seq(self, seq):
+        if self._seq_base is None:
+            return -1
+        pos = seq - self._seq_base
+        if 0 <= pos < len(self._row_by_seq):
+            return self._row_by_seq[pos]
+        if pos < 0:
+            try:
+                return self.seqs.index(seq)
+            except ValueError:
+                pass
+        return -1
+
+    def _size_chunks(self):
+        self._chunk_bytes = self.chunk_size
+        if self.max_bytes:
+            self._chunk_bytes = min(self.chunk_size, max(MIN_CHUNK_SIZE, self.max_bytes // RETENTION_CHUNKS))
+        self._chunk_rows = max(1, self.max_packets // RETENTION_CHUNKS) if self.max_packets else 0
+
+    def _store_frame(self, frame, length):
+        if (not self._chunks or self._chunk_fill + length > len(self._chunks[-1])
+                or self._chunk_rows and self._count - self._chunk_first_row[-1] >= self._chunk_rows):
+            # frame maior que o chunk ganha um chunk so dele
+            chunk = bytearray(max(self._chunk_bytes, length))
+            self._chunks.append(chunk)
+            self._chunk_first_row.append(self._count)
+            self._resident_bytes += len(chunk)
+            self._chunk_fill = 0
+
+        chunk_index = len(self._chunks) - 1
+        start = self._chunk_fill
+        self._chunks[-1][start:start + length] = frame
+        self._chunk_fill = start + length
+        return (chunk_index << _CHUNK_SHIFT) | start
+
+    def frame(self, row):
+        offset = self.offsets[row]
+        if offset < 0:
+            return self._spilled_frame(row, -offset - 1)
+        chunk = self._chunks[offset >> _CHUNK_SHIFT]
+        if chunk is None:
+            return self._spilled_frame(row, -self.offsets[row] - 1)
+        start = offset & _CHUNK_MASK
+        return memoryview(chunk)[start:start + self.lengths[row]]
+
+    # grava tudo que chegar daqui pra frente num CaptureWriter (None desliga e fecha o atual)
+    def set_capture(self, writer):
+        with self._lock:
+            old = self.capture
+            self.capture = writer
+        if old is not None and old is not writer:
+            old.close()
+
+    def set_retention(self, max_packets=0, max_bytes=0):
+        with self._lock:
+            self.max_packets = max_packets or 0
+            self.max_bytes = max_bytes or 0
+            self._size_chunks()
+            # chunk atual maior que o novo tamanho: fecha ele, o proximo frame
+            # abre outro e este vira despejavel
+            if self._chunks and len(self._chunks[-1]) > self._chunk_bytes:
+                self._chunk_fill = len(self._chunks[-1])
+            if self._over_budget():
+                self._evict()
+
+    def pin(self, row):
+        with self._lock:
+            self._pinned.add(row)
+            if self.offsets[row] < 0 and row not in self._pinned_frames:
+                self._pinned_frames[row] = bytes(self._spilled_frame(row, -self.offsets[row] - 1))
+
+    def unpin(self, row):
+        with self._lock:
+            self._pinned.discard(row)
+            self._pinned_frames.pop(row, None)
+
+    def is_resident(self, row):
+        return self.offsets[row] >= 0 or row in self._pinned_frames
+
+    def resident_bytes(self):
+        return self._resident_bytes
+
+    def _over_budget(self):
+        if self.max_bytes and self._resident_bytes > self.max_bytes:
+            return True
+        if self.max_packets and self._resident_count > self.max_packets:
+            return True
+        return False
+
+    def _evict(self):
+        # o chunk atual (ainda recebendo frames) nunca e despejado
+        while self._over_budget() and self._oldest_chunk < len(self._chunks) - 1:
+            self._evict_chunk(self._oldest_chunk)
+            self._oldest_chunk += 1
+
+    def _evict_chunk(self, index):
+        chunk = self._chunks[index]
+        first = self._chunk_first_row[index]
+        last = self._chunk_first_row[index + 1]
+        view = memoryview(chunk)
+
+        spill = self._open_spill()
+        pos = self._spill_size
+        parts = []
+        spilled_offsets = []
+        for row in range(first, last):
+            start = self.offsets[row] & _CHUNK_MASK
+            length = self.lengths[row]
+            frame = view[start:start + length]
+            if row in self._pinned:
+                self._pinned_frames[row] = bytes(frame)
+            parts.append(frame)
+            spilled_offsets.append(-pos - 1)
+            pos += length
+
+        # grava antes de trocar os offsets, pra quem le nunca ver um offset sem dados
+        spill.write(b"".join(parts))
+        spill.flush()
+        self._spill_size = pos
+        self.offsets[first:last] = array("q", spilled_offsets)
+
+        self._chunks[index] = None
+        self._resident_bytes -= len(chunk)
+        self._resident_count -= last - first
+        self.spilled += last - first
+
+    def _open_spill(self):
+        if self._spill is None:
+            if self.spill_path is None:
+                fd, self.spill_path = tempfile.mkstemp(prefix="netgarden-spill-", suffix=".bin")
+                os.close(fd)
+                self._spill_owned = True
+            self._spill = open(self.spill_path, "ab")
+            self._spill_size = self._spill.tell()
+        return self._spill
+
+    def _spilled_frame(self, row, pos):
+        pinned = self._pinned_frames.get(row)
+        if pinned is not None:
+            return memoryview(pinned)
+        with self._read_lock:
+            if self._spill_reader is None:
+                self._spill_reader = open(self.spill_path, "rb")
+            self._spill_reader.seek(pos)
+            return memoryview(self._spill_reader.read(self.lengths[row]))
+
+    def close(self):
+        self.set_capture(None)
+        for f in (self._spill, self._spill_reader):
+            try:
+                if f:
+                    f.close()
+            except:
+                pass
+        self._spill = None
+        self._spill_reader = None
+        if self._spill_owned and self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except:
+                pass
+
+    def id_of(self, row):
+        return self.ids[self.id_codes[row]]
+
+    def direction_of(self, row):
+        return DIRECTIONS[self.directions[row]]
+
+    def session_of(self, row):
+        session = self.sessions[row]
+        return None if session == NO_SESSION else session
+
+    def seq_of(self, row):
+        return self.seqs[row]
+
+    def timestamp_of(self, row):
+        wall = self._wall_offset + self.times[row]
+        return datetime.datetime.fromtimestamp(wall).strftime("%H:%M:%S")
+
+    def packet(self, row):
+        pkt = Packet(
+            self.direction_of(row),
+            bytes(self.frame(row)),
+            packet_id=self.id_of(row),
+            timestamp=self.timestamp_of(row),
+            session=self.session_of(row),
+            captured=self.times[row],
+            seq=self.seqs[row]
+        )
+        pkt.row = row
+        return pkt
+
+    def nbytes(self):
+        arrays = (self.seqs, self.directions, self.id_codes, self.times, self.sessions, self.offsets, self.lengths,
+                  self._row_by_seq)
+        index = sum(a.itemsize * len(a) for rows_by_id in self._rows_by_id for a in rows_by_id)
+        return sum(a.itemsize * len(a) for a in arrays) + index + self._resident_bytes
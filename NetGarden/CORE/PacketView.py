@@ -0,0 +1,208 @@
+import bisect
+import itertools
+import contextlib
+from array import array
+from NetGarden.CORE.Packet import decode_frame
+from NetGarden.CORE.PacketStore import DIRECTIONS
+from NetGarden.CORE.Query import parse_query, match_ids, match_fields
+
+# linhas decodificadas por search() alem do que o FieldIndex cobre
+FIELD_DECODE_ROWS = 2000
+
+
+# Filtro como visao sobre o store: nada e descartado, a visao so decide quais
+# linhas aparecem. O teste e feito uma vez por ID (cacheado por codigo) e as
+# linhas saem do indice invertido ID -> linhas do store, entao refiltrar uma
+# captura inteira e juntar alguns arrays ja ordenados.
+#
+# O texto e uma busca (Query.py). So com termos de ID continua sendo o caso
+# acima; com termos de campo as linhas saem do FieldIndex por trechos
+# (search), conforme ele avanca em segundo plano.
+class PacketView:
+    def __init__(self, store, hidden_ids=None, label=None, index=None):
+        self.store = store
+        self.text = ""
+        self.query = None
+        # IDs ocultos (SpamFilter.hidden_ids) e nome alternativo pro filtro (NetStrings)
+        self.hidden_ids = hidden_ids if hidden_ids is not None else set()
+        self.label = label
+        self.index = index
+        self._matches = []
+        # [grupo do "or"] -> o ID passa nos termos de ID do grupo (por codigo)
+        self._group_matches = []
+        self._field_groups = []
+
+    def set_store(self, store, index=None):
+        self.store = store
+        self.index = index
+        self.invalidate()
+
+    # QueryError sobe sem mexer na visao atual
+    def set_text(self, text):
+        query = parse_query(text) if text.strip() else None
+        self.text = text.strip().lower()
+        self.query = query
+        self._field_groups = [any(not term.is_id for term in group) for group in query.groups] if query else []
+        self.invalidate()
+
+    def has_fields(self):
+        return self.query is not None and self.query.has_fields
+
+    def invalidate(self):
+        self._matches = []
+        self._group_matches = []
+
+    # com termos de campo isto so olha o lado do ID; a linha ainda passa por matches_row
+    def _test(self, packet_id):
+        if packet_id in self.hidden_ids:
+            return False
+        if self.query is None:
+            return True
+        return any(match_ids(group, packet_id, self.label) for group in self.query.groups)
+
+    def _group_code(self, group_index, code):
+        if not self._group_matches:
+            self._group_matches = [[] for _ in self.query.groups]
+        matches = self._group_matches[group_index]
+        group = self.query.groups[group_index]
+        ids = self.store.ids
+        while len(matches) <= code:
+            packet_id = ids[len(matches)]
+            matches.append(packet_id not in self.hidden_ids and match_ids(group, packet_id, self.label))
+        return matches[code]
+
+    def _decode(self, row):
+        try:
+            return decode_frame(self.store.frame(row))
+        except Exception:
+            return None
+
+    # linha nova (ao vivo) passa na visao?
+    def matches_row(self, row):
+        code = self.store.id_codes[row]
+        if not self.has_fields():
+            return self.matches_code(code)
+        doc = None
+        decoded = False
+        for group_index, group in enumerate(self.query.groups):
+            if not self._group_code(group_index, code):
+                continue
+            if not self._field_groups[group_index]:
+                return True
+            if not decoded:
+                doc = self._decode(row)
+                decoded = True
+            if match_fields(group, doc):
+                return True
+        return False
+
+    def matches_code(self, code):
+        matches = self._matches
+        ids = self.store.ids
+        while len(matches) <= code:
+            matches.append(self._test(ids[len(matches)]))
+        return matches[code]
+
+    def codes(self):
+        ids = self.store.ids
+        return {code for code in range(len(ids)) if self.matches_code(code)}
+
+    def is_filtered(self):
+        return bool(self.text or self.hidden_ids)
+
+    # linhas visiveis de uma direcao abaixo de `end` (o que o GUI ja recebeu),
+    # ja em ordem: cada array do indice e crescente e o sort so intercala.
+    # So termos de ID; busca com campo vai por search()
+    def rows(self, direction, end, codes=None):
+        if codes is None:
+            if not self.is_filtered():
+                return self.store.rows_for_direction(direction, end)
+            codes = self.codes()
+        parts = []
+        for code in codes:
+            rows = self.store.rows_for_id(code, direction)
+            if rows and rows[0] < end:
+                parts.append(rows[:bisect.bisect_left(rows, end)])
+        if not parts:
+            return array("q")
+        if len(parts) == 1:
+            return parts[0]
+        return array("q", sorted(itertools.chain.from_iterable(parts)))
+
+    def _id_rows(self, codes, start, end):
+        rows = set()
+        for code in codes:
+            for direction in DIRECTIONS:
+                part = self.store.rows_for_id(code, direction)
+                if part and part[0] < end and part[-1] >= start:
+                    rows.update(part[bisect.bisect_left(part, start):bisect.bisect_left(part, end)])
+        return rows
+
+    # busca com termos de campo nas linhas [start, end). Por grupo, intersecta
+    # as linhas do indice ate onde ele ja chegou; so as linhas parciais sao
+    # decodificadas, e fora do lock (o indexador nao espera o GUI). O resto fica
+    # pra proxima chamada, quando o indice tiver avancado. Sem indice, ou com
+    # ele cheio, decodifica no maximo FIELD_DECODE_ROWS linhas por chamada.
+    # Devolve ((client, server), stop): [start, stop) ja foi resolvido.
+    def search(self, start, end):
+        store = self.store
+        index = self.index
+        code_count = len(store.ids)
+        found = set()
+        pending = []
+
+        with index.lock if index is not None else contextlib.nullcontext():
+            covered = max(start, min(index.indexed, end)) if index is not None else start
+            stop = covered
+            if (index is None or index.full) and covered < end:
+                stop = min(end, covered + FIELD_DECODE_ROWS)
+            partial = sorted(row for row in index.partial if start <= row < covered) if index is not None else []
+
+            for group_index, group in enumerate(self.query.groups):
+                codes = [code for code in range(code_count) if self._group_code(group_index, code)]
+                if not codes:
+                    continue
+                candidates = None if len(codes) == code_count else self._id_rows(codes, start, stop)
+                if not self._field_groups[group_index]:
+                    found.update(range(start, stop) if candidates is None else candidates)
+                    continue
+
+                if covered > start:
+                    hits = None
+                    for term in group:
+                        if not term.is_id and not term.negate:
+                            rows = index.lookup(term, start)
+                            hits = rows if hits is None else hits & rows
+                            if not hits:
+                                break
+                    if hits is None:
+                        hits = set(range(start, covered)) if candidates is None else candidates.copy()
+                    elif candidates is not None:
+                        hits &= candidates
+                    for term in group:
+                        if hits and not term.is_id and term.negate:
+                            hits -= index.lookup(term, start)
+                    hits.difference_update(partial)
+                    found.update(row for row in hits if row < covered)
+
+                pending.append((group, None if candidates is None else set(codes)))
+
+        id_codes = store.id_codes
+        for row in itertools.chain(partial, range(covered, stop)):
+            doc = None
+            decoded = False
+            for group, code_set in pending:
+                if code_set is not None and id_codes[row] not in code_set:
+                    continue
+                if not decoded:
+                    doc = self._decode(row)
+                    decoded = True
+                if match_fields(group, doc):
+                    found.add(row)
+                    break
+
+        split = tuple(array("q") for _ in DIRECTIONS)
+        directions = store.directions
+        for row in sorted(found):
+            split[directions[row]].append(row)
+        return split, stop
@@ -0,0 +1,237 @@
+import time
+import threading
+import collections
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from NetGarden.CORE.Packet import Packet, scan_packet_id, next_seq, decode_frame
+
+# o que fazer quando a fila de inspecao enche
+POLICY_DROP = "drop"
+POLICY_SAMPLE = "sample"
+POLICY_BLOCK = "block"
+POLICIES = (POLICY_DROP, POLICY_SAMPLE, POLICY_BLOCK)
+
+# frames a partir desse tamanho vao pro pool de processos (decode_workers > 0)
+DEFAULT_DECODE_THRESHOLD = 64 * 1024
+# pacotes esperando entrega em ordem, por worker do pool
+_INFLIGHT_PER_WORKER = 4
+
+
+# roda no processo do pool: devolve o documento e o tempo de decode
+def _decode_job(frame):
+    start = time.perf_counter()
+    return decode_frame(frame), time.perf_counter() - start
+
+
+def build_packet(direction, frame, timestamp, session=None, on_log=None, captured=None, seq=None):
+    packet_id = "?"
+    try:
+        packet_id = scan_packet_id(frame)
+    except Exception as e:
+        if on_log:
+            where = direction if session is None else f"{direction}, session #{session}"
+            on_log(f"[WARN] BSON decode failed ({where}): {e}")
+
+    if captured is None:
+        captured = time.monotonic()
+    if seq is None:
+        seq = next_seq()
+    return Packet(direction, frame, packet_id=packet_id, timestamp=timestamp, session=session, captured=captured, seq=seq)
+
+
+# Fila limitada entre o proxy e o estagio que decodifica e entrega pro GUI.
+# O proxy encaminha o frame antes de chamar submit(), entao a inspecao nunca
+# atrasa o forward (a nao ser com POLICY_BLOCK, que e opt-in).
+#
+# Com decode_workers > 0, frames >= decode_threshold sao decodificados (e os
+# blobs comprimidos abertos) num ProcessPoolExecutor, fora do GIL; os menores
+# seguem inline. Uma thread de entrega chama on_packet na ordem dos seqs,
+# esperando o decode do pacote da frente quando precisa.
+class InspectionPipeline:
+    def __init__(self, on_packet, on_log=None, maxsize=10000, policy=POLICY_DROP, sample_every=10, metrics=None,
+                 decode_workers=0, decode_threshold=DEFAULT_DECODE_THRESHOLD):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.on_packet = on_packet
+        self.on_log = on_log
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.sample_every = max(1, int(sample_every))
+        self.metrics = metrics
+        self.decode_workers = max(0, int(decode_workers or 0))
+        self.decode_threshold = max(0, int(decode_threshold))
+
+        self.submitted = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.pooled = 0
+
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._overflow = 0
+        self._closed = False
+        self._thread = None
+
+        self._pool = None
+        # submit no pool falhou: o resto vai inline, depois de entregar o que ja estava na fila
+        self._pool_broken = False
+        self._ordered = collections.deque()
+        self._ordered_cond = threading.Condition()
+        self._ordered_done = False
+        self._deliver_thread = None
+
+    def start(self):
+        with self._cond:
+            self._closed = False
+        if self._thread is None or not self._thread.is_alive():
+            if self.decode_workers:
+                # spawn: o processo do GUI tem threads do Qt, fork nao e seguro
+                self._pool = ProcessPoolExecutor(self.decode_workers, mp_context=multiprocessing.get_context("spawn"))
+                self._pool_broken = False
+                self._ordered_done = False
+                self._deliver_thread = threading.Thread(target=self._deliver_ordered, daemon=True)
+                self._deliver_thread.start()
+            self._thread = threading.Thread(target=self._consume, daemon=True)
+            self._thread.start()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # espera o consumidor (e a thread de entrega do pool) entregar o que ja
+    # estava na fila; chamar depois de close(). False se o timeout venceu antes
+    def join(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in (self._thread, self._deliver_thread):
+            if thread is None:
+                continue
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                return False
+        return True
+
+    def depth(self):
+        return len(self._queue)
+
+    # frame pode ser um memoryview do FrameBuffer: so vira bytes se for enfileirado.
+    # O seq sai aqui, dentro do lock, entao a ordem da fila e a ordem dos seqs.
+    def submit(self, direction, frame, timestamp, session=None):
+        with self._cond:
+            self.submitted += 1
+            seq = next_seq()
+            if len(self._queue) < self.maxsize:
+                self._overflow = 0
+                self._queue.append((direction, bytes(frame), timestamp, session, time.monotonic(), seq))
+                self._cond.notify()
+                return True
+
+            if self.policy == POLICY_BLOCK:
+                while len(self._queue) >= self.maxsize and not self._closed:
+                    self._cond.wait(0.1)
+                self._queue.append((direction, bytes(frame), timestamp, session, time.monotonic(), seq))
+                self._cond.notify()
+                return True
+
+            if self.policy == POLICY_SAMPLE:
+                self._overflow += 1
+                if self._overflow % self.sample_every == 0:
+                    self._queue.popleft()
+                    self.dropped += 1
+                    self._queue.append((direction, bytes(frame), timestamp, session, time.monotonic(), seq))
+                    self._cond.notify()
+                    return True
+
+            self.dropped += 1
+            return False
+
+    def _consume(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    break
+                direction, frame, timestamp, session, captured, seq = self._queue.popleft()
+                self._cond.notify_all()
+
+            scan_start = time.perf_counter()
+            pkt = build_packet(direction, frame, timestamp, session=session, on_log=self.on_log, captured=captured, seq=seq)
+            if self.metrics is not None:
+                self.metrics.on_scan(session, direction, time.perf_counter() - scan_start)
+            if self._pool is not None:
+                future = None
+                if len(frame) >= self.decode_threshold:
+                    try:
+                        future = self._pool.submit(_decode_job, frame)
+                        self.pooled += 1
+                    except Exception as e:
+                        if self.on_log:
+                            self.on_log(f"[ERROR] Decode pool unavailable, decoding inline: {e}")
+                        self._pool_broken = True
+                if not self._pool_broken:
+                    self._put_ordered(pkt, future)
+                    continue
+                # pool quebrado: entrega o que ja estava na fila ordenada, fecha o
+                # pool e daqui pra frente este pacote e os proximos vao inline
+                self._retire_pool()
+
+            self._deliver(pkt)
+
+        if self._pool is not None:
+            with self._ordered_cond:
+                self._ordered_done = True
+                self._ordered_cond.notify_all()
+
+    def _deliver(self, pkt):
+        try:
+            self.on_packet(pkt)
+        except Exception as e:
+            if self.on_log:
+                self.on_log(f"[ERROR] on_packet failed ({pkt.direction}): {e}")
+        self.delivered += 1
+
+    # a thread de entrega esvazia _ordered, desliga o pool e zera _pool
+    def _retire_pool(self):
+        with self._ordered_cond:
+            self._ordered_done = True
+            self._ordered_cond.notify_all()
+        self._deliver_thread.join()
+
+    def _put_ordered(self, pkt, future):
+        limit = self.decode_workers * _INFLIGHT_PER_WORKER
+        with self._ordered_cond:
+            # cheio: segura o consumidor e a fila de inspecao faz o resto (politica)
+            while len(self._ordered) >= limit:
+                self._ordered_cond.wait()
+            self._ordered.append((pkt, future))
+            self._ordered_cond.notify_all()
+
+    def _deliver_ordered(self):
+        while True:
+            with self._ordered_cond:
+                while not self._ordered and not self._ordered_done:
+                    self._ordered_cond.wait()
+                if not self._ordered:
+                    break
+                pkt, future = self._ordered[0]
+
+            if future is not None:
+                try:
+                    pkt._parsed, elapsed = future.result()
+                    if self.metrics is not None:
+                        self.metrics.on_decode(pkt.session, pkt.direction, elapsed)
+                except Exception as e:
+                    # sem documento: on_packet ainda recebe o pacote (decode inline sob demanda)
+                    if self.on_log:
+                        self.on_log(f"[WARN] Pooled decode failed ({pkt.direction}, {len(pkt.raw)} bytes): {e}")
+
+            with self._ordered_cond:
+                self._ordered.popleft()
+                self._ordered_cond.notify_all()
+            self._deliver(pkt)
+
+        pool = self._pool
+        self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,151 @@
+import time
+import select
+import socket
+import threading
+from collections import deque
+
+DEFAULT_PRECONNECT_IDLE = 20.0
+PRECONNECT_TIMEOUT = 10
+# de quanto em quanto tempo a thread confere se o servidor fechou algum ocioso
+HEALTH_INTERVAL = 1.0
+RETRY_DELAY = 2.0
+
+
+# Conexoes com o servidor abertas antes do client chegar. O accept pega uma
+# pronta com take() em vez de esperar o handshake TCP (que em rota longe e o
+# que atrasa o VChk); a thread repoe o que foi usado e troca as que passaram de
+# max_idle, porque servidor de jogo costuma derrubar conexao muda.
+# A troca abre a nova antes de fechar a velha: o pool nao esvazia no refresh.
+class UpstreamPool:
+    def __init__(self, server_host, server_port, size=1, max_idle=DEFAULT_PRECONNECT_IDLE,
+                 connect_timeout=PRECONNECT_TIMEOUT, on_log=None):
+        self.server_host = server_host
+        self.server_port = server_port
+        self.size = size
+        self.max_idle = max_idle
+        self.connect_timeout = connect_timeout
+        self.on_log = on_log
+        # (socket, monotonic de quando conectou, segundos que o connect levou)
+        self._ready = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self._failing = False
+        self.handed = 0
+        self.saved = 0.0
+
+    def log(self, msg):
+        if self.on_log:
+            self.on_log(msg)
+
+    def start(self):
+        with self._cond:
+            self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="upstream-preconnect", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            ready = list(self._ready)
+            self._ready.clear()
+            self._cond.notify()
+        for sock, _, _ in ready:
+            _close(sock)
+
+    def ready(self):
+        return len(self._ready)
+
+    # (socket conectado e bloqueante, segundos de connect poupados) ou None
+    def take(self):
+        dead = []
+        found = None
+        with self._cond:
+            while self._ready:
+                sock, _, seconds = self._ready.popleft()
+                if _alive(sock):
+                    found = (sock, seconds)
+                    self.handed += 1
+                    self.saved += seconds
+                    break
+                dead.append(sock)
+            self._cond.notify()
+        for sock in dead:
+            _close(sock)
+        return found
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.connect_timeout)
+        started = time.monotonic()
+        try:
+            sock.connect((self.server_host, self.server_port))
+        except OSError:
+            _close(sock)
+            raise
+        sock.settimeout(None)
+        now = time.monotonic()
+        return sock, now, now - started
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                now = time.monotonic()
+                stale = [entry for entry in self._ready if now - entry[1] >= self.max_idle or not _alive(entry[0])]
+                need = self.size - (len(self._ready) - len(stale))
+
+            fresh = []
+            for _ in range(max(0, need)):
+                try:
+                    fresh.append(self._connect())
+                except OSError as e:
+                    if not self._failing:
+                        self.log(f"[ERROR] Pre-connect to server failed: {e}")
+                    self._failing = True
+                    break
+            else:
+                if self._failing:
+                    self.log(f"[NetGarden] Pre-connect to {self.server_host}:{self.server_port} recovered")
+                self._failing = False
+
+            with self._cond:
+                if self._stopped:
+                    closing = fresh
+                else:
+                    closing = []
+                    for entry in stale:
+                        # o que ja saiu pelo take() nesse meio tempo e do client agora
+                        if entry in self._ready:
+                            self._ready.remove(entry)
+                            closing.append(entry)
+                    self._ready.extend(fresh)
+            for sock, _, _ in closing:
+                _close(sock)
+
+            with self._cond:
+                if self._stopped:
+                    return
+                # take() no meio do connect: repoe ja, sem esperar
+                if len(self._ready) < self.size and not self._failing:
+                    continue
+                self._cond.wait(RETRY_DELAY if self._failing else HEALTH_INTERVAL)
+
+
+# conexao ociosa que o servidor fechou fica legivel com recv vazio
+def _alive(sock):
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return True
+        return bool(sock.recv(1, socket.MSG_PEEK))
+    except (OSError, ValueError):
+        return False
+
+
+def _close(sock):
+    try:
+        sock.close()
+    except OSError:
+        pass
@@ -0,0 +1,246 @@
+import re
+from NetGarden.CORE.NetStrings import netstrings
+
+# Linguagem de busca da caixa de filtro:
+#
+#   WCM                    ID (ou nome do NetStrings) contem "WCM"
+#   WCM msg~"hello"        e: campo msg contem hello (sem diferenciar maiusculas)
+#   SB x=10..20            x entre 10 e 20 (inclusive); tambem x>=10 x<=20
+#   ID=MY_POSITION_KEY     ID exato, aceitando o nome do NetStrings
+#   W.size.x>100           caminho com pontos; listas valem se qualquer item casar
+#   -p                     nega o termo
+#   mP or SB               "or" separa grupos; espacos sao "e"
+#
+# Nomes do NetStrings valem como apelido de chave (POSITION_X_KEY.. = x) e de
+# ID. Operadores: = != > >= < <= ~ (contem).
+
+OPERATORS = ("=", "!=", ">", ">=", "<", "<=", "~")
+ID_PATH = "ID"
+
+_TOKEN = re.compile(r'\s*(?:(?P<str>"(?:[^"\\]|\\.)*")|(?P<op>!=|>=|<=|=|>|<|~)|(?P<word>[^\s"=!<>~]+))')
+_NUMBER = re.compile(r"^-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?$")
+
+
+class QueryError(ValueError):
+    pass
+
+
+class Term:
+    __slots__ = ("path", "op", "value", "negate")
+
+    def __init__(self, path, op, value, negate=False):
+        # path None = palavra solta (casa com o ID); tuple de chaves pro resto
+        self.path = path
+        self.op = op
+        self.value = value
+        self.negate = negate
+
+    @property
+    def is_id(self):
+        return self.path is None or self.path == (ID_PATH,)
+
+    def __repr__(self):
+        path = "*" if self.path is None else ".".join(self.path)
+        return f"Term({'-' if self.negate else ''}{path} {self.op} {self.value!r})"
+
+
+class Query:
+    def __init__(self, text, groups):
+        self.text = text
+        self.groups = groups
+
+    @property
+    def has_fields(self):
+        return any(not term.is_id for group in self.groups for term in group)
+
+    def __bool__(self):
+        return bool(self.groups)
+
+
+def _value(raw, quoted):
+    if quoted:
+        return raw[1:-1].encode("utf-8").decode("unicode_escape") if "\\" in raw else raw[1:-1]
+    low = raw.lower()
+    if low in ("true", "false"):
+        return low == "true"
+    if low in ("null", "none"):
+        return None
+    if ".." in raw:
+        lo, _, hi = raw.partition("..")
+        if _NUMBER.match(lo) and _NUMBER.match(hi):
+            return (float(lo), float(hi))
+    if _NUMBER.match(raw):
+        return float(raw)
+    return raw
+
+
+def parse_query(text, aliases=None):
+    if aliases is None:
+        # indice reverso ja montado pelo StringTable (nome -> chave)
+        aliases = netstrings.keys
+
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise QueryError(f"unexpected character at {pos}: {text[pos]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        tokens.append((kind, m.group(kind)))
+
+    groups = [[]]
+    i = 0
+    while i < len(tokens):
+        kind, raw = tokens[i]
+        if kind == "op":
+            raise QueryError(f"operator {raw!r} without a field")
+        if kind == "word" and raw.lower() == "or":
+            if groups[-1]:
+                groups.append([])
+            i += 1
+            continue
+
+        negate = False
+        if kind == "word" and raw.startswith("-") and len(raw) > 1:
+            negate = True
+            raw = raw[1:]
+
+        if i + 1 < len(tokens) and tokens[i + 1][0] == "op":
+            op = tokens[i + 1][1]
+            if i + 2 >= len(tokens) or tokens[i + 2][0] == "op":
+                raise QueryError(f"missing value after {raw}{op}")
+            vkind, vraw = tokens[i + 2]
+            value = _value(vraw, vkind == "str")
+            if isinstance(value, tuple) and op != "=":
+                raise QueryError("ranges only work with '='")
+            path = tuple(aliases.get(part, part) for part in raw.split("."))
+            if path[0].upper() == ID_PATH and len(path) == 1:
+                path = (ID_PATH,)
+                if isinstance(value, str):
+                    value = aliases.get(value, value)
+            groups[-1].append(Term(path, op, value, negate))
+            i += 3
+            continue
+
+        value = raw[1:-1] if kind == "str" else raw
+        groups[-1].append(Term(None, "~", value, negate))
+        i += 1
+
+    return Query(text, [g for g in groups if g])
+
+
+# --- avaliacao direta num documento (linhas que o indice ainda nao cobre) ---
+
+def match_value(term, value):
+    op = term.op
+    want = term.value
+    if isinstance(value, bool) or isinstance(want, bool):
+        if op not in ("=", "!="):
+            return False
+        same = _bool_text(value) == _bool_text(want)
+        return same if op == "=" else not same
+    if isinstance(value, (int, float)):
+        if isinstance(want, tuple):
+            return want[0] <= value <= want[1]
+        if isinstance(want, float):
+            if op == "=":
+                return value == want
+            if op == "!=":
+                return value != want
+            if op == ">":
+                return value > want
+            if op == ">=":
+                return value >= want
+            if op == "<":
+                return value < want
+            if op == "<=":
+                return value <= want
+        value = format_number(value)
+    if not isinstance(value, str):
+        return False
+    if want is None or isinstance(want, tuple):
+        return False
+    if not isinstance(want, str):
+        want = format_number(want)
+    if op == "~":
+        return want.lower() in value.lower()
+    if op == "=":
+        return value == want
+    if op == "!=":
+        return value != want
+    if op == ">":
+        return value > want
+    if op == ">=":
+        return value >= want
+    if op == "<":
+        return value < want
+    if op == "<=":
+        return value <= want
+    return False
+
+
+def _bool_text(v):
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    return str(v).lower()
+
+
+# 10 e 10.0 viram "10" (o indice guarda todo numero como double)
+def format_number(v):
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def _flatten(values, out):
+    for v in values:
+        if isinstance(v, list):
+            _flatten(v, out)
+        else:
+            out.append(v)
+    return out
+
+
+def values_at(doc, path):
+    nodes = [doc]
+    for key in path:
+        found = []
+        for node in nodes:
+            if isinstance(node, dict):
+                if key in node:
+                    found.append(node[key])
+        nodes = _flatten(found, [])
+        if not nodes:
+            return []
+    return [v for v in nodes if not isinstance(v, (dict, list))]
+
+
+def match_id(term, packet_id, label=None):
+    if term.path is None:
+        want = str(term.value).lower()
+        if want in packet_id.lower():
+            return True
+        name = label(packet_id) if label is not None else None
+        return bool(name) and want in name.lower()
+    return match_value(term, packet_id)
+
+
+def match_fields(group, doc):
+    for term in group:
+        if term.is_id:
+            continue
+        hit = doc is not None and any(match_value(term, v) for v in values_at(doc, term.path))
+        if hit == term.negate:
+            return False
+    return True
+
+
+def match_ids(group, packet_id, label=None):
+    for term in group:
+        if term.is_id and match_id(term, packet_id, label) == term.negate:
+            return False
+    return True
+
+
+def matches(query, packet_id, doc, label=None):
+    return any(match_ids(group, packet_id, label) and match_fields(group, doc) for group in query.groups)
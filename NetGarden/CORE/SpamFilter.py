@@ -0,0 +1,145 @@
+import bisect
+import itertools
+import threading
+import collections
+from array import array
+
+DEFAULT_SPAM_THRESHOLD = 25
+DEFAULT_SPAM_WINDOW = 1.0
+
+
+# Estimador de taxa por ID (token bucket) rodando na thread do pipeline, antes
+# de qualquer coisa ir pro GUI. Cada ID tem um balde com `threshold` fichas que
+# enche a threshold/window por segundo; pacote sem ficha = ID passou do limite
+# e fica suprimido ate restore(). Sem janela fixa, entao rajadas que cruzam a
+# virada do segundo tambem sao pegas.
+#
+# As linhas suprimidas so ficam no PacketStore; aqui guardamos o numero delas
+# num array por ID, em vez de mandar uma por uma pro GUI. Com max_rows_per_id
+# so as N mais recentes de cada ID ficam guardadas (o resto vira so contagem).
+class SpamFilter:
+    def __init__(self, threshold_per_sec=DEFAULT_SPAM_THRESHOLD, window=DEFAULT_SPAM_WINDOW, auto=False, max_rows_per_id=0):
+        self.threshold = max(1, int(threshold_per_sec))
+        self.window = float(window)
+        self.auto = auto
+        self.max_rows_per_id = max(0, int(max_rows_per_id))
+        self.discarded = 0
+
+        self.hidden_ids = set()
+        self.suppressed = {}
+        self.counts = collections.Counter()
+        self.total = 0
+
+        self._buckets = {}
+        self._new_auto = []
+        self._lock = threading.Lock()
+
+    def set_threshold(self, threshold_per_sec):
+        with self._lock:
+            self.threshold = max(1, int(threshold_per_sec))
+            self._buckets.clear()
+
+    def set_cap(self, max_rows_per_id):
+        with self._lock:
+            self.max_rows_per_id = max(0, int(max_rows_per_id or 0))
+            for rows in self.suppressed.values():
+                self._trim(rows, self.max_rows_per_id)
+
+    def set_auto(self, enabled):
+        with self._lock:
+            self.auto = enabled
+            self._buckets.clear()
+
+    # True = entrega pro GUI; False = linha ficou guardada como suprimida
+    def offer(self, packet_id, now, row):
+        with self._lock:
+            if packet_id in self.hidden_ids:
+                self._suppress(packet_id, row)
+                return False
+            if not self.auto:
+                return True
+
+            bucket = self._buckets.get(packet_id)
+            if bucket is None:
+                self._buckets[packet_id] = [self.threshold - 1.0, now]
+                return True
+
+            tokens = bucket[0] + (now - bucket[1]) * self.threshold / self.window
+            if tokens > self.threshold:
+                tokens = self.threshold
+            bucket[1] = now
+            if tokens >= 1.0:
+                bucket[0] = tokens - 1.0
+                return True
+
+            del self._buckets[packet_id]
+            self.hidden_ids.add(packet_id)
+            self._new_auto.append(packet_id)
+            self._suppress(packet_id, row)
+            return False
+
+    def _suppress(self, packet_id, row):
+        rows = self.suppressed.get(packet_id)
+        if rows is None:
+            rows = self.suppressed[packet_id] = array("q")
+        # linha vinda do GUI pode ser mais velha que as ja suprimidas no core
+        if rows and row < rows[-1]:
+            bisect.insort(rows, row)
+        else:
+            rows.append(row)
+        self.counts[packet_id] += 1
+        self.total += 1
+
+        cap = self.max_rows_per_id
+        # corta com folga de 25% pra nao pagar o del[:n] a cada pacote
+        if cap and len(rows) > cap + (cap >> 2):
+            self._trim(rows, cap)
+
+    def _trim(self, rows, cap):
+        extra = len(rows) - cap
+        if cap and extra > 0:
+            del rows[:extra]
+            self.discarded += extra
+
+    # usado pelo GUI pra linhas que ja estavam no lote quando o ID foi ocultado
+    def suppress(self, packet_id, row):
+        with self._lock:
+            self._suppress(packet_id, row)
+
+    def is_hidden(self, packet_id):
+        return packet_id in self.hidden_ids
+
+    def hide(self, packet_id):
+        with self._lock:
+            self.hidden_ids.add(packet_id)
+
+    # IDs que viraram spam desde a ultima chamada (pro GUI logar)
+    def take_new(self):
+        with self._lock:
+            new, self._new_auto = self._new_auto, []
+        return new
+
+    def suppressed_count(self):
+        return self.total
+
+    # libera tudo: devolve as linhas suprimidas em ordem cronologica. Cada array
+    # ja e crescente, entao o sort so intercala as sequencias (timsort).
+    def restore(self):
+        with self._lock:
+            rows = array("q", sorted(itertools.chain.from_iterable(self.suppressed.values())))
+            self.hidden_ids.clear()
+            self.suppressed = {}
+            self.counts.clear()
+            self.total = 0
+            self.discarded = 0
+            self._buckets.clear()
+            self._new_auto = []
+        return rows
+
+    # troca de store: as linhas antigas nao valem mais, os IDs ocultos continuam
+    def clear_rows(self):
+        with self._lock:
+            self.suppressed = {}
+            self.counts.clear()
+            self.total = 0
+            self.discarded = 0
@@ -1,179 +1,311 @@
-import json
-import os
-from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QListWidget, QMessageBox, QComboBox
-)
-
-from NetGarden.GUI.i18n import load_settings, save_settings, tr, LANG_PT, LANG_EN
-
-RECENTS_PATH = os.path.join(os.path.dirname(__file__), "recent.json")
-
-
-def _load_recents():
-    if not os.path.exists(RECENTS_PATH):
-        return []
-    try:
-        with open(RECENTS_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data if isinstance(data, list) else []
-    except:
-        return []
-
-
-def _save_recents(items):
-    try:
-        with open(RECENTS_PATH, "w", encoding="utf-8") as f:
-            json.dump(items[:20], f, ensure_ascii=False, indent=2)
-    except:
-        pass
-
-
-class ConfigWindow(QWidget):
-    def __init__(self, on_start, lang):
-        super().__init__()
-        self.on_start = on_start
-        self.recents = _load_recents()
-        self.lang = lang
-
-        self.resize(820, 380)
-
-        root = QHBoxLayout()
-        left = QVBoxLayout()
-        right = QVBoxLayout()
-
-        # language row
-        lang_row = QHBoxLayout()
-        self.lang_label = QLabel()
-        self.lang_combo = QComboBox()
-        self.lang_combo.addItem(tr(LANG_PT, "ptbr"), LANG_PT)
-        self.lang_combo.addItem(tr(LANG_EN, "en"), LANG_EN)
-        self.lang_combo.setCurrentIndex(0 if self.lang == LANG_PT else 1)
-        self.lang_combo.currentIndexChanged.connect(self._on_lang_changed)
-        lang_row.addWidget(self.lang_label)
-        lang_row.addWidget(self.lang_combo)
-        left.addLayout(lang_row)
-
-        # fields
-        self.client_ip = QLineEdit("127.0.0.1")
-        self.client_port = QLineEdit("10001")
-
-        self.server_ip = QLineEdit("127.0.0.1")
-        self.server_port = QLineEdit("10001")
-
-        row1 = QHBoxLayout()
-        self.client_ip_label = QLabel()
-        row1.addWidget(self.client_ip_label)
-        row1.addWidget(self.client_ip)
-        self.btn_local = QPushButton()
-        self.btn_local.clicked.connect(lambda: self.client_ip.setText("127.0.0.1"))
-        row1.addWidget(self.btn_local)
-
-        row2 = QHBoxLayout()
-        self.client_port_label = QLabel()
-        row2.addWidget(self.client_port_label)
-        row2.addWidget(self.client_port)
-
-        row3 = QHBoxLayout()
-        self.server_ip_label = QLabel()
-        row3.addWidget(self.server_ip_label)
-        row3.addWidget(self.server_ip)
-
-        row4 = QHBoxLayout()
-        self.server_port_label = QLabel()
-        row4.addWidget(self.server_port_label)
-        row4.addWidget(self.server_port)
-
-        left.addSpacing(10)
-        left.addLayout(row1)
-        left.addLayout(row2)
-        left.addSpacing(12)
-        left.addLayout(row3)
-        left.addLayout(row4)
-        left.addSpacing(18)
-
-        self.btn_start = QPushButton()
-        self.btn_start.clicked.connect(self.start_clicked)
-        left.addWidget(self.btn_start)
-
-        # recents
-        self.recents_label = QLabel()
-        right.addWidget(self.recents_label)
-        self.recent_list = QListWidget()
-        self.recent_list.itemClicked.connect(self.pick_recent)
-        right.addWidget(self.recent_list)
-
-        self.btn_clear = QPushButton()
-        self.btn_clear.clicked.connect(self.clear_recents)
-        right.addWidget(self.btn_clear)
-
-        root.addLayout(left, 2)
-        root.addLayout(right, 1)
-        self.setLayout(root)
-
-        self.refresh_recents_ui()
-        self.apply_lang()
-
-    def _on_lang_changed(self):
-        self.lang = self.lang_combo.currentData()
-        save_settings({"lang": self.lang})
-        self.apply_lang()
-
-    def apply_lang(self):
-        self.setWindowTitle(tr(self.lang, "app_launcher_title"))
-
-        self.lang_label.setText(tr(self.lang, "language"))
-        self.client_ip_label.setText(tr(self.lang, "client_ip"))
-        self.client_port_label.setText(tr(self.lang, "client_port"))
-        self.server_ip_label.setText(tr(self.lang, "server_ip"))
-        self.server_port_label.setText(tr(self.lang, "server_port"))
-
-        self.btn_local.setText(tr(self.lang, "local_btn"))
-        self.btn_start.setText(tr(self.lang, "start_proxy"))
-        self.recents_label.setText(tr(self.lang, "recents"))
-        self.btn_clear.setText(tr(self.lang, "clear_recents"))
-
-    def refresh_recents_ui(self):
-        self.recent_list.clear()
-        for r in self.recents:
-            self.recent_list.addItem(
-                f"{r['client_ip']}:{r['client_port']} → {r['server_ip']}:{r['server_port']}"
-            )
-
-    def pick_recent(self, item):
-        idx = self.recent_list.row(item)
-        if idx < 0 or idx >= len(self.recents):
-            return
-        r = self.recents[idx]
-        self.client_ip.setText(r["client_ip"])
-        self.client_port.setText(str(r["client_port"]))
-        self.server_ip.setText(r["server_ip"])
-        self.server_port.setText(str(r["server_port"]))
-
-    def clear_recents(self):
-        self.recents = []
-        _save_recents(self.recents)
-        self.refresh_recents_ui()
-
-    def start_clicked(self):
-        try:
-            cfg = {
-                "client_ip": self.client_ip.text().strip(),
-                "client_port": int(self.client_port.text().strip()),
-                "server_ip": self.server_ip.text().strip(),
-                "server_port": int(self.server_port.text().strip()),
-                "lang": self.lang
-            }
-        except:
-            QMessageBox.warning(self, "NetGarden", tr(self.lang, "invalid_ports"))
-            return
-
-        self.recents = [r for r in self.recents if not (
-            r["client_ip"] == cfg["client_ip"] and r["client_port"] == cfg["client_port"] and
-            r["server_ip"] == cfg["server_ip"] and r["server_port"] == cfg["server_port"]
-        )]
-        self.recents.insert(0, cfg)
-        _save_recents(self.recents)
-        self.refresh_recents_ui()
-
-        self.on_start(cfg)
+import json
+import os
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QListWidget, QMessageBox, QComboBox, QFileDialog
+)
+
+from NetGarden.GUI.i18n import load_settings, save_settings, tr, LANG_PT, LANG_EN
+from NetGarden.CORE.Pipeline import POLICIES, POLICY_DROP
+from NetGarden.CORE.Batcher import DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL_MS
+from NetGarden.CORE.Capture import CAPTURE_EXT
+
+RECENTS_PATH = os.path.join(os.path.dirname(__file__), "recent.json")
+
+
+def _load_recents():
+    if not os.path.exists(RECENTS_PATH):
+        return []
+    try:
+        with open(RECENTS_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    except:
+        return []
+
+
+def _save_recents(items):
+    try:
+        with open(RECENTS_PATH, "w", encoding="utf-8") as f:
+            json.dump(items[:20], f, ensure_ascii=False, indent=2)
+    except:
+        pass
+
+
+class ConfigWindow(QWidget):
+    def __init__(self, on_start, lang, on_open_capture=None):
+        super().__init__()
+        self.on_start = on_start
+        self.on_open_capture = on_open_capture
+        self.recents = _load_recents()
+        self.lang = lang
+
+        self.resize(820, 380)
+
+        root = QHBoxLayout()
+        left = QVBoxLayout()
+        right = QVBoxLayout()
+
+        # language row
+        lang_row = QHBoxLayout()
+        self.lang_label = QLabel()
+        self.lang_combo = QComboBox()
+        self.lang_combo.addItem(tr(LANG_PT, "ptbr"), LANG_PT)
+        self.lang_combo.addItem(tr(LANG_EN, "en"), LANG_EN)
+        self.lang_combo.setCurrentIndex(0 if self.lang == LANG_PT else 1)
+        self.lang_combo.currentIndexChanged.connect(self._on_lang_changed)
+        lang_row.addWidget(self.lang_label)
+        lang_row.addWidget(self.lang_combo)
+        left.addLayout(lang_row)
+
+        # fields
+        self.client_ip = QLineEdit("127.0.0.1")
+        self.client_port = QLineEdit("10001")
+
+        self.server_ip = QLineEdit("127.0.0.1")
+        self.server_port = QLineEdit("10001")
+
+        row1 = QHBoxLayout()
+        self.client_ip_label = QLabel()
+        row1.addWidget(self.client_ip_label)
+        row1.addWidget(self.client_ip)
+        self.btn_local = QPushButton()
+        self.btn_local.clicked.connect(lambda: self.client_ip.setText("127.0.0.1"))
+        row1.addWidget(self.btn_local)
+
+        row2 = QHBoxLayout()
+        self.client_port_label = QLabel()
+        row2.addWidget(self.client_port_label)
+        row2.addWidget(self.client_port)
+
+        row3 = QHBoxLayout()
+        self.server_ip_label = QLabel()
+        row3.addWidget(self.server_ip_label)
+        row3.addWidget(self.server_ip)
+
+        row4 = QHBoxLayout()
+        self.server_port_label = QLabel()
+        row4.addWidget(self.server_port_label)
+        row4.addWidget(self.server_port)
+
+        left.addSpacing(10)
+        left.addLayout(row1)
+        left.addLayout(row2)
+        left.addSpacing(12)
+        left.addLayout(row3)
+        left.addLayout(row4)
+        left.addSpacing(12)
+
+        # inspection queue
+        row5 = QHBoxLayout()
+        self.queue_policy_label = QLabel()
+        self.queue_policy = QComboBox()
+        for policy in POLICIES:
+            self.queue_policy.addItem("", policy)
+        row5.addWidget(self.queue_policy_label)
+        row5.addWidget(self.queue_policy)
+        left.addLayout(row5)
+
+        # GUI batching
+        row6 = QHBoxLayout()
+        self.batch_size_label = QLabel()
+        self.batch_size = QLineEdit(str(DEFAULT_BATCH_SIZE))
+        self.flush_interval_label = QLabel()
+        self.flush_interval = QLineEdit(str(DEFAULT_FLUSH_INTERVAL_MS))
+        row6.addWidget(self.batch_size_label)
+        row6.addWidget(self.batch_size)
+        row6.addWidget(self.flush_interval_label)
+        row6.addWidget(self.flush_interval)
+        left.addLayout(row6)
+
+        # retention
+        row7 = QHBoxLayout()
+        self.max_packets_label = QLabel()
+        self.max_packets = QLineEdit("0")
+        self.max_mb_label = QLabel()
+        self.max_mb = QLineEdit("0")
+        row7.addWidget(self.max_packets_label)
+        row7.addWidget(self.max_packets)
+        row7.addWidget(self.max_mb_label)
+        row7.addWidget(self.max_mb)
+        left.addLayout(row7)
+
+        row7b = QHBoxLayout()
+        self.max_hidden_label = QLabel()
+        self.max_hidden = QLineEdit("0")
+        self.preconnect_label = QLabel()
+        self.preconnect = QLineEdit("0")
+        row7b.addWidget(self.max_hidden_label)
+        row7b.addWidget(self.max_hidden)
+        row7b.addWidget(self.preconnect_label)
+        row7b.addWidget(self.preconnect)
+        left.addLayout(row7b)
+
+        # capture file
+        row8 = QHBoxLayout()
+        self.capture_path_label = QLabel()
+        self.capture_path = QLineEdit()
+        self.btn_capture_browse = QPushButton()
+        self.btn_capture_browse.clicked.connect(self.browse_capture_path)
+        row8.addWidget(self.capture_path_label)
+        row8.addWidget(self.capture_path)
+        row8.addWidget(self.btn_capture_browse)
+        left.addLayout(row8)
+
+        # metrics export
+        row9 = QHBoxLayout()
+        self.metrics_port_label = QLabel()
+        self.metrics_port = QLineEdit("0")
+        self.metrics_file_label = QLabel()
+        self.metrics_file = QLineEdit()
+        row9.addWidget(self.metrics_port_label)
+        row9.addWidget(self.metrics_port)
+        row9.addWidget(self.metrics_file_label)
+        row9.addWidget(self.metrics_file)
+        left.addLayout(row9)
+        left.addSpacing(18)
+
+        self.btn_start = QPushButton()
+        self.btn_start.clicked.connect(self.start_clicked)
+        left.addWidget(self.btn_start)
+
+        self.btn_open_capture = QPushButton()
+        self.btn_open_capture.clicked.connect(self.open_capture_clicked)
+        left.addWidget(self.btn_open_capture)
+
+        # recents
+        self.recents_label = QLabel()
+        right.addWidget(self.recents_label)
+        self.recent_list = QListWidget()
+        self.recent_list.itemClicked.connect(self.pick_recent)
+        right.addWidget(self.recent_list)
+
+        self.btn_clear = QPushButton()
+        self.btn_clear.clicked.connect(self.clear_recents)
+        right.addWidget(self.btn_clear)
+
+        root.addLayout(left, 2)
+        root.addLayout(right, 1)
+        self.setLayout(root)
+
+        self.refresh_recents_ui()
+        self.apply_lang()
+
+    def _on_lang_changed(self):
+        self.lang = self.lang_combo.currentData()
+        save_settings({"lang": self.lang})
+        self.apply_lang()
+
+    def apply_lang(self):
+        self.setWindowTitle(tr(self.lang, "app_launcher_title"))
+
+        self.lang_label.setText(tr(self.lang, "language"))
+        self.client_ip_label.setText(tr(self.lang, "client_ip"))
+        self.client_port_label.setText(tr(self.lang, "client_port"))
+        self.server_ip_label.setText(tr(self.lang, "server_ip"))
+        self.server_port_label.setText(tr(self.lang, "server_port"))
+        self.queue_policy_label.setText(tr(self.lang, "queue_policy"))
+        self.batch_size_label.setText(tr(self.lang, "batch_size"))
+        self.flush_interval_label.setText(tr(self.lang, "flush_interval"))
+        self.max_packets_label.setText(tr(self.lang, "max_packets"))
+        self.max_mb_label.setText(tr(self.lang, "max_mb"))
+        for field in (self.max_packets, self.max_mb):
+            field.setToolTip(tr(self.lang, "retention_help"))
+        self.max_hidden_label.setText(tr(self.lang, "max_hidden"))
+        self.preconnect_label.setText(tr(self.lang, "preconnect"))
+        self.capture_path_label.setText(tr(self.lang, "capture_path"))
+        self.capture_path.setPlaceholderText(tr(self.lang, "capture_path_ph"))
+        self.btn_capture_browse.setText(tr(self.lang, "browse"))
+        self.btn_open_capture.setText(tr(self.lang, "open_capture"))
+        self.metrics_port_label.setText(tr(self.lang, "metrics_port"))
+        self.metrics_file_label.setText(tr(self.lang, "metrics_file"))
+        self.metrics_file.setPlaceholderText(tr(self.lang, "metrics_file_ph"))
+        for i in range(self.queue_policy.count()):
+            self.queue_policy.setItemText(i, tr(self.lang, f"queue_policy_{self.queue_policy.itemData(i)}"))
+
+        self.btn_local.setText(tr(self.lang, "local_btn"))
+        self.btn_start.setText(tr(self.lang, "start_proxy"))
+        self.recents_label.setText(tr(self.lang, "recents"))
+        self.btn_clear.setText(tr(self.lang, "clear_recents"))
+
+    def refresh_recents_ui(self):
+        self.recent_list.clear()
+        for r in self.recents:
+            self.recent_list.addItem(
+                f"{r['client_ip']}:{r['client_port']} → {r['server_ip']}:{r['server_port']}"
+            )
+
+    def pick_recent(self, item):
+        idx = self.recent_list.row(item)
+        if idx < 0 or idx >= len(self.recents):
+            return
+        r = self.recents[idx]
+        self.client_ip.setText(r["client_ip"])
+        self.client_port.setText(str(r["client_port"]))
+        self.server_ip.setText(r["server_ip"])
+        self.server_port.setText(str(r["server_port"]))
+        idx = self.queue_policy.findData(r.get("queue_policy", POLICY_DROP))
+        if idx >= 0:
+            self.queue_policy.setCurrentIndex(idx)
+        self.batch_size.setText(str(r.get("batch_size", DEFAULT_BATCH_SIZE)))
+        self.flush_interval.setText(str(r.get("flush_interval_ms", DEFAULT_FLUSH_INTERVAL_MS)))
+        self.max_packets.setText(str(r.get("max_packets", 0)))
+        self.max_mb.setText(str(r.get("max_mb", 0)))
+        self.max_hidden.setText(str(r.get("max_hidden", 0)))
+        self.preconnect.setText(str(r.get("preconnect", 0)))
+        self.metrics_port.setText(str(r.get("metrics_port", 0)))
+        self.metrics_file.setText(r.get("metrics_file", ""))
+
+    def browse_capture_path(self):
+        path, _ = QFileDialog.getSaveFileName(self, "NetGarden", self.capture_path.text(), tr(self.lang, "capture_filter"))
+        if path:
+            if not path.endswith(CAPTURE_EXT):
+                path += CAPTURE_EXT
+            self.capture_path.setText(path)
+
+    def open_capture_clicked(self):
+        path, _ = QFileDialog.getOpenFileName(self, "NetGarden", "", tr(self.lang, "capture_filter"))
+        if not path or not self.on_open_capture:
+            return
+        try:
+            self.on_open_capture(path)
+        except Exception as e:
+            QMessageBox.warning(self, "NetGarden", tr(self.lang, "capture_open_failed", error=e))
+
+    def clear_recents(self):
+        self.recents = []
+        _save_recents(self.recents)
+        self.refresh_recents_ui()
+
+    def start_clicked(self):
+        try:
+            cfg = {
+                "client_ip": self.client_ip.text().strip(),
+                "client_port": int(self.client_port.text().strip()),
+                "server_ip": self.server_ip.text().strip(),
+                "server_port": int(self.server_port.text().strip()),
+                "queue_policy": self.queue_policy.currentData(),
+                "batch_size": int(self.batch_size.text().strip()),
+                "flush_interval_ms": int(self.flush_interval.text().strip()),
+                "max_packets": int(self.max_packets.text().strip()),
+                "max_mb": int(self.max_mb.text().strip()),
+                "max_hidden": int(self.max_hidden.text().strip() or 0),
+                "preconnect": int(self.preconnect.text().strip() or 0),
+                "capture_path": self.capture_path.text().strip(),
+                "metrics_port": int(self.metrics_port.text().strip() or 0),
+                "metrics_file": self.metrics_file.text().strip(),
+                "lang": self.lang
+            }
+        except:
+            QMessageBox.warning(self, "NetGarden", tr(self.lang, "invalid_ports"))
+            return
+
+        self.recents = [r for r in self.recents if not (
+            r["client_ip"] == cfg["client_ip"] and r["client_port"] == cfg["client_port"] and
+            r["server_ip"] == cfg["server_ip"] and r["server_port"] == cfg["server_port"]
+        )]
+        self.recents.insert(0, cfg)
+        _save_recents(self.recents)
+        self.refresh_recents_ui()
+
+        self.on_start(cfg)
@@ -0,0 +1,222 @@
+import itertools
+from PySide6.QtCore import Qt, QAbstractItemModel, QModelIndex
+from PySide6.QtGui import QColor
+
+PAGE_SIZE = 200
+BYTES_PER_LINE = 16
+MAX_VALUE_CHARS = 200
+MAX_TOOLTIP_CHARS = 4000
+# expansao automatica ao selecionar um pacote: ate essa profundidade e no
+# maximo essa quantidade de linhas criadas; o resto abre sob demanda
+AUTO_EXPAND_DEPTH = 3
+AUTO_EXPAND_ROWS = 500
+
+_MORE_COLOR = QColor(120, 120, 120)
+
+
+class _Node:
+    __slots__ = ("parent", "row", "key", "text", "value", "children", "loaded", "more")
+
+    def __init__(self, parent, row, key, value, text=None, more=False):
+        self.parent = parent
+        self.row = row
+        self.key = key
+        self.value = value
+        # text None = formatado do valor; children None = ainda nao carregado
+        self.text = text
+        self.children = None
+        self.loaded = 0
+        self.more = more
+
+
+def _total(value):
+    if isinstance(value, (bytes, bytearray)):
+        return (len(value) + BYTES_PER_LINE - 1) // BYTES_PER_LINE
+    if isinstance(value, (dict, list)):
+        return len(value)
+    return 0
+
+
+def _short(text, limit):
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text)} chars)"
+
+
+def _hex_line(data, start):
+    chunk = bytes(data[start:start + BYTES_PER_LINE])
+    ascii_text = "".join(chr(b) if 32 <= b < 127 else "." for b in chunk)
+    return f"{chunk.hex(' '):<{BYTES_PER_LINE * 3}} {ascii_text}"
+
+
+# Arvore do inspector sobre o documento decodificado. Nenhum item e criado
+# antes da hora: os filhos de um no so existem quando a view pede (no expand),
+# e listas/dicts/blobs grandes vem em paginas de PAGE_SIZE com um item
+# "mostrar mais" no fim (load_more).
+class InspectorModel(QAbstractItemModel):
+    def __init__(self, more_text=None, parent=None):
+        super().__init__(parent)
+        self._root = _Node(None, 0, "", None)
+        self._root.children = []
+        # more_text(restantes) -> texto do item de paginacao
+        self.more_text = more_text or (lambda remaining: f"... ({remaining})")
+        # key_label(chave) -> texto das chaves de dict (NetStrings); None = chave crua
+        self.key_label = None
+
+    # items: (chave, texto, valor); os filhos de cada um saem do valor
+    def set_items(self, items):
+        self.beginResetModel()
+        root = self._root
+        root.children = [_Node(root, row, key, value, text=text) for row, (key, text, value) in enumerate(items)]
+        self.endResetModel()
+
+    def clear(self):
+        self.set_items(())
+
+    def _node(self, index):
+        return index.internalPointer() if index.isValid() else self._root
+
+    def _children(self, node):
+        if node.children is None:
+            node.children = []
+            node.children.extend(self._page(node))
+        return node.children
+
+    # proxima pagina de filhos de node (mais o item "mostrar mais", se sobrar)
+    def _page(self, node):
+        value = node.value
+        total = _total(value)
+        start = node.loaded
+        end = min(total, start + PAGE_SIZE)
+        row = len(node.children)
+        page = []
+
+        if isinstance(value, dict):
+            for key, item in itertools.islice(value.items(), start, end):
+                page.append(_Node(node, row + len(page), str(key), item))
+        elif isinstance(value, list):
+            for i in range(start, end):
+                page.append(_Node(node, row + len(page), f"[{i}]", value[i]))
+        elif isinstance(value, (bytes, bytearray)):
+            for line in range(start, end):
+                offset = line * BYTES_PER_LINE
+                page.append(_Node(node, row + len(page), f"{offset:08x}", None, text=_hex_line(value, offset)))
+
+        node.loaded = end
+        if end < total:
+            page.append(_Node(node, row + len(page), self.more_text(total - end), None, text="", more=True))
+        return page
+
+    def index(self, row, column, parent=QModelIndex()):
+        if column < 0 or column > 1 or row < 0:
+            return QModelIndex()
+        children = self._children(self._node(parent))
+        if row >= len(children):
+            return QModelIndex()
+        return self.createIndex(row, column, children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = self._node(parent)
+        if node is not self._root and not _total(node.value):
+            return 0
+        return len(self._children(node))
+
+    # a seta de expandir nao pode custar os filhos
+    def hasChildren(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return False
+        node = self._node(parent)
+        if node is self._root:
+            return bool(node.children)
+        return _total(node.value) > 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 2
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ("Field", "Value")[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                if self.key_label is not None and isinstance(node.parent.value, dict):
+                    return self.key_label(node.key)
+                return node.key
+            return _short(self.value_text(node), MAX_VALUE_CHARS)
+        if role == Qt.ToolTipRole and index.column() == 1 and not node.more:
+            text = self.value_text(node)
+            return _short(text, MAX_TOOLTIP_CHARS) if len(text) > MAX_VALUE_CHARS else None
+        if role == Qt.ForegroundRole and node.more:
+            return _MORE_COLOR
+        return None
+
+    def value_text(self, node):
+        if node.text is not None:
+            return node.text
+        value = node.value
+        if isinstance(value, dict):
+            return f"{{{len(value)}}}"
+        if isinstance(value, list):
+            return f"[{len(value)}]"
+        if isinstance(value, (bytes, bytearray)):
+            return f"<{len(value)} bytes>"
+        return str(value)
+
+    def is_more(self, index):
+        return index.isValid() and index.internalPointer().more
+
+    # troca o item "mostrar mais" pela proxima pagina
+    def load_more(self, index):
+        if not self.is_more(index):
+            return
+        more = index.internalPointer()
+        node = more.parent
+        parent_index = self.parent(index)
+        first = more.row
+
+        self.beginRemoveRows(parent_index, first, first)
+        node.children.pop()
+        self.endRemoveRows()
+
+        page = self._page(node)
+        self.beginInsertRows(parent_index, first, first + len(page) - 1)
+        node.children.extend(page)
+        self.endInsertRows()
+
+
+# expande em largura ate depth niveis, parando quando as linhas criadas
+# passariam de max_rows; nos grandes ficam fechados (abrem sob demanda)
+def auto_expand(view, model, depth=AUTO_EXPAND_DEPTH, max_rows=AUTO_EXPAND_ROWS):
+    budget = max_rows
+    level = [QModelIndex()]
+    for _ in range(depth):
+        next_level = []
+        for parent in level:
+            for row in range(model.rowCount(parent)):
+                index = model.index(row, 0, parent)
+                if not model.hasChildren(index):
+                    continue
+                count = min(_total(index.internalPointer().value), PAGE_SIZE + 1)
+                if count > budget:
+                    continue
+                budget -= count
+                view.expand(index)
+                next_level.append(index)
+        level = next_level
+        if not level:
+            break
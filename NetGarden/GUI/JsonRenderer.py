@@ -0,0 +1,132 @@
+import sys
+import json
+import datetime
+import threading
+from collections import OrderedDict
+from PySide6.QtCore import QObject, Signal
+
+from NetGarden.CORE.NetStrings import translate_keys
+
+DEFAULT_RENDER_CACHE_BYTES = 64 * 1024 * 1024
+# a cada tantos pedacos do iterencode o worker confere se o pedido ainda vale
+_CANCEL_CHECK = 4096
+
+
+def json_safe(obj):
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.hex()
+    return str(obj)
+
+
+class _Cancelled(Exception):
+    pass
+
+
+# LRU de texto renderizado por chave (seq do pacote), limitado pelo tamanho das strings
+class RenderCache:
+    def __init__(self, max_bytes=DEFAULT_RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._items = OrderedDict()
+
+    def get(self, key):
+        text = self._items.get(key)
+        if text is not None:
+            self._items.move_to_end(key)
+        return text
+
+    def put(self, key, text):
+        size = sys.getsizeof(text)
+        if key is None or size > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= sys.getsizeof(old)
+        self._items[key] = text
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, dropped = self._items.popitem(last=False)
+            self.bytes -= sys.getsizeof(dropped)
+
+    def clear(self):
+        self._items.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+# Decode + json.dumps do modo texto numa thread so. So existe um pedido
+# pendente: um submit novo toma o lugar do anterior, e o que esta rodando
+# aborta no meio do iterencode quando a geracao muda (selecao trocou).
+# O resultado volta pela signal rendered(geracao, chave, texto), ja na thread do
+# GUI; chave e a do cache (seq do pacote, se nao vier outra) e texto None = pacote
+# sem BSON. Com key_label as chaves do documento saem traduzidas (NetStrings).
+class JsonRenderer(QObject):
+    rendered = Signal(int, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cond = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="json-render", daemon=True)
+        self._thread.start()
+
+    def submit(self, generation, packet, key=None, key_label=None):
+        if key is None:
+            key = getattr(packet, "seq", None)
+        with self._cond:
+            self._generation = generation
+            self._pending = (generation, packet, key, key_label)
+            self._cond.notify()
+
+    # descarta o pendente e aborta o que esta rodando
+    def cancel(self, generation):
+        with self._cond:
+            self._generation = generation
+            self._pending = None
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._generation = -1
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                generation, packet, key, key_label = self._pending
+                self._pending = None
+            try:
+                text = self._render(generation, packet, key_label)
+            except _Cancelled:
+                continue
+            self.rendered.emit(generation, key, text)
+
+    def _render(self, generation, packet, key_label=None):
+        parsed = getattr(packet, "parsed", None)
+        if parsed is None:
+            return None
+        try:
+            if key_label is not None:
+                parsed = translate_keys(parsed, key_label)
+            parts = []
+            encoder = json.JSONEncoder(indent=2, ensure_ascii=False, default=json_safe)
+            for i, part in enumerate(encoder.iterencode(parsed)):
+                if i % _CANCEL_CHECK == 0 and self._generation != generation:
+                    raise _Cancelled()
+                parts.append(part)
+            return "".join(parts)
+        except _Cancelled:
+            raise
+        except Exception as e:
+            return f"Falha ao formatar: {e}\n\n{str(parsed)}"
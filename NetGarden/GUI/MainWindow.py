@@ -1,439 +1,841 @@
-import json
-import datetime
-from PySide6.QtWidgets import (
-    QMainWindow, QListWidget, QTreeWidget, QTreeWidgetItem,
-    QTextEdit, QSplitter, QWidget, QVBoxLayout,
-    QLineEdit, QLabel, QHBoxLayout, QMenu, QPushButton
-)
-from PySide6.QtCore import Qt, QTimer, Signal
-from PySide6.QtGui import QColor
-
-from NetGarden.CORE.NetStrings import NETSTRINGS
-from NetGarden.GUI.i18n import tr
-
-
-class MainWindow(QMainWindow):
-    packet_signal = Signal(object)
-    log_signal = Signal(str)
-
-    def __init__(self, lang):
-        super().__init__()
-        self.lang = lang
-
-        self.packet_counter_client = 0
-        self.packet_counter_server = 0
-
-        self.packet_colors = {}
-        self.packet_items_by_id = {}
-        self.filter_text = ""
-        self.string_mode = False
-
-        self.hidden_ids = set()
-        self.hidden_packets = []
-
-        self.auto_hide_spam = False
-        self.spam_threshold_per_sec = 25
-        self._per_id_hits = {}
-        self._per_id_hits_window_ms = 1000
-
-        self.saved_packets = []
-        self.saved_window = None
-        self.current_selected_packet = None
-
-        self.packet_signal.connect(self._add_packet_safe)
-        self.log_signal.connect(self._add_log_safe)
-
-        top_bar = QHBoxLayout()
-        self.filter_box = QLineEdit()
-        self.filter_box.textChanged.connect(self.set_filter)
-
-        self.options_btn = QPushButton()
-        self.options_btn.clicked.connect(self.show_options_menu)
-
-        self.stats_label = QLabel()
-
-        top_bar.addWidget(self.filter_box)
-        top_bar.addWidget(self.options_btn)
-        top_bar.addWidget(self.stats_label)
-
-        top_widget = QWidget()
-        top_widget.setLayout(top_bar)
-
-        self.client_list = QListWidget()
-        self.server_list = QListWidget()
-
-        self.client_list.itemClicked.connect(self.inspect)
-        self.server_list.itemClicked.connect(self.inspect)
-
-        self.client_list.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.server_list.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.client_list.customContextMenuRequested.connect(self.context_menu)
-        self.server_list.customContextMenuRequested.connect(self.context_menu)
-
-        split_lists = QSplitter(Qt.Horizontal)
-        split_lists.addWidget(self.client_list)
-        split_lists.addWidget(self.server_list)
-
-        self.inspect_mode = "tree"
-        self.inspect_mode_btn = QPushButton()
-        self.inspect_mode_btn.clicked.connect(self.toggle_inspect_mode)
-
-        self.inspector = QTreeWidget()
-        self.inspector.setHeaderLabels(["Field", "Value"])
-
-        self.details = QTextEdit()
-        self.details.setReadOnly(True)
-        self.details.hide()
-
-        self.inspect_container = QWidget()
-        inspect_layout = QVBoxLayout()
-        inspect_layout.setContentsMargins(0, 0, 0, 0)
-        inspect_layout.addWidget(self.inspect_mode_btn)
-        inspect_layout.addWidget(self.inspector)
-        inspect_layout.addWidget(self.details)
-        self.inspect_container.setLayout(inspect_layout)
-
-        self.console = QTextEdit()
-        self.console.setReadOnly(True)
-
-        split_bottom = QSplitter(Qt.Vertical)
-        split_bottom.addWidget(self.inspect_container)
-        split_bottom.addWidget(self.console)
-
-        main_split = QSplitter(Qt.Vertical)
-        main_split.addWidget(top_widget)
-        main_split.addWidget(split_lists)
-        main_split.addWidget(split_bottom)
-
-        self.setCentralWidget(main_split)
-
-        self.stats_timer = QTimer()
-        self.stats_timer.timeout.connect(self.update_stats)
-        self.stats_timer.start(500)
-
-        self.spam_timer = QTimer()
-        self.spam_timer.timeout.connect(self.reset_spam_window)
-        self.spam_timer.start(self._per_id_hits_window_ms)
-
-        self.apply_lang()
-        self._seed_inspector()
-
-    def apply_lang(self):
-        self.setWindowTitle(tr(self.lang, "main_title"))
-        self.filter_box.setPlaceholderText(tr(self.lang, "filter_ph"))
-        self.options_btn.setText(tr(self.lang, "options"))
-        self.inspect_mode_btn.setText(tr(self.lang, "mode_tree"))
-        self.details.setPlaceholderText(tr(self.lang, "decoded_hint"))
-        self.update_stats()
-
-    def _seed_inspector(self):
-        self.inspector.clear()
-        QTreeWidgetItem(self.inspector, ["NetGarden", tr(self.lang, "tree_hint_left")])
-        self.inspector.expandAll()
-
-    def add_packet(self, packet):
-        self.packet_signal.emit(packet)
-
-    def add_log(self, message):
-        self.log_signal.emit(message)
-
-    def _add_log_safe(self, message):
-        self.console.append(message)
-
-    def _json_safe(self, obj):
-        if isinstance(obj, (datetime.datetime, datetime.date)):
-            return obj.isoformat()
-        if isinstance(obj, (bytes, bytearray)):
-            return obj.hex()
-        return str(obj)
-
-    def toggle_inspect_mode(self):
-        if self.inspect_mode == "tree":
-            self.inspect_mode = "text"
-            self.inspect_mode_btn.setText(tr(self.lang, "mode_decode"))
-            self.inspector.hide()
-            self.details.show()
-        else:
-            self.inspect_mode = "tree"
-            self.inspect_mode_btn.setText(tr(self.lang, "mode_tree"))
-            self.details.hide()
-            self.inspector.show()
-
-        if self.current_selected_packet is not None:
-            self.render_inspection(self.current_selected_packet)
-
-    def _add_packet_safe(self, packet):
-        packet_id = getattr(packet, "id", "?")
-
-        if self.auto_hide_spam:
-            self._per_id_hits[packet_id] = self._per_id_hits.get(packet_id, 0) + 1
-            if self._per_id_hits[packet_id] >= self.spam_threshold_per_sec:
-                if packet_id not in self.hidden_ids:
-                    self.hidden_ids.add(packet_id)
-                    self.console.append(
-                        f"[NetGarden] Auto-spam: hiding '{packet_id}' (>= {self.spam_threshold_per_sec}/s)"
-                    )
-
-        if packet_id in self.hidden_ids:
-            self.hidden_packets.append(packet)
-            return
-
-        if self.filter_text and self.filter_text.lower() not in packet_id.lower():
-            return
-
-        display_id = packet_id
-        if self.string_mode:
-            display_id = self.resolve_string(packet_id)
-
-        timestamp = getattr(packet, "timestamp", "")
-        direction = getattr(packet, "direction", "")
-
-        text = f"[{timestamp}] {display_id}"
-
-        if direction == "client":
-            self.packet_counter_client += 1
-            self.client_list.addItem(text)
-            item = self.client_list.item(self.client_list.count() - 1)
-            self.client_list.scrollToBottom()
-        else:
-            self.packet_counter_server += 1
-            self.server_list.addItem(text)
-            item = self.server_list.item(self.server_list.count() - 1)
-            self.server_list.scrollToBottom()
-
-        item.setData(Qt.UserRole, packet)
-        self.apply_color(item, packet_id)
-        self.register_packet_item(packet_id, item)
-
-    def render_inspection(self, packet):
-        if self.inspect_mode == "tree":
-            self._render_tree(packet)
-        else:
-            self._render_text(packet)
-
-    def _render_tree(self, packet):
-        self.inspector.clear()
-        pid = getattr(packet, "id", "")
-        direction = getattr(packet, "direction", "")
-        timestamp = getattr(packet, "timestamp", "")
-
-        root = QTreeWidgetItem(self.inspector, ["ID", str(pid)])
-        QTreeWidgetItem(self.inspector, ["Direction", str(direction)])
-        QTreeWidgetItem(self.inspector, ["Time", str(timestamp)])
-
-        parsed = getattr(packet, "parsed", None)
-        self.add_tree(root, parsed)
-        self.inspector.expandAll()
-
-    def _render_text(self, packet):
-        self.details.clear()
-        parsed = getattr(packet, "parsed", None)
-        if parsed is None:
-            self.details.setPlainText(tr(self.lang, "no_bson"))
-            return
-        try:
-            pretty = json.dumps(parsed, indent=2, ensure_ascii=False, default=self._json_safe)
-            self.details.setPlainText(pretty)
-        except Exception as e:
-            self.details.setPlainText(f"Falha ao formatar: {e}\n\n{str(parsed)}")
-
-    def inspect(self, item):
-        packet = item.data(Qt.UserRole)
-        self.current_selected_packet = packet
-        self.render_inspection(packet)
-
-    def add_tree(self, parent, data):
-        if isinstance(data, dict):
-            for key, value in data.items():
-                if isinstance(value, (dict, list)):
-                    node = QTreeWidgetItem(parent, [str(key), ""])
-                    self.add_tree(node, value)
-                else:
-                    QTreeWidgetItem(parent, [str(key), str(value)])
-        elif isinstance(data, list):
-            for i, v in enumerate(data):
-                node = QTreeWidgetItem(parent, [f"[{i}]", ""])
-                self.add_tree(node, v)
-        elif data is None:
-            QTreeWidgetItem(parent, ["value", "None"])
-        else:
-            QTreeWidgetItem(parent, ["value", str(data)])
-
-    def set_filter(self, text):
-        self.filter_text = text
-
-    def resolve_string(self, packet_id):
-        if packet_id in NETSTRINGS:
-            return f"{NETSTRINGS[packet_id]} ({packet_id})"
-        return packet_id
-
-    def show_options_menu(self):
-        menu = QMenu(self)
-
-        act_strings = menu.addAction(tr(self.lang, "opt_string_mode"))
-        act_strings.setCheckable(True)
-        act_strings.setChecked(self.string_mode)
-        act_strings.triggered.connect(lambda _: self.set_string_mode(not self.string_mode))
-
-        act_auto_spam = menu.addAction(tr(self.lang, "opt_auto_spam"))
-        act_auto_spam.setCheckable(True)
-        act_auto_spam.setChecked(self.auto_hide_spam)
-        act_auto_spam.triggered.connect(lambda _: self.set_auto_spam(not self.auto_hide_spam))
-
-        menu.addSeparator()
-
-        act_restore = menu.addAction(tr(self.lang, "opt_restore_spam"))
-        act_restore.triggered.connect(self.clear_spams)
-
-        act_saved = menu.addAction(tr(self.lang, "opt_saved"))
-        act_saved.triggered.connect(self.open_saved_packets)
-
-        menu.exec(self.options_btn.mapToGlobal(self.options_btn.rect().bottomLeft()))
-
-    def set_string_mode(self, enabled):
-        self.string_mode = enabled
-        self.console.append(tr(self.lang, "log_string_on" if enabled else "log_string_off"))
-
-    def set_auto_spam(self, enabled):
-        self.auto_hide_spam = enabled
-        self.console.append(tr(self.lang, "log_spam_on" if enabled else "log_spam_off"))
-
-    def context_menu(self, pos):
-        widget = self.sender()
-        item = widget.itemAt(pos)
-        if not item:
-            return
-
-        packet = item.data(Qt.UserRole)
-        packet_id = getattr(packet, "id", "")
-
-        menu = QMenu()
-
-        color_menu = menu.addMenu(tr(self.lang, "ctx_color"))
-        colors = {
-            "Red": QColor(255, 120, 120),
-            "Green": QColor(120, 255, 120),
-            "Blue": QColor(120, 120, 255),
-            "Yellow": QColor(255, 255, 120),
-            "Purple": QColor(200, 120, 255),
-            "White": QColor(255, 255, 255),
-        }
-        for name, color in colors.items():
-            act = color_menu.addAction(name)
-            act.triggered.connect(lambda _, pid=packet_id, col=color: self.set_packet_color(pid, col))
-
-        menu.addSeparator()
-
-        act_view = menu.addAction(tr(self.lang, "ctx_view_full"))
-        act_view.triggered.connect(lambda _, p=packet: self._view_full(p))
-
-        act_save = menu.addAction(tr(self.lang, "ctx_save"))
-        act_save.triggered.connect(lambda _, p=packet: self.save_packet(p))
-
-        hb = menu.addAction(tr(self.lang, "ctx_mark_hb"))
-        hb.triggered.connect(lambda _, pid=packet_id: self.mark_as_spam(pid))
-
-        menu.exec(widget.mapToGlobal(pos))
-
-    def _view_full(self, packet):
-        self.inspect_mode = "text"
-        self.inspect_mode_btn.setText(tr(self.lang, "mode_decode"))
-        self.inspector.hide()
-        self.details.show()
-        self.current_selected_packet = packet
-        self._render_text(packet)
-
-    def mark_as_spam(self, packet_id):
-        self.hidden_ids.add(packet_id)
-        self.console.append(f"[NetGarden] Hidden as spam/heartbeat: {packet_id}")
-
-    def clear_spams(self):
-        if not self.hidden_ids and not self.hidden_packets:
-            self.console.append(tr(self.lang, "log_no_spams"))
-            return
-        self.console.append(tr(self.lang, "log_restore_hidden"))
-        self.hidden_ids.clear()
-
-        cached = self.hidden_packets
-        self.hidden_packets = []
-        for pkt in cached:
-            self._add_packet_safe(pkt)
-
-    def save_packet(self, packet):
-        self.saved_packets.append({
-            "id": getattr(packet, "id", ""),
-            "direction": getattr(packet, "direction", ""),
-            "timestamp": getattr(packet, "timestamp", ""),
-            "packet": packet
-        })
-        self.console.append(tr(self.lang, "log_saved", id=getattr(packet, "id", "")))
-
-    def open_saved_packets(self):
-        from NetGarden.GUI.SavedPacketsWindow import SavedPacketsWindow
-
-        def get_saved():
-            return self.saved_packets
-
-        def jump_to(saved_index):
-            if saved_index < 0 or saved_index >= len(self.saved_packets):
-                return
-            pkt = self.saved_packets[saved_index]["packet"]
-            self.jump_to_packet(pkt)
-
-        if self.saved_window is None:
-            self.saved_window = SavedPacketsWindow(self.lang, get_saved, jump_to)
-        else:
-            self.saved_window.lang = self.lang
-            self.saved_window.apply_lang()
-
-        self.saved_window.refresh()
-        self.saved_window.show()
-        self.saved_window.raise_()
-        self.saved_window.activateWindow()
-
-    def jump_to_packet(self, packet):
-        pid = getattr(packet, "id", "")
-        ts = getattr(packet, "timestamp", "")
-        direction = getattr(packet, "direction", "")
-
-        target_list = self.client_list if direction == "client" else self.server_list
-
-        for i in range(target_list.count()):
-            item = target_list.item(i)
-            p = item.data(Qt.UserRole)
-            if p is packet:
-                target_list.setCurrentItem(item)
-                target_list.scrollToItem(item)
-                self.inspect(item)
-                return
-
-        for i in range(target_list.count()):
-            item = target_list.item(i)
-            p = item.data(Qt.UserRole)
-            if getattr(p, "id", "") == pid and getattr(p, "timestamp", "") == ts:
-                target_list.setCurrentItem(item)
-                target_list.scrollToItem(item)
-                self.inspect(item)
-                return
-
-    def set_packet_color(self, packet_id, color):
-        self.packet_colors[packet_id] = color
-        if packet_id in self.packet_items_by_id:
-            for it in self.packet_items_by_id[packet_id]:
-                it.setBackground(color)
-
-    def apply_color(self, item, packet_id):
-        if packet_id in self.packet_colors:
-            item.setBackground(self.packet_colors[packet_id])
-
-    def register_packet_item(self, packet_id, item):
-        if packet_id not in self.packet_items_by_id:
-            self.packet_items_by_id[packet_id] = []
-        self.packet_items_by_id[packet_id].append(item)
-
-    def update_stats(self):
-        total = self.packet_counter_client + self.packet_counter_server
-        self.stats_label.setText(tr(self.lang, "stats", total=total, client=self.packet_counter_client, server=self.packet_counter_server))
-
-    def reset_spam_window(self):
-        self._per_id_hits.clear()
+import bisect
+from PySide6.QtWidgets import (
+    QMainWindow, QTableView, QHeaderView, QAbstractItemView, QTreeView,
+    QTextEdit, QPlainTextEdit, QSplitter, QWidget, QVBoxLayout,
+    QLineEdit, QLabel, QHBoxLayout, QMenu, QPushButton
+)
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtGui import QColor, QTextCursor
+
+from NetGarden.CORE.NetStrings import netstrings
+from NetGarden.CORE.PacketStore import PacketStore
+from NetGarden.CORE.Batcher import PacketBatcher, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL_MS
+from NetGarden.CORE.SpamFilter import SpamFilter, DEFAULT_SPAM_THRESHOLD
+from NetGarden.CORE.PacketView import PacketView
+from NetGarden.CORE.Packet import decode_cache
+from NetGarden.CORE.FieldIndex import FieldIndex
+from NetGarden.CORE.Query import QueryError
+from NetGarden.GUI.PacketListModel import PacketListModel, COLLAPSE_OFF, COLLAPSE_ID, COLLAPSE_CONTENT
+from NetGarden.GUI.InspectorModel import InspectorModel, auto_expand
+from NetGarden.GUI.JsonRenderer import JsonRenderer, RenderCache, json_safe
+from NetGarden.GUI.i18n import tr
+
+
+# texto do modo decode entra na view em pedacos desse tamanho, um por volta do event loop
+TEXT_CHUNK_CHARS = 64 * 1024
+# busca com campo: remonta so depois dessa pausa na digitacao
+FILTER_DEBOUNCE_MS = 250
+
+
+class MainWindow(QMainWindow):
+    log_signal = Signal(str)
+    proxy_closed_signal = Signal()
+
+    def __init__(self, lang, store=None, batch_size=DEFAULT_BATCH_SIZE, flush_interval_ms=DEFAULT_FLUSH_INTERVAL_MS):
+        super().__init__()
+        self.lang = lang
+        self.store = store if store is not None else PacketStore()
+        self.live_store = self.store
+        self.auto_hide_spam = False
+        self.spam_threshold_per_sec = DEFAULT_SPAM_THRESHOLD
+        # ocultar (manual ou auto) acontece no core, antes do lote chegar aqui
+        self.spam_filter = SpamFilter(self.spam_threshold_per_sec)
+        self.batcher = PacketBatcher(self.store, batch_size, spam_filter=self.spam_filter)
+        self.pipeline = None
+        self.metrics = None
+
+        self.packet_counter_client = 0
+        self.packet_counter_server = 0
+
+        self.packet_colors = {}
+        self.filter_text = ""
+        self.string_mode = False
+        self.collapse_mode = COLLAPSE_OFF
+
+        # indice de campos do store ao vivo, preenchido em background pras buscas
+        # so comeca a indexar na primeira busca com campo (_rebuild_view)
+        self.live_index = FieldIndex(self.live_store, on_log=self.add_log)
+        self.field_index = self.live_index
+
+        # o que as listas mostram e uma visao do store (filtro + ocultos)
+        self.view = PacketView(self.store, hidden_ids=self.spam_filter.hidden_ids, label=netstrings.name, index=self.field_index)
+        # codigos de ID na visao atual (None = todos) e linhas do store ja cobertas por ela
+        self._view_codes = None
+        self._view_fields = False
+        self._view_end = 0
+        self._rebuilt_while_hidden = False
+
+        # salvos do store ao vivo; uma captura aberta tem a sua lista
+        self.live_saved_packets = []
+        self.saved_packets = self.live_saved_packets
+        self.saved_window = None
+        self.metrics_window = None
+        self.current_selected_packet = None
+
+        self.log_signal.connect(self._add_log_safe)
+        # o engine fecha na thread dele; on_proxy_closed roda no thread do GUI
+        self.on_proxy_closed = None
+        self.proxy_closed_signal.connect(self._proxy_closed_safe)
+
+        top_bar = QHBoxLayout()
+        self.filter_box = QLineEdit()
+        self.filter_box.textChanged.connect(self.set_filter)
+
+        self.options_btn = QPushButton()
+        self.options_btn.clicked.connect(self.show_options_menu)
+
+        # para o proxy (ou fecha a captura) e volta pro launcher; Main liga on_stop
+        self.on_stop = None
+        self.stop_btn = QPushButton()
+        self.stop_btn.clicked.connect(self.stop_clicked)
+
+        self.stats_label = QLabel()
+        self.queue_label = QLabel()
+
+        top_bar.addWidget(self.filter_box)
+        top_bar.addWidget(self.options_btn)
+        top_bar.addWidget(self.stop_btn)
+        top_bar.addWidget(self.stats_label)
+        top_bar.addWidget(self.queue_label)
+
+        top_widget = QWidget()
+        top_widget.setLayout(top_bar)
+
+        self.client_model = PacketListModel(self.store, self.packet_colors, "client")
+        self.server_model = PacketListModel(self.store, self.packet_colors, "server")
+
+        # QTableView de uma coluna em vez de QListView: o QListView refaz o layout de
+        # todas as linhas a cada insert/reset, o QTableView so guarda a altura fixa
+        self.client_list = QTableView()
+        self.server_list = QTableView()
+        for view, model in ((self.client_list, self.client_model), (self.server_list, self.server_model)):
+            view.setModel(model)
+            view.horizontalHeader().hide()
+            view.horizontalHeader().setStretchLastSection(True)
+            view.verticalHeader().hide()
+            view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+            view.verticalHeader().setDefaultSectionSize(view.fontMetrics().height() + 4)
+            view.setShowGrid(False)
+            view.setWordWrap(False)
+            view.setSelectionBehavior(QAbstractItemView.SelectRows)
+            view.setSelectionMode(QAbstractItemView.SingleSelection)
+            view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+
+        self.client_list.clicked.connect(self.inspect)
+        self.server_list.clicked.connect(self.inspect)
+        # duplo clique abre/fecha um grupo "xN" (modo collapse)
+        self.client_list.doubleClicked.connect(self.toggle_run)
+        self.server_list.doubleClicked.connect(self.toggle_run)
+
+        self.client_list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.server_list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.client_list.customContextMenuRequested.connect(self.context_menu)
+        self.server_list.customContextMenuRequested.connect(self.context_menu)
+
+        split_lists = QSplitter(Qt.Horizontal)
+        split_lists.addWidget(self.client_list)
+        split_lists.addWidget(self.server_list)
+
+        self.inspect_mode = "tree"
+        self.inspect_mode_btn = QPushButton()
+        self.inspect_mode_btn.clicked.connect(self.toggle_inspect_mode)
+
+        # arvore preguicosa: itens so nascem quando o no e expandido
+        self.inspector_model = InspectorModel(more_text=lambda remaining: tr(self.lang, "tree_more", remaining=remaining))
+        self.inspector = QTreeView()
+        self.inspector.setModel(self.inspector_model)
+        self.inspector.setUniformRowHeights(True)
+        self.inspector.clicked.connect(self.inspector_model.load_more)
+        self.inspector.activated.connect(self.inspector_model.load_more)
+
+        # modo texto: decode + json num worker, cache por seq e carga em pedacos
+        self.details = QPlainTextEdit()
+        self.details.setReadOnly(True)
+        self.details.hide()
+        self.renderer = JsonRenderer(self)
+        self.renderer.rendered.connect(self._on_rendered)
+        self.render_cache = RenderCache()
+        self._render_generation = 0
+        # seq recomeca a cada sessao/captura: o store entra na chave do cache
+        self._store_generation = 0
+        self._text_pending = None
+
+        self.inspect_container = QWidget()
+        inspect_layout = QVBoxLayout()
+        inspect_layout.setContentsMargins(0, 0, 0, 0)
+        inspect_layout.addWidget(self.inspect_mode_btn)
+        inspect_layout.addWidget(self.inspector)
+        inspect_layout.addWidget(self.details)
+        self.inspect_container.setLayout(inspect_layout)
+
+        self.console = QTextEdit()
+        self.console.setReadOnly(True)
+
+        split_bottom = QSplitter(Qt.Vertical)
+        split_bottom.addWidget(self.inspect_container)
+        split_bottom.addWidget(self.console)
+
+        main_split = QSplitter(Qt.Vertical)
+        main_split.addWidget(top_widget)
+        main_split.addWidget(split_lists)
+        main_split.addWidget(split_bottom)
+
+        self.setCentralWidget(main_split)
+
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.update_stats)
+        self.stats_timer.timeout.connect(self.check_netstrings)
+        self.stats_timer.start(500)
+
+        self.flush_timer = QTimer()
+        self.flush_timer.timeout.connect(self.flush_packets)
+        self.flush_timer.start(flush_interval_ms)
+
+        # busca com campo remonta decodificando: espera parar de digitar
+        self.filter_timer = QTimer()
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self._rebuild_view)
+
+        self.apply_lang()
+        self._seed_inspector()
+
+    def apply_lang(self):
+        self.setWindowTitle(tr(self.lang, "main_title"))
+        self.filter_box.setPlaceholderText(tr(self.lang, "filter_ph"))
+        self.filter_box.setToolTip(tr(self.lang, "filter_help"))
+        self.options_btn.setText(tr(self.lang, "options"))
+        self.stop_btn.setText(tr(self.lang, "stop_proxy" if self.store is self.live_store else "close_capture"))
+        self.inspect_mode_btn.setText(tr(self.lang, "mode_tree"))
+        self.details.setPlaceholderText(tr(self.lang, "decoded_hint"))
+        self.update_stats()
+
+    def _seed_inspector(self):
+        self.inspector_model.set_items([("NetGarden", tr(self.lang, "tree_hint_left"), None)])
+
+    # chamado da thread do proxy: so grava no store e enfileira a linha
+    def add_packet(self, packet):
+        self.batcher.push(packet)
+
+    def set_pipeline(self, pipeline):
+        self.pipeline = pipeline
+
+    def set_metrics(self, metrics):
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.set_gauge("gui_queue_depth", self.batcher.depth, "Rows waiting for the next GUI flush.")
+            metrics.set_gauge("spam_suppressed", self.spam_filter.suppressed_count, "Packets held back as spam/heartbeat.")
+            metrics.set_gauge("decode_cache_hit_ratio", decode_cache.hit_rate, "Share of decodes served by the decode cache.")
+            metrics.set_gauge("field_index_lag", lambda: self.field_index.lag(), "Rows not yet in the field query index.")
+
+    def set_batching(self, batch_size=None, flush_interval_ms=None):
+        if batch_size:
+            self.batcher.batch_size = max(1, int(batch_size))
+        if flush_interval_ms:
+            self.flush_timer.setInterval(max(1, int(flush_interval_ms)))
+
+    def set_store(self, store):
+        if store is self.store:
+            return
+        if self.store is not self.live_store:
+            # o indexador le o store: para antes de fechar
+            self.field_index.stop()
+            self.store.close()
+        self.store = store
+        # texto renderizado do store anterior nao vale mais (seqs se repetem)
+        self._store_generation += 1
+        self._render_generation += 1
+        self.renderer.cancel(self._render_generation)
+        self._text_pending = None
+        self.render_cache.clear()
+        if store is self.live_store:
+            self.field_index = self.live_index
+        else:
+            self.field_index = FieldIndex(store, on_log=self.add_log)
+        # o batcher continua gravando no store ao vivo; so descarta o que estava pendente
+        self.batcher.clear()
+        self.client_model.store = store
+        self.server_model.store = store
+        self.view.set_store(store, self.field_index)
+        self.spam_filter.clear_rows()
+        self.saved_packets = self.live_saved_packets if store is self.live_store else []
+        self.current_selected_packet = None
+        self._seed_inspector()
+        self._rebuild_view()
+        self.stop_btn.setText(tr(self.lang, "stop_proxy" if store is self.live_store else "close_capture"))
+        if self.saved_window is not None:
+            self.saved_window.refresh()
+
+    def stop_clicked(self):
+        if self.on_stop is not None:
+            self.on_stop()
+
+    def use_live_store(self):
+        self.set_store(self.live_store)
+
+    # abre uma captura .ngcap (CaptureReader) no lugar do store ao vivo
+    def open_capture(self, reader):
+        self.set_store(reader)
+        self.console.append(tr(self.lang, "log_capture_opened", path=reader.path, count=len(reader)))
+        self.update_stats()
+
+    def shutdown(self):
+        self.renderer.stop()
+        self.live_index.stop()
+        if self.store is not self.live_store:
+            self.field_index.stop()
+            self.store.close()
+        self.live_store.close()
+
+    def flush_packets(self):
+        for packet_id in self.spam_filter.take_new():
+            self.console.append(
+                f"[NetGarden] Auto-spam: hiding '{packet_id}' (>= {self.spam_threshold_per_sec}/s)"
+            )
+        rows = self.batcher.drain()
+        if rows:
+            self.live_index.notify()
+        if self._view_fields:
+            # busca com campo: as linhas novas chegam pelo indice
+            self._advance_search()
+            return
+        if not rows or self.store is not self.live_store:
+            # vendo uma captura: as linhas ao vivo voltam pela visao no use_live_store()
+            return
+        # o que ja entrou num _rebuild_view nao entra de novo
+        if rows[0] < self._view_end:
+            rows = rows[bisect.bisect_left(rows, self._view_end):]
+        if rows:
+            self._show_rows(rows)
+
+    def add_log(self, message):
+        self.log_signal.emit(message)
+
+    def _add_log_safe(self, message):
+        self.console.append(message)
+
+    # on_close do engine (chamado de qualquer thread)
+    def proxy_closed(self):
+        self.proxy_closed_signal.emit()
+
+    def _proxy_closed_safe(self):
+        if self.on_proxy_closed is not None:
+            self.on_proxy_closed()
+
+    def _json_safe(self, obj):
+        return json_safe(obj)
+
+    def toggle_inspect_mode(self):
+        if self.inspect_mode == "tree":
+            self.inspect_mode = "text"
+            self.inspect_mode_btn.setText(tr(self.lang, "mode_decode"))
+            self.inspector.hide()
+            self.details.show()
+        else:
+            self.inspect_mode = "tree"
+            self.inspect_mode_btn.setText(tr(self.lang, "mode_tree"))
+            self.details.hide()
+            self.inspector.show()
+
+        if self.current_selected_packet is not None:
+            self.render_inspection(self.current_selected_packet)
+
+    def _show_rows(self, rows):
+        client_rows, server_rows = self._split_rows(rows)
+
+        if client_rows:
+            self.packet_counter_client += len(client_rows)
+            self.client_model.append_rows(client_rows)
+            self.client_list.scrollToBottom()
+        if server_rows:
+            self.packet_counter_server += len(server_rows)
+            self.server_model.append_rows(server_rows)
+            self.server_list.scrollToBottom()
+
+    # separa por direcao, tirando IDs ocultos e o que nao passa no filtro
+    def _split_rows(self, rows):
+        store = self.store
+        spam_filter = self.spam_filter
+        view = self.view
+        id_codes = store.id_codes
+        client_rows = []
+        server_rows = []
+
+        for row in rows:
+            code = id_codes[row]
+
+            # linha que ja estava no lote quando o ID foi ocultado
+            if spam_filter.hidden_ids and spam_filter.is_hidden(store.ids[code]):
+                spam_filter.suppress(store.ids[code], row)
+                continue
+
+            if not view.matches_code(code):
+                continue
+            if view.has_fields() and not view.matches_row(row):
+                continue
+
+            if store.direction_of(row) == "client":
+                client_rows.append(row)
+            else:
+                server_rows.append(row)
+
+        return client_rows, server_rows
+
+    # remonta as duas listas a partir do indice ID -> linhas do store
+    def _rebuild_view(self):
+        self.view.invalidate()
+        self._view_fields = self.view.has_fields()
+        self._rebuilt_while_hidden = bool(self.spam_filter.hidden_ids)
+        if self._view_fields:
+            self.field_index.start()
+            self._view_codes = None
+            self._view_end = 0
+            self._advance_search(replace=True)
+            return
+        end = len(self.store)
+        self._view_end = end
+        self._view_codes = self.view.codes() if self.view.is_filtered() else None
+        for list_view, model in ((self.client_list, self.client_model), (self.server_list, self.server_model)):
+            self._update_list(list_view, model, self.view.rows(model.direction, end, self._view_codes), replace=True)
+        self.packet_counter_client = self.client_model.packet_count()
+        self.packet_counter_server = self.server_model.packet_count()
+
+    # busca com campo: anexa o que o FieldIndex ja cobre a partir de _view_end.
+    # O GUI nunca decodifica a captura inteira: o resto aparece nos proximos
+    # flushes, conforme o indexador avanca em segundo plano
+    def _advance_search(self, replace=False):
+        start = self._view_end
+        end = len(self.store)
+        if start >= end and not replace:
+            return
+        split, self._view_end = self.view.search(start, end)
+        if self.spam_filter.hidden_ids:
+            # linhas ocultas nao passam pelo suppress: so voltam num rebuild
+            self._rebuilt_while_hidden = True
+        for list_view, model, rows in (
+            (self.client_list, self.client_model, split[0]),
+            (self.server_list, self.server_model, split[1])
+        ):
+            if replace:
+                self._update_list(list_view, model, rows, replace=True)
+            elif rows:
+                model.append_rows(rows)
+                list_view.scrollToBottom()
+        self.packet_counter_client = self.client_model.packet_count()
+        self.packet_counter_server = self.server_model.packet_count()
+
+    # troca (ou intercala) as linhas de uma lista mantendo o pacote selecionado
+    def _update_list(self, list_view, model, rows, replace=False):
+        current = list_view.currentIndex()
+        selected = current.data(Qt.UserRole) if current.isValid() else None
+        if replace:
+            model.reset(rows)
+        else:
+            model.merge_rows(rows)
+        model_row = model.model_row(selected) if selected is not None else -1
+        if model_row >= 0:
+            list_view.setCurrentIndex(model.index(model_row))
+            list_view.scrollTo(model.index(model_row))
+        else:
+            list_view.scrollToBottom()
+
+    def render_inspection(self, packet):
+        if self.inspect_mode == "tree":
+            self._render_tree(packet)
+        else:
+            self._render_text(packet)
+
+    def _render_tree(self, packet):
+        self._render_generation += 1
+        self.renderer.cancel(self._render_generation)
+        pid = getattr(packet, "id", "")
+        direction = getattr(packet, "direction", "")
+        timestamp = getattr(packet, "timestamp", "")
+
+        parsed = getattr(packet, "parsed", None)
+        if not isinstance(parsed, (dict, list)):
+            parsed = {"value": parsed}
+        items = [
+            ("ID", str(self.resolve_string(pid) if self.string_mode else pid), parsed),
+            ("Direction", str(direction), None),
+            ("Time", str(timestamp), None),
+        ]
+        session = getattr(packet, "session", None)
+        if session is not None:
+            items.append(("Session", str(session), None))
+
+        self.inspector_model.set_items(items)
+        auto_expand(self.inspector, self.inspector_model)
+
+    def _render_text(self, packet):
+        self._render_generation += 1
+        generation = self._render_generation
+        key = self._render_key(packet)
+        cached = self.render_cache.get(key)
+        if cached is not None:
+            self.renderer.cancel(generation)
+            self._load_text(generation, cached)
+            return
+        self._text_pending = None
+        self.details.setPlainText(tr(self.lang, "rendering"))
+        self.renderer.submit(generation, packet, key, netstrings.label if self.string_mode else None)
+
+    # chave do cache: store atual + seq (+ versao do NetStrings no modo string)
+    def _render_key(self, packet):
+        seq = getattr(packet, "seq", None)
+        if seq is None:
+            return None
+        if not self.string_mode:
+            return (self._store_generation, seq)
+        return (self._store_generation, seq, netstrings.version)
+
+    def _on_rendered(self, generation, key, text):
+        if text is None:
+            if generation == self._render_generation:
+                self.details.setPlainText(tr(self.lang, "no_bson"))
+            return
+        self.render_cache.put(key, text)
+        if generation == self._render_generation:
+            self._load_text(generation, text)
+
+    # o primeiro pedaco entra na hora; o resto vai sendo anexado pelo event
+    # loop, e para se outro pacote for selecionado no meio
+    def _load_text(self, generation, text):
+        self.details.setPlainText(text[:TEXT_CHUNK_CHARS])
+        if len(text) > TEXT_CHUNK_CHARS:
+            self._text_pending = (generation, text, TEXT_CHUNK_CHARS)
+            QTimer.singleShot(0, self._load_text_chunk)
+        else:
+            self._text_pending = None
+
+    def _load_text_chunk(self):
+        if self._text_pending is None:
+            return
+        generation, text, pos = self._text_pending
+        if generation != self._render_generation:
+            self._text_pending = None
+            return
+        cursor = QTextCursor(self.details.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text[pos:pos + TEXT_CHUNK_CHARS])
+        pos += TEXT_CHUNK_CHARS
+        if pos < len(text):
+            self._text_pending = (generation, text, pos)
+            QTimer.singleShot(0, self._load_text_chunk)
+        else:
+            self._text_pending = None
+
+    def inspect(self, index):
+        self.inspect_row(index.data(Qt.UserRole))
+
+    def inspect_row(self, row):
+        packet = self.store.packet(row)
+        self.current_selected_packet = packet
+        self.render_inspection(packet)
+
+    # filtro retroativo: so mexe nas listas se o conjunto de IDs mudou; se so
+    # entraram IDs, intercala as linhas deles, senao remonta pelo indice.
+    # Busca com campos sempre remonta pelo FieldIndex, com debounce pra nao
+    # refazer a cada tecla
+    def set_filter(self, text):
+        self.filter_text = text
+        try:
+            self.view.set_text(text)
+        except QueryError as e:
+            # busca pela metade enquanto digita: mantem a visao anterior
+            self.filter_box.setStyleSheet("color: #c0392b;")
+            self.filter_box.setToolTip(str(e))
+            return
+        self.filter_box.setStyleSheet("")
+        self.filter_box.setToolTip(tr(self.lang, "filter_help"))
+        if self.view.has_fields():
+            self.filter_timer.start()
+            return
+        self.filter_timer.stop()
+        if self._view_fields:
+            self._rebuild_view()
+            return
+        codes = self.view.codes() if self.view.is_filtered() else None
+        old = self._view_codes
+        if codes == old:
+            return
+        if old is not None and (codes is None or codes >= old):
+            added = (codes if codes is not None else set(range(len(self.store.ids)))) - old
+            end = self._view_end
+            self._view_codes = codes
+            for list_view, model in ((self.client_list, self.client_model), (self.server_list, self.server_model)):
+                rows = self.view.rows(model.direction, end, added)
+                if rows:
+                    self._update_list(list_view, model, rows)
+            self.packet_counter_client = self.client_model.packet_count()
+            self.packet_counter_server = self.server_model.packet_count()
+            return
+        self._rebuild_view()
+
+    def resolve_string(self, packet_id):
+        return netstrings.label(packet_id)
+
+    def show_options_menu(self):
+        menu = QMenu(self)
+
+        act_strings = menu.addAction(tr(self.lang, "opt_string_mode"))
+        act_strings.setCheckable(True)
+        act_strings.setChecked(self.string_mode)
+        act_strings.triggered.connect(lambda _: self.set_string_mode(not self.string_mode))
+
+        act_auto_spam = menu.addAction(tr(self.lang, "opt_auto_spam"))
+        act_auto_spam.setCheckable(True)
+        act_auto_spam.setChecked(self.auto_hide_spam)
+        act_auto_spam.triggered.connect(lambda _: self.set_auto_spam(not self.auto_hide_spam))
+
+        for mode, key in ((COLLAPSE_ID, "opt_collapse_id"), (COLLAPSE_CONTENT, "opt_collapse_content")):
+            act_collapse = menu.addAction(tr(self.lang, key))
+            act_collapse.setCheckable(True)
+            act_collapse.setChecked(self.collapse_mode == mode)
+            act_collapse.triggered.connect(
+                lambda _, m=mode: self.set_collapse(COLLAPSE_OFF if self.collapse_mode == m else m))
+
+        menu.addSeparator()
+
+        act_restore = menu.addAction(tr(self.lang, "opt_restore_spam"))
+        act_restore.triggered.connect(self.clear_spams)
+
+        act_saved = menu.addAction(tr(self.lang, "opt_saved"))
+        act_saved.triggered.connect(self.open_saved_packets)
+
+        act_metrics = menu.addAction(tr(self.lang, "opt_metrics"))
+        act_metrics.triggered.connect(self.open_metrics)
+
+        menu.exec(self.options_btn.mapToGlobal(self.options_btn.rect().bottomLeft()))
+
+    def set_string_mode(self, enabled):
+        self.string_mode = enabled
+        self._apply_strings()
+        self.console.append(tr(self.lang, "log_string_on" if enabled else "log_string_off"))
+
+    # lista, arvore e texto passam a usar (ou largar) os nomes do NetStrings
+    def _apply_strings(self):
+        display_id = self.resolve_string if self.string_mode else None
+        for model in (self.client_model, self.server_model):
+            model.display_id = display_id
+            model.refresh()
+        self.inspector_model.key_label = netstrings.label if self.string_mode else None
+        if self.current_selected_packet is not None:
+            self.render_inspection(self.current_selected_packet)
+
+    # netstrings.json mudou no disco: recarrega sem reiniciar
+    def check_netstrings(self):
+        try:
+            changed = netstrings.check()
+        except (OSError, ValueError) as e:
+            self.console.append(f"[ERROR] NetStrings reload failed: {e}")
+            return
+        if not changed:
+            return
+        self.console.append(tr(self.lang, "log_strings_reloaded", count=len(netstrings)))
+        # apelidos da busca mudaram junto
+        if self.filter_text:
+            self.set_filter(self.filter_text)
+        if self.string_mode:
+            self._apply_strings()
+
+    # agrupa repeticoes seguidas nas duas listas, mantendo o pacote selecionado
+    def set_collapse(self, mode):
+        self.collapse_mode = mode
+        for list_view, model in ((self.client_list, self.client_model), (self.server_list, self.server_model)):
+            current = list_view.currentIndex()
+            selected = current.data(Qt.UserRole) if current.isValid() else None
+            model.set_collapse(mode)
+            model_row = model.model_row(selected) if selected is not None else -1
+            if model_row >= 0:
+                list_view.setCurrentIndex(model.index(model_row))
+                list_view.scrollTo(model.index(model_row))
+            else:
+                list_view.scrollToBottom()
+        key = {COLLAPSE_ID: "log_collapse_id", COLLAPSE_CONTENT: "log_collapse_content"}.get(mode, "log_collapse_off")
+        self.console.append(tr(self.lang, key))
+
+    def toggle_run(self, index):
+        model = index.model()
+        if model.run_length(index.row()) < 2 and not model.is_expanded(index.row()):
+            return
+        head = model.toggle_run(index.row())
+        self.sender().setCurrentIndex(model.index(head))
+        self.inspect(model.index(head))
+
+    def _toggle_run_in(self, list_view, index):
+        head = list_view.model().toggle_run(index.row())
+        list_view.setCurrentIndex(list_view.model().index(head))
+
+    def set_auto_spam(self, enabled):
+        self.auto_hide_spam = enabled
+        self.spam_filter.set_auto(enabled)
+        self.console.append(tr(self.lang, "log_spam_on" if enabled else "log_spam_off"))
+
+    def context_menu(self, pos):
+        widget = self.sender()
+        index = widget.indexAt(pos)
+        if not index.isValid():
+            return
+
+        row = index.data(Qt.UserRole)
+        packet_id = self.store.id_of(row)
+
+        menu = QMenu()
+
+        color_menu = menu.addMenu(tr(self.lang, "ctx_color"))
+        colors = {
+            "Red": QColor(255, 120, 120),
+            "Green": QColor(120, 255, 120),
+            "Blue": QColor(120, 120, 255),
+            "Yellow": QColor(255, 255, 120),
+            "Purple": QColor(200, 120, 255),
+            "White": QColor(255, 255, 255),
+        }
+        for name, color in colors.items():
+            act = color_menu.addAction(name)
+            act.triggered.connect(lambda _, pid=packet_id, col=color: self.set_packet_color(pid, col))
+
+        menu.addSeparator()
+
+        model = widget.model()
+        if model.run_length(index.row()) > 1 or model.is_expanded(index.row()):
+            key = "ctx_collapse_run" if model.is_expanded(index.row()) else "ctx_expand_run"
+            act_run = menu.addAction(tr(self.lang, key, count=model.run_length(index.row())))
+            act_run.triggered.connect(lambda _, i=index: self._toggle_run_in(widget, i))
+
+        act_view = menu.addAction(tr(self.lang, "ctx_view_full"))
+        act_view.triggered.connect(lambda _, r=row: self._view_full(r))
+
+        act_save = menu.addAction(tr(self.lang, "ctx_save"))
+        act_save.triggered.connect(lambda _, r=row: self.save_packet(r))
+
+        hb = menu.addAction(tr(self.lang, "ctx_mark_hb"))
+        hb.triggered.connect(lambda _, pid=packet_id: self.mark_as_spam(pid))
+
+        menu.exec(widget.mapToGlobal(pos))
+
+    def _view_full(self, row):
+        packet = self.store.packet(row)
+        self.inspect_mode = "text"
+        self.inspect_mode_btn.setText(tr(self.lang, "mode_decode"))
+        self.inspector.hide()
+        self.details.show()
+        self.current_selected_packet = packet
+        self._render_text(packet)
+
+    def mark_as_spam(self, packet_id):
+        self.spam_filter.hide(packet_id)
+        self.view.invalidate()
+        self.console.append(f"[NetGarden] Hidden as spam/heartbeat: {packet_id}")
+
+    def clear_spams(self):
+        if not self.spam_filter.hidden_ids and not self.spam_filter.suppressed:
+            self.console.append(tr(self.lang, "log_no_spams"))
+            return
+        self.console.append(tr(self.lang, "log_restore_hidden"))
+        # linhas cortadas pelo limite, ou tiradas da visao num rebuild, so voltam pelo indice
+        rebuild = self.spam_filter.discarded or self._rebuilt_while_hidden or self._view_fields
+        restored = self.spam_filter.restore()
+        self.view.invalidate()
+        if rebuild:
+            self._rebuild_view()
+            return
+
+        client_rows, server_rows = self._split_rows(restored)
+        # volta as linhas pro lugar cronologico, um update por lista
+        for list_view, model, rows in (
+            (self.client_list, self.client_model, client_rows),
+            (self.server_list, self.server_model, server_rows)
+        ):
+            if rows:
+                self._update_list(list_view, model, rows)
+        self.packet_counter_client += len(client_rows)
+        self.packet_counter_server += len(server_rows)
+
+    def save_packet(self, row):
+        store = self.store
+        # salvo nunca sai da memoria, mesmo com retencao limitada
+        store.pin(row)
+        self.saved_packets.append({
+            "id": store.id_of(row),
+            "direction": store.direction_of(row),
+            "timestamp": store.timestamp_of(row),
+            "seq": store.seq_of(row),
+            "row": row
+        })
+        self.console.append(tr(self.lang, "log_saved", id=store.id_of(row)))
+
+    def open_saved_packets(self):
+        from NetGarden.GUI.SavedPacketsWindow import SavedPacketsWindow
+
+        def get_saved():
+            return self.saved_packets
+
+        def jump_to(saved_index):
+            if saved_index < 0 or saved_index >= len(self.saved_packets):
+                return
+            self.jump_to_seq(self.saved_packets[saved_index]["seq"])
+
+        if self.saved_window is None:
+            self.saved_window = SavedPacketsWindow(self.lang, get_saved, jump_to)
+        else:
+            self.saved_window.lang = self.lang
+            self.saved_window.apply_lang()
+
+        self.saved_window.refresh()
+        self.saved_window.show()
+        self.saved_window.raise_()
+        self.saved_window.activateWindow()
+
+    def open_metrics(self):
+        from NetGarden.GUI.MetricsWindow import MetricsWindow
+
+        if self.metrics_window is None:
+            self.metrics_window = MetricsWindow(self.lang, lambda: self.metrics)
+        else:
+            self.metrics_window.lang = self.lang
+            self.metrics_window.apply_lang()
+
+        self.metrics_window.show()
+        self.metrics_window.raise_()
+        self.metrics_window.activateWindow()
+
+    # seq -> linha do store -> linha da lista, sem varrer nada
+    def jump_to_seq(self, seq):
+        row = self.store.row_of_seq(seq)
+        if row < 0:
+            return False
+        self.jump_to_packet(row)
+        return True
+
+    def jump_to_packet(self, row):
+        direction = self.store.direction_of(row)
+        target_list = self.client_list if direction == "client" else self.server_list
+
+        # abre o grupo "xN" se o pacote estiver dentro de um
+        model_row = target_list.model().reveal(row)
+        if model_row < 0:
+            # oculto (spam/filtro) ou ainda no lote: mostra no inspector mesmo assim
+            self.console.append(tr(self.lang, "log_jump_hidden", id=self.store.id_of(row)))
+            self.inspect_row(row)
+            return
+        index = target_list.model().index(model_row)
+        target_list.setCurrentIndex(index)
+        target_list.scrollTo(index)
+        self.inspect(index)
+
+    def set_packet_color(self, packet_id, color):
+        self.packet_colors[packet_id] = color
+        self.client_model.refresh()
+        self.server_model.refresh()
+
+    def update_stats(self):
+        total = self.packet_counter_client + self.packet_counter_server
+        self.stats_label.setText(tr(self.lang, "stats", total=total, client=self.packet_counter_client, server=self.packet_counter_server))
+        inspect_depth = self.pipeline.depth() if self.pipeline is not None else 0
+        self.queue_label.setText(tr(
+            self.lang, "queue_depth",
+            pending=self.batcher.depth(), inspect=inspect_depth, hidden=self.spam_filter.suppressed_count(),
+            cache=decode_cache.hit_rate()
+        ))
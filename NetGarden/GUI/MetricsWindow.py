@@ -0,0 +1,101 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem
+from PySide6.QtCore import QTimer
+from NetGarden.CORE.Metrics import RateTracker
+from NetGarden.GUI.i18n import tr
+
+
+def _size(v):
+    if v is None:
+        return "-"
+    if v == float("inf"):
+        return "+"
+    if v >= 1048576:
+        return f"{v / 1048576:g}M"
+    if v >= 1024:
+        return f"{v / 1024:g}K"
+    return f"{v:g}"
+
+
+def _ms(v):
+    if v is None:
+        return "-"
+    if v == float("inf"):
+        return "+"
+    return f"{v * 1000:g}"
+
+
+class MetricsWindow(QWidget):
+    def __init__(self, lang, get_metrics):
+        super().__init__()
+        self.lang = lang
+        self.get_metrics = get_metrics
+        self.rates = RateTracker()
+
+        self.resize(900, 320)
+
+        layout = QVBoxLayout()
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+
+        self.table = QTableWidget()
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        layout.addWidget(self.table)
+
+        self.setLayout(layout)
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+
+        self.apply_lang()
+        self.refresh()
+
+    def apply_lang(self):
+        self.setWindowTitle(tr(self.lang, "metrics_title"))
+        headers = tr(self.lang, "metrics_headers").split("|")
+        self.table.setColumnCount(len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        metrics = self.get_metrics()
+        if metrics is None:
+            self.summary.setText(tr(self.lang, "metrics_off"))
+            self.table.setRowCount(0)
+            return
+
+        gauges = metrics.gauges()
+        self.summary.setText(tr(
+            self.lang, "metrics_summary",
+            gui=gauges.get("gui_queue_depth", "-"),
+            inspect=gauges.get("inspect_queue_depth", "-"),
+            dropped=gauges.get("inspect_dropped", "-")
+        ))
+
+        rates = self.rates.rates(metrics)
+        sessions = sorted(metrics.sessions().items())
+        self.table.setRowCount(len(sessions))
+        for i, ((session, direction), m) in enumerate(sessions):
+            frames_s, bytes_s = rates.get((session, direction), (0.0, 0.0))
+            values = [
+                f"#{session}",
+                direction,
+                f"{frames_s:.1f}",
+                f"{bytes_s / 1024:.1f}",
+                str(m.frames),
+                str(m.bytes),
+                f"{_size(m.frame_sizes.quantile(0.5))} / {_size(m.frame_sizes.quantile(0.99))}",
+                f"{_ms(m.scan_times.quantile(0.5))} / {_ms(m.scan_times.quantile(0.99))}",
+                f"{_ms(m.decode_times.quantile(0.5))} / {_ms(m.decode_times.quantile(0.99))}",
+                _ms(m.send_times.quantile(0.99)),
+                str(m.invalid_resets),
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(i, col, QTableWidgetItem(value))
+        self.table.resizeColumnsToContents()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
@@ -0,0 +1,280 @@
+import bisect
+import itertools
+from array import array
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+# agrupamento de repeticoes consecutivas (set_collapse)
+COLLAPSE_OFF = None
+COLLAPSE_ID = "id"
+COLLAPSE_CONTENT = "content"
+COLLAPSE_MODES = (COLLAPSE_OFF, COLLAPSE_ID, COLLAPSE_CONTENT)
+
+
+# Lista virtual de pacotes: guarda so os numeros de linha do PacketStore e
+# monta texto/cor em data(), na hora de pintar. O custo fica proporcional ao
+# que esta visivel, nao ao tamanho da captura.
+#
+# Com collapse, pacotes seguidos da mesma sessao com o mesmo ID (ou o mesmo
+# frame) viram uma linha "xN" com a hora do primeiro e do ultimo. _starts guarda onde cada
+# linha do modelo comeca dentro de _rows; grupos em _expanded (pela primeira
+# linha do store) mostram um pacote por linha de novo.
+class PacketListModel(QAbstractListModel):
+    def __init__(self, store, colors, direction=None, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.colors = colors
+        self.direction = direction
+        self.display_id = None
+        self._rows = array("q")
+        self.collapse = COLLAPSE_OFF
+        self._starts = array("q")
+        # onde comeca cada grupo em _rows (aberto ou nao); _starts e o que a view mostra
+        self._runs = array("q")
+        self._expanded = set()
+        # chave e primeira linha do ultimo grupo, pro append continuar dele
+        self._last_key = None
+        self._last_run = None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self.collapse:
+            return len(self._starts)
+        return len(self._rows)
+
+    # pacotes na lista (com collapse, rowCount conta os grupos)
+    def packet_count(self):
+        return len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.store_row(index.row())
+
+        if role == Qt.DisplayRole:
+            if self.collapse:
+                count = self.run_length(index.row())
+                if count > 1:
+                    return self._run_label(row, self._rows[self._run_end(index.row()) - 1], count)
+            return self._label(row)
+        if role == Qt.BackgroundRole:
+            return self.colors.get(self.store.id_of(row))
+        if role == Qt.UserRole:
+            return row
+        return None
+
+    def _label(self, row):
+        store = self.store
+        packet_id = store.id_of(row)
+        display_id = self.display_id(packet_id) if self.display_id else packet_id
+        timestamp = store.timestamp_of(row)
+        session = store.session_of(row)
+        if session is not None:
+            return f"[{timestamp}] #{session} {display_id}"
+        return f"[{timestamp}] {display_id}"
+
+    def _run_label(self, first, last, count):
+        store = self.store
+        packet_id = store.id_of(first)
+        display_id = self.display_id(packet_id) if self.display_id else packet_id
+        span = f"{store.timestamp_of(first)} - {store.timestamp_of(last)}"
+        session = store.session_of(first)
+        if session is not None:
+            return f"[{span}] #{session} {display_id} \u00d7{count}"
+        return f"[{span}] {display_id} \u00d7{count}"
+
+    # primeira linha do store do grupo (ou a propria linha, sem collapse)
+    def store_row(self, model_row):
+        if self.collapse:
+            return self._rows[self._starts[model_row]]
+        return self._rows[model_row]
+
+    # _rows fica sempre em ordem crescente (append no fim, merge_rows ordenado);
+    # com collapse devolve a linha do grupo que contem o pacote
+    def model_row(self, store_row):
+        rows = self._rows
+        i = bisect.bisect_left(rows, store_row)
+        if i < len(rows) and rows[i] == store_row:
+            if self.collapse:
+                return bisect.bisect_right(self._starts, i) - 1
+            return i
+        return -1
+
+    def _run_end(self, model_row):
+        if model_row + 1 < len(self._starts):
+            return self._starts[model_row + 1]
+        return len(self._rows)
+
+    def run_length(self, model_row):
+        if not self.collapse:
+            return 1
+        return self._run_end(model_row) - self._starts[model_row]
+
+    # grupo nunca mistura sessoes: a chave e (ID, sessao). No modo conteudo o
+    # frame so e lido quando a chave ja bate, e comparado byte a byte com o
+    # primeiro do grupo (tamanho antes, pra nao ler frame do spill a toa)
+    def _key(self, row):
+        store = self.store
+        return store.id_codes[row], store.session_of(row)
+
+    # recalcula _starts a partir da posicao pos de _rows (pos = 0 refaz tudo);
+    # nao emite sinais, quem chama avisa a view
+    def _segment(self, pos=0):
+        starts = self._starts
+        runs = self._runs
+        if pos == 0:
+            del starts[:]
+            del runs[:]
+            key = run_first = None
+        else:
+            key = self._last_key
+            run_first = self._last_run
+        if not self.collapse:
+            self._last_key = self._last_run = None
+            return
+
+        store = self.store
+        rows = self._rows
+        expanded = self._expanded
+        key_of = self._key
+        codes = store.id_codes
+        sessions = getattr(store, "sessions", None)
+        if sessions is not None:
+            # PacketStore: le as colunas direto, sem o session_of por linha
+            key_of = lambda row: (codes[row], sessions[row])
+        content = self.collapse == COLLAPSE_CONTENT
+        lengths = getattr(store, "lengths", None)
+        # frame do primeiro do grupo (view, sem copia), lido so quando alguem precisa comparar
+        run_frame = None
+        for i in range(pos, len(rows)):
+            row = rows[i]
+            k = key_of(row)
+            if k != key:
+                run_frame = None
+            elif not content:
+                if expanded and run_first in expanded:
+                    starts.append(i)
+                continue
+            elif lengths is not None and lengths[row] != lengths[run_first]:
+                run_frame = None
+            else:
+                if run_frame is None:
+                    run_frame = store.frame(run_first)
+                frame = store.frame(row)
+                if frame == run_frame:
+                    if expanded and run_first in expanded:
+                        starts.append(i)
+                    continue
+                run_frame = frame
+            key = k
+            run_first = row
+            starts.append(i)
+            runs.append(i)
+        self._last_key = key
+        self._last_run = run_first
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        if self.collapse:
+            self._append_collapsed(rows)
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def _append_collapsed(self, rows):
+        starts = self._starts
+        before = len(starts)
+        pos = len(self._rows)
+        self._rows.extend(rows)
+        self._segment(pos)
+
+        # o ultimo grupo pode ter crescido (contador e hora final mudam)
+        if before:
+            self.dataChanged.emit(self.index(before - 1), self.index(before - 1))
+        added = len(starts) - before
+        if added:
+            new = starts[before:]
+            del starts[before:]
+            self.beginInsertRows(QModelIndex(), before, before + added - 1)
+            starts.extend(new)
+            self.endInsertRows()
+
+    # rows em ordem crescente de linha do store; volta cada uma pro seu lugar
+    # cronologico com um unico reset (ou um insert no fim, se todas forem novas)
+    def merge_rows(self, rows):
+        if not rows:
+            return
+        if not self._rows or rows[0] > self._rows[-1]:
+            self.append_rows(rows)
+            return
+        self.beginResetModel()
+        self._rows = array("q", sorted(itertools.chain(self._rows, rows)))
+        self._segment()
+        self.endResetModel()
+
+    def reset(self, rows=()):
+        self.beginResetModel()
+        self._rows = array("q", rows)
+        self._segment()
+        self.endResetModel()
+
+    def set_collapse(self, mode):
+        if mode not in COLLAPSE_MODES:
+            raise ValueError(f"Unknown collapse mode: {mode}")
+        self.beginResetModel()
+        self.collapse = mode
+        self._expanded.clear()
+        self._segment()
+        self.endResetModel()
+
+    # posicoes [a, b) em _rows do grupo (aberto ou nao) que contem a posicao pos
+    def _run_span(self, pos):
+        runs = self._runs
+        i = bisect.bisect_right(runs, pos) - 1
+        b = runs[i + 1] if i + 1 < len(runs) else len(self._rows)
+        return runs[i], b
+
+    def is_expanded(self, model_row):
+        if not self.collapse:
+            return False
+        a, _ = self._run_span(self._starts[model_row])
+        return self._rows[a] in self._expanded
+
+    # abre/fecha o grupo da linha; devolve a linha do modelo do inicio do grupo
+    def toggle_run(self, model_row):
+        if not self.collapse:
+            return model_row
+        starts = self._starts
+        a, b = self._run_span(starts[model_row])
+        head = bisect.bisect_left(starts, a)
+        if b - a < 2:
+            return head
+        first = self._rows[a]
+        if first in self._expanded:
+            self._expanded.discard(first)
+            self.beginRemoveRows(QModelIndex(), head + 1, head + b - a - 1)
+            del starts[head + 1:head + b - a]
+            self.endRemoveRows()
+        else:
+            self._expanded.add(first)
+            self.beginInsertRows(QModelIndex(), head + 1, head + b - a - 1)
+            starts[head + 1:head + 1] = array("q", range(a + 1, b))
+            self.endInsertRows()
+        self.dataChanged.emit(self.index(head), self.index(head))
+        return head
+
+    # linha do modelo exatamente desse pacote, abrindo o grupo se precisar
+    def reveal(self, store_row):
+        model_row = self.model_row(store_row)
+        if model_row >= 0 and self.run_length(model_row) > 1:
+            self.toggle_run(model_row)
+            model_row = self.model_row(store_row)
+        return model_row
+
+    def refresh(self):
+        count = self.rowCount()
+        if count:
+            self.dataChanged.emit(self.index(0), self.index(count - 1))
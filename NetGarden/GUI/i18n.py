@@ -1,139 +1,223 @@
-import json
-import os
-
-SETTINGS_PATH = os.path.join(os.path.dirname(__file__), "settings.json")
-
-LANG_PT = "pt-BR"
-LANG_EN = "en"
-
-STRINGS = {
-    LANG_PT: {
-        "app_launcher_title": "NetGarden 🌱 | Launcher",
-        "start_proxy": "Iniciar Proxy",
-        "client_ip": "IP do Client:",
-        "client_port": "Porta do Client:",
-        "server_ip": "IP do Server:",
-        "server_port": "Porta do Server:",
-        "local_btn": "Local (127.0.0.1)",
-        "recents": "Conexões recentes:",
-        "clear_recents": "Limpar recentes",
-        "invalid_ports": "As portas precisam ser números.",
-        "language": "Idioma:",
-        "ptbr": "Português (BR)",
-        "en": "English",
-
-        "main_title": "NetGarden 🌱",
-        "filter_ph": "Filtrar por ID...",
-        "options": "Opções",
-        "stats": "Pacotes: {total} | Client: {client} | Server: {server}",
-
-        "mode_tree": "Modo: Árvore",
-        "mode_decode": "Modo: Decodificar",
-        "tree_hint_left": "Clique em um pacote",
-        "decoded_hint": "Decodificado (JSON) aparecerá aqui...",
-        "no_packet": "Nenhum pacote.",
-        "no_bson": "Sem BSON parseado (raw/unknown).",
-
-        "ctx_color": "Por cor",
-        "ctx_view_full": "Ver por extenso",
-        "ctx_save": "Salvar pacote",
-        "ctx_mark_hb": "Marcar como Heartbeat (ocultar)",
-
-        "opt_string_mode": "Ver em string (BETA)",
-        "opt_auto_spam": "Auto-ocultar spam",
-        "opt_restore_spam": "Restaurar spam",
-        "opt_saved": "Pacotes salvos",
-
-        "log_string_on": "[NetGarden] String mode: ON",
-        "log_string_off": "[NetGarden] String mode: OFF",
-        "log_spam_on": "[NetGarden] Auto-spam: ON",
-        "log_spam_off": "[NetGarden] Auto-spam: OFF",
-        "log_restore_hidden": "[NetGarden] Restoring hidden packets...",
-        "log_no_spams": "[NetGarden] No spams to restore",
-        "log_saved": "[NetGarden] Pacote salvo: {id}",
-
-        "saved_title": "NetGarden 🌱 | Pacotes salvos",
-        "saved_hint": "Clique em um pacote para pular até ele:",
-    },
-
-    LANG_EN: {
-        "app_launcher_title": "NetGarden 🌱 | Launcher",
-        "start_proxy": "Start Proxy",
-        "client_ip": "Client IP:",
-        "client_port": "Client Port:",
-        "server_ip": "Server IP:",
-        "server_port": "Server Port:",
-        "local_btn": "Local (127.0.0.1)",
-        "recents": "Recent connections:",
-        "clear_recents": "Clear recents",
-        "invalid_ports": "Ports must be numbers.",
-        "language": "Language:",
-        "ptbr": "Português (BR)",
-        "en": "English",
-
-        "main_title": "NetGarden 🌱",
-        "filter_ph": "Filter by ID...",
-        "options": "Options",
-        "stats": "Packets: {total} | Client: {client} | Server: {server}",
-
-        "mode_tree": "Mode: Tree",
-        "mode_decode": "Mode: Decode",
-        "tree_hint_left": "Click a packet",
-        "decoded_hint": "Decoded (JSON) will appear here...",
-        "no_packet": "No packet.",
-        "no_bson": "No parsed BSON (raw/unknown).",
-
-        "ctx_color": "By color",
-        "ctx_view_full": "View decoded",
-        "ctx_save": "Save packet",
-        "ctx_mark_hb": "Mark as Heartbeat (hide)",
-
-        "opt_string_mode": "String mode (BETA)",
-        "opt_auto_spam": "Auto-hide spam",
-        "opt_restore_spam": "Restore spam",
-        "opt_saved": "Saved packets",
-
-        "log_string_on": "[NetGarden] String mode: ON",
-        "log_string_off": "[NetGarden] String mode: OFF",
-        "log_spam_on": "[NetGarden] Auto-spam: ON",
-        "log_spam_off": "[NetGarden] Auto-spam: OFF",
-        "log_restore_hidden": "[NetGarden] Restoring hidden packets...",
-        "log_no_spams": "[NetGarden] No spams to restore",
-        "log_saved": "[NetGarden] Saved packet: {id}",
-
-        "saved_title": "NetGarden 🌱 | Saved packets",
-        "saved_hint": "Click a packet to jump to it:",
-    }
-}
-
-
-def load_settings():
-    if not os.path.exists(SETTINGS_PATH):
-        return {"lang": LANG_PT}
-    try:
-        with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, dict):
-            return {"lang": LANG_PT}
-        return {"lang": data.get("lang", LANG_PT)}
-    except:
-        return {"lang": LANG_PT}
-
-
-def save_settings(settings):
-    try:
-        with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-            json.dump(settings, f, ensure_ascii=False, indent=2)
-    except:
-        pass
-
-
-def tr(lang, key, **kwargs):
-    pack = STRINGS.get(lang, STRINGS[LANG_PT])
-    text = pack.get(key, key)
-    if kwargs:
-        try:
-            return text.format(**kwargs)
-        except:
-            return text
-    return text
+import json
+import os
+
+SETTINGS_PATH = os.path.join(os.path.dirname(__file__), "settings.json")
+
+LANG_PT = "pt-BR"
+LANG_EN = "en"
+
+STRINGS = {
+    LANG_PT: {
+        "app_launcher_title": "NetGarden 🌱 | Launcher",
+        "start_proxy": "Iniciar Proxy",
+        "client_ip": "IP do Client:",
+        "client_port": "Porta do Client:",
+        "server_ip": "IP do Server:",
+        "server_port": "Porta do Server:",
+        "local_btn": "Local (127.0.0.1)",
+        "recents": "Conexões recentes:",
+        "clear_recents": "Limpar recentes",
+        "invalid_ports": "As portas precisam ser números.",
+        "batch_size": "Lote (pacotes):",
+        "flush_interval": "Intervalo (ms):",
+        "max_packets": "Máx. pacotes na RAM (0 = sem limite):",
+        "max_mb": "Máx. MB na RAM:",
+        "retention_help": "Frames antigos vão pro disco em blocos de até 1/4 do limite; o bloco atual fica na RAM, então o uso pode passar do limite em até 25%.",
+        "max_hidden": "Máx. ocultos guardados por ID (0 = sem limite):",
+        "preconnect": "Conexões prontas com o servidor (0 = desligado):",
+        "capture_path": "Salvar captura em:",
+        "capture_path_ph": "(vazio = não salvar)",
+        "browse": "...",
+        "open_capture": "Abrir captura...",
+        "capture_filter": "Capturas NetGarden (*.ngcap)",
+        "capture_open_failed": "Não foi possível abrir a captura:\n{error}",
+        "metrics_port": "Porta de métricas (0 = desligado):",
+        "metrics_file": "Arquivo de métricas:",
+        "metrics_file_ph": "(vazio = não gravar)",
+        "language": "Idioma:",
+        "ptbr": "Português (BR)",
+        "en": "English",
+        "queue_policy": "Fila de inspeção cheia:",
+        "queue_policy_drop": "Descartar cópia",
+        "queue_policy_sample": "Amostrar",
+        "queue_policy_block": "Bloquear",
+
+        "main_title": "NetGarden 🌱",
+        "filter_ph": "Filtrar por ID ou campo (WCM msg~oi, SB x=10..20)...",
+        "filter_help": "ID ou nome do NetStrings; campo=valor, != > >= < <=, ~ (contém), a..b (faixa);\ncaminho com pontos (W.size.x); -termo nega; espaço = e, or = ou",
+        "options": "Opções",
+        "stop_proxy": "Parar proxy",
+        "close_capture": "Fechar captura",
+        "stats": "Pacotes: {total} | Client: {client} | Server: {server}",
+        "queue_depth": "Fila: {pending} | Inspeção: {inspect} | Ocultos: {hidden} | Cache decode: {cache:.0%}",
+
+        "mode_tree": "Modo: Árvore",
+        "mode_decode": "Modo: Decodificar",
+        "tree_hint_left": "Clique em um pacote",
+        "tree_more": "... mostrar mais ({remaining} restantes)",
+        "decoded_hint": "Decodificado (JSON) aparecerá aqui...",
+        "no_packet": "Nenhum pacote.",
+        "no_bson": "Sem BSON parseado (raw/unknown).",
+        "rendering": "Formatando...",
+
+        "ctx_color": "Por cor",
+        "ctx_view_full": "Ver por extenso",
+        "ctx_save": "Salvar pacote",
+        "ctx_mark_hb": "Marcar como Heartbeat (ocultar)",
+        "ctx_expand_run": "Expandir grupo (×{count})",
+        "ctx_collapse_run": "Recolher grupo",
+
+        "opt_string_mode": "Ver em string (BETA)",
+        "opt_auto_spam": "Auto-ocultar spam",
+        "opt_collapse_id": "Agrupar repetidos (mesmo ID)",
+        "opt_collapse_content": "Agrupar repetidos (mesmo conteúdo)",
+        "opt_restore_spam": "Restaurar spam",
+        "opt_saved": "Pacotes salvos",
+        "opt_metrics": "Métricas",
+
+        "log_string_on": "[NetGarden] String mode: ON",
+        "log_string_off": "[NetGarden] String mode: OFF",
+        "log_strings_reloaded": "[NetGarden] NetStrings recarregado ({count} nomes)",
+        "log_spam_on": "[NetGarden] Auto-spam: ON",
+        "log_spam_off": "[NetGarden] Auto-spam: OFF",
+        "log_collapse_id": "[NetGarden] Collapse: ID",
+        "log_collapse_content": "[NetGarden] Collapse: content",
+        "log_collapse_off": "[NetGarden] Collapse: OFF",
+        "log_restore_hidden": "[NetGarden] Restoring hidden packets...",
+        "log_no_spams": "[NetGarden] No spams to restore",
+        "log_saved": "[NetGarden] Pacote salvo: {id}",
+        "log_jump_hidden": "[NetGarden] Pacote {id} está oculto na lista; mostrando só no inspector",
+        "log_capture_opened": "[NetGarden] Captura aberta: {path} ({count} pacotes)",
+
+        "saved_title": "NetGarden 🌱 | Pacotes salvos",
+        "saved_hint": "Clique em um pacote para pular até ele:",
+
+        "metrics_title": "NetGarden 🌱 | Métricas",
+        "metrics_off": "Métricas desligadas (proxy não iniciado).",
+        "metrics_summary": "Fila GUI: {gui} | Fila inspeção: {inspect} | Descartados: {dropped}",
+        "metrics_headers": "Sessão|Direção|Frames/s|KB/s|Frames|Bytes|Tamanho p50/p99|Scan ID p50/p99 (ms)|Decode pool p50/p99 (ms)|Envio p99 (ms)|Resets",
+    },
+
+    LANG_EN: {
+        "app_launcher_title": "NetGarden 🌱 | Launcher",
+        "start_proxy": "Start Proxy",
+        "client_ip": "Client IP:",
+        "client_port": "Client Port:",
+        "server_ip": "Server IP:",
+        "server_port": "Server Port:",
+        "local_btn": "Local (127.0.0.1)",
+        "recents": "Recent connections:",
+        "clear_recents": "Clear recents",
+        "invalid_ports": "Ports must be numbers.",
+        "batch_size": "Batch (packets):",
+        "flush_interval": "Flush (ms):",
+        "max_packets": "Max packets in RAM (0 = unlimited):",
+        "max_mb": "Max MB in RAM:",
+        "retention_help": "Older frames move to disk in blocks of up to 1/4 of the limit; the current block stays in RAM, so usage can exceed the limit by up to 25%.",
+        "max_hidden": "Max hidden packets kept per ID (0 = unlimited):",
+        "preconnect": "Pre-connected upstreams (0 = off):",
+        "capture_path": "Save capture to:",
+        "capture_path_ph": "(empty = don't save)",
+        "browse": "...",
+        "open_capture": "Open capture...",
+        "capture_filter": "NetGarden captures (*.ngcap)",
+        "capture_open_failed": "Could not open capture:\n{error}",
+        "metrics_port": "Metrics port (0 = off):",
+        "metrics_file": "Metrics file:",
+        "metrics_file_ph": "(empty = don't write)",
+        "language": "Language:",
+        "ptbr": "Português (BR)",
+        "en": "English",
+        "queue_policy": "Inspection queue full:",
+        "queue_policy_drop": "Drop copy",
+        "queue_policy_sample": "Sample",
+        "queue_policy_block": "Block",
+
+        "main_title": "NetGarden 🌱",
+        "filter_ph": "Filter by ID or field (WCM msg~hi, SB x=10..20)...",
+        "filter_help": "ID or NetStrings name; field=value, != > >= < <=, ~ (contains), a..b (range);\ndotted paths (W.size.x); -term negates; space = and, or = or",
+        "options": "Options",
+        "stop_proxy": "Stop proxy",
+        "close_capture": "Close capture",
+        "stats": "Packets: {total} | Client: {client} | Server: {server}",
+        "queue_depth": "Queue: {pending} | Inspect: {inspect} | Hidden: {hidden} | Decode cache: {cache:.0%}",
+
+        "mode_tree": "Mode: Tree",
+        "mode_decode": "Mode: Decode",
+        "tree_hint_left": "Click a packet",
+        "tree_more": "... show more ({remaining} left)",
+        "decoded_hint": "Decoded (JSON) will appear here...",
+        "no_packet": "No packet.",
+        "no_bson": "No parsed BSON (raw/unknown).",
+        "rendering": "Rendering...",
+
+        "ctx_color": "By color",
+        "ctx_view_full": "View decoded",
+        "ctx_save": "Save packet",
+        "ctx_mark_hb": "Mark as Heartbeat (hide)",
+        "ctx_expand_run": "Expand group (×{count})",
+        "ctx_collapse_run": "Collapse group",
+
+        "opt_string_mode": "String mode (BETA)",
+        "opt_auto_spam": "Auto-hide spam",
+        "opt_collapse_id": "Collapse repeats (same ID)",
+        "opt_collapse_content": "Collapse repeats (same content)",
+        "opt_restore_spam": "Restore spam",
+        "opt_saved": "Saved packets",
+        "opt_metrics": "Metrics",
+
+        "log_string_on": "[NetGarden] String mode: ON",
+        "log_string_off": "[NetGarden] String mode: OFF",
+        "log_strings_reloaded": "[NetGarden] NetStrings reloaded ({count} names)",
+        "log_spam_on": "[NetGarden] Auto-spam: ON",
+        "log_spam_off": "[NetGarden] Auto-spam: OFF",
+        "log_collapse_id": "[NetGarden] Collapse: ID",
+        "log_collapse_content": "[NetGarden] Collapse: content",
+        "log_collapse_off": "[NetGarden] Collapse: OFF",
+        "log_restore_hidden": "[NetGarden] Restoring hidden packets...",
+        "log_no_spams": "[NetGarden] No spams to restore",
+        "log_saved": "[NetGarden] Saved packet: {id}",
+        "log_jump_hidden": "[NetGarden] Packet {id} is hidden in the list; showing it in the inspector only",
+        "log_capture_opened": "[NetGarden] Capture opened: {path} ({count} packets)",
+
+        "saved_title": "NetGarden 🌱 | Saved packets",
+        "saved_hint": "Click a packet to jump to it:",
+
+        "metrics_title": "NetGarden 🌱 | Metrics",
+        "metrics_off": "Metrics off (proxy not started).",
+        "metrics_summary": "GUI queue: {gui} | Inspect queue: {inspect} | Dropped: {dropped}",
+        "metrics_headers": "Session|Direction|Frames/s|KB/s|Frames|Bytes|Size p50/p99|ID scan p50/p99 (ms)|Pool decode p50/p99 (ms)|Send p99 (ms)|Resets",
+    }
+}
+
+
+def load_settings():
+    if not os.path.exists(SETTINGS_PATH):
+        return {"lang": LANG_PT}
+    try:
+        with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            return {"lang": LANG_PT}
+        return {"lang": data.get("lang", LANG_PT)}
+    except:
+        return {"lang": LANG_PT}
+
+
+def save_settings(settings):
+    try:
+        with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
+            json.dump(settings, f, ensure_ascii=False, indent=2)
+    except:
+        pass
+
+
+def tr(lang, key, **kwargs):
+    pack = STRINGS.get(lang, STRINGS[LANG_PT])
+    text = pack.get(key, key)
+    if kwargs:
+        try:
+            return text.format(**kwargs)
+        except:
+            return text
+    return text
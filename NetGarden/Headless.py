@@ -0,0 +1,202 @@
+import sys
+import json
+import time
+import argparse
+import datetime
+import threading
+
+# Modo sem GUI: so importa NetGarden.CORE (nunca PySide6 / NetGarden.GUI),
+# pra rodar em maquina Linux sem display do lado dos servidores de teste.
+from NetGarden.CORE.Engine import ProxyEngine
+from NetGarden.CORE.Proxy import Proxy
+from NetGarden.CORE.Pipeline import InspectionPipeline, POLICIES, POLICY_DROP, DEFAULT_DECODE_THRESHOLD
+from NetGarden.CORE.Capture import CaptureWriter
+from NetGarden.CORE.Metrics import ProxyMetrics, MetricsExporter
+from NetGarden.CORE.Packet import decode_cache
+from NetGarden.CORE.Preconnect import UpstreamPool, DEFAULT_PRECONNECT_IDLE
+
+MODE_PACKETS = "packets"
+MODE_IDS = "ids"
+MODE_STATS = "stats"
+MODE_QUIET = "quiet"
+MODES = (MODE_PACKETS, MODE_IDS, MODE_STATS, MODE_QUIET)
+# no fim, quanto esperar a fila de inspecao esvaziar antes de fechar a captura
+DRAIN_TIMEOUT = 10.0
+
+
+def _json_safe(obj):
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.hex()
+    return str(obj)
+
+
+class HeadlessRunner:
+    def __init__(self, args, out=None):
+        self.args = args
+        self.out = out or sys.stdout
+        self.capture = None
+        self.counts = {"client": 0, "server": 0}
+        self.bytes = {"client": 0, "server": 0}
+        self._out_lock = threading.Lock()
+        self._closed = threading.Event()
+        # captured e monotonic; a captura guarda hora de parede (igual ao PacketStore)
+        self._wall_offset = time.time() - time.monotonic()
+
+    def on_log(self, msg):
+        print(msg, file=sys.stderr, flush=True)
+
+    def on_packet(self, packet):
+        direction = packet.direction
+        self.counts[direction] = self.counts.get(direction, 0) + 1
+        self.bytes[direction] = self.bytes.get(direction, 0) + len(packet.raw)
+
+        if self.capture is not None:
+            captured = getattr(packet, "captured", None)
+            self.capture.append(
+                direction, packet.raw, packet.id,
+                wall_time=None if captured is None else self._wall_offset + captured,
+                session=packet.session, seq=packet.seq
+            )
+
+        mode = self.args.mode
+        if mode == MODE_PACKETS:
+            line = json.dumps({
+                "time": packet.timestamp,
+                "seq": packet.seq,
+                "session": packet.session,
+                "direction": direction,
+                "id": packet.id,
+                "data": packet.parsed
+            }, ensure_ascii=False, default=_json_safe)
+        elif mode == MODE_IDS:
+            line = f"[{packet.timestamp}] {direction} #{packet.session} {packet.id} ({len(packet.raw)} bytes)"
+        else:
+            return
+
+        with self._out_lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def on_close(self):
+        self._closed.set()
+
+    def stats_line(self, pipeline, elapsed):
+        c = self.counts.get("client", 0)
+        s = self.counts.get("server", 0)
+        return (
+            f"[NetGarden] {elapsed:.0f}s | Packets: {c + s} | Client: {c} ({self.bytes.get('client', 0)} B)"
+            f" | Server: {s} ({self.bytes.get('server', 0)} B)"
+            f" | Queue: {pipeline.depth()} | Dropped: {pipeline.dropped}"
+            + (f" | Pooled: {pipeline.pooled}" if pipeline.decode_workers else "")
+            + f" | Decode cache: {decode_cache.hit_rate():.0%}"
+        )
+
+    def run(self):
+        args = self.args
+        if args.capture:
+            self.capture = CaptureWriter(args.capture)
+
+        metrics = ProxyMetrics()
+        pipeline = InspectionPipeline(
+            on_packet=self.on_packet,
+            on_log=self.on_log,
+            maxsize=args.queue_size,
+            policy=args.queue_policy,
+            metrics=metrics,
+            decode_workers=args.decode_workers,
+            decode_threshold=args.decode_threshold
+        )
+        metrics.set_gauge("inspect_queue_depth", pipeline.depth, "Frames waiting in the inspection queue.")
+        metrics.set_gauge("inspect_dropped", lambda: pipeline.dropped, "Inspection copies dropped by the queue policy.")
+        metrics.set_gauge("decode_cache_hit_ratio", decode_cache.hit_rate, "Share of decodes served by the decode cache.")
+
+        exporter = None
+        if args.metrics_port or args.metrics_file:
+            exporter = MetricsExporter(metrics, path=args.metrics_file, port=args.metrics_port,
+                                       interval=args.stats_interval, on_log=self.on_log)
+            exporter.start()
+
+        upstream_pool = None
+        if args.preconnect > 0:
+            upstream_pool = UpstreamPool(args.server_host, args.server_port, size=args.preconnect,
+                                         max_idle=args.preconnect_idle, on_log=self.on_log)
+            metrics.set_gauge("upstream_preconnected", upstream_pool.ready, "Upstream connections open and waiting for a client.")
+            metrics.set_gauge("upstream_connect_saved_seconds", lambda: upstream_pool.saved,
+                              "Connect time saved by handing out pre-connected upstreams.")
+
+        engine_cls = Proxy if args.threaded else ProxyEngine
+        proxy = engine_cls(
+            listen_host=args.listen_host,
+            listen_port=args.listen_port,
+            server_host=args.server_host,
+            server_port=args.server_port,
+            on_packet=self.on_packet,
+            on_log=self.on_log,
+            on_close=self.on_close,
+            pipeline=pipeline,
+            metrics=metrics,
+            upstream_pool=upstream_pool
+        )
+
+        started = time.monotonic()
+        proxy.start()
+        try:
+            while not self._closed.wait(args.stats_interval):
+                if args.mode == MODE_STATS:
+                    self.on_log(self.stats_line(pipeline, time.monotonic() - started))
+        except KeyboardInterrupt:
+            proxy.stop()
+            self._closed.wait(2)
+        finally:
+            # o consumidor ainda pode estar entregando a fila: a captura so fecha depois
+            pipeline.close()
+            if not pipeline.join(DRAIN_TIMEOUT):
+                self.on_log(f"[ERROR] Inspection queue still draining after {DRAIN_TIMEOUT:.0f}s; {pipeline.depth()} frames not recorded")
+            if self.capture is not None:
+                self.capture.close()
+            if exporter is not None:
+                exporter.stop()
+            self.on_log(self.stats_line(pipeline, time.monotonic() - started))
+        return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m NetGarden.Headless", description="NetGarden proxy without GUI")
+    parser.add_argument("--listen-host", default="127.0.0.1")
+    parser.add_argument("--listen-port", type=int, default=10001)
+    parser.add_argument("--server-host", required=True)
+    parser.add_argument("--server-port", type=int, required=True)
+    parser.add_argument("--mode", choices=MODES, default=MODE_IDS,
+                        help="packets = decoded JSON lines, ids = one line per packet, stats = periodic counters only,"
+                             " quiet = no per-packet output (use with --capture / --metrics-*)")
+    parser.add_argument("--output", help="write packet lines to this file instead of stdout")
+    parser.add_argument("--capture", help="also record everything to a .ngcap capture file")
+    parser.add_argument("--stats-interval", type=float, default=5.0)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--queue-policy", choices=POLICIES, default=POLICY_DROP)
+    parser.add_argument("--decode-workers", type=int, default=0,
+                        help="decode frames >= --decode-threshold bytes on this many worker processes (0 = inline)")
+    parser.add_argument("--decode-threshold", type=int, default=DEFAULT_DECODE_THRESHOLD)
+    parser.add_argument("--preconnect", type=int, default=0,
+                        help="keep this many upstream connections open so a new client skips the connect (0 = off)")
+    parser.add_argument("--preconnect-idle", type=float, default=DEFAULT_PRECONNECT_IDLE,
+                        help="replace a pre-connected upstream after this many idle seconds")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", help="rewrite Prometheus metrics to this file every --stats-interval")
+    parser.add_argument("--threaded", action="store_true", help="use the single-session threaded Proxy")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as out:
+            return HeadlessRunner(args, out).run()
+    return HeadlessRunner(args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
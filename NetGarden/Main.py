@@ -1,57 +1,131 @@
-import sys
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import QTimer
-
-from NetGarden.GUI.i18n import load_settings
-from NetGarden.GUI.ConfigWindow import ConfigWindow
-from NetGarden.GUI.MainWindow import MainWindow
-from NetGarden.CORE.Proxy import Proxy
-
-
-def main():
-    app = QApplication(sys.argv)
-
-    settings = load_settings()
-    lang = settings.get("lang", "pt-BR")
-
-    main_window = MainWindow(lang)
-    proxy_holder = {"proxy": None}
-    config_window = None
-
-    def reopen_launcher():
-        main_window.hide()
-        config_window.show()
-
-    def on_proxy_closed():
-        QTimer.singleShot(0, reopen_launcher)
-
-    def on_start(cfg):
-        nonlocal main_window
-        # se mudar idioma no launcher, aplica aqui
-        lang2 = cfg.get("lang", lang)
-        main_window.lang = lang2
-        main_window.apply_lang()
-
-        main_window.show()
-        config_window.hide()
-
-        proxy = Proxy(
-            listen_host=cfg["client_ip"],
-            listen_port=cfg["client_port"],
-            server_host=cfg["server_ip"],
-            server_port=cfg["server_port"],
-            on_packet=main_window.add_packet,
-            on_log=main_window.add_log,
-            on_close=on_proxy_closed
-        )
-        proxy_holder["proxy"] = proxy
-        proxy.start()
-
-    config_window = ConfigWindow(on_start=on_start, lang=lang)
-    config_window.show()
-
-    sys.exit(app.exec())
-
-
-if __name__ == "__main__":
-    main()
+import sys
+from PySide6.QtWidgets import QApplication
+
+from NetGarden.GUI.i18n import load_settings
+from NetGarden.GUI.ConfigWindow import ConfigWindow
+from NetGarden.GUI.MainWindow import MainWindow
+from NetGarden.CORE.Engine import ProxyEngine
+from NetGarden.CORE.Pipeline import InspectionPipeline, POLICY_DROP
+from NetGarden.CORE.Capture import CaptureWriter, CaptureReader
+from NetGarden.CORE.Metrics import ProxyMetrics, MetricsExporter
+from NetGarden.CORE.Preconnect import UpstreamPool
+
+
+def main():
+    app = QApplication(sys.argv)
+
+    settings = load_settings()
+    lang = settings.get("lang", "pt-BR")
+
+    main_window = MainWindow(lang)
+    proxy_holder = {"proxy": None, "exporter": None}
+    config_window = None
+
+    def reopen_launcher():
+        main_window.hide()
+        config_window.show()
+
+    # chega pelo proxy_closed do MainWindow: ja esta no thread do GUI
+    def on_proxy_closed():
+        proxy_holder["proxy"] = None
+        main_window.live_store.set_capture(None)
+        if proxy_holder["exporter"] is not None:
+            proxy_holder["exporter"].stop()
+            proxy_holder["exporter"] = None
+        reopen_launcher()
+
+    # botao do MainWindow: o engine para, o on_close reabre o launcher;
+    # sem proxy (captura aberta) volta direto
+    def on_stop():
+        proxy = proxy_holder["proxy"]
+        if proxy is not None:
+            proxy.stop()
+        else:
+            reopen_launcher()
+
+    main_window.on_stop = on_stop
+    main_window.on_proxy_closed = on_proxy_closed
+
+    def on_open_capture(path):
+        reader = CaptureReader(path)
+        main_window.open_capture(reader)
+        main_window.show()
+        config_window.hide()
+
+    def on_start(cfg):
+        nonlocal main_window
+        # se mudar idioma no launcher, aplica aqui
+        lang2 = cfg.get("lang", lang)
+        main_window.lang = lang2
+        main_window.apply_lang()
+
+        main_window.use_live_store()
+        main_window.set_batching(cfg.get("batch_size"), cfg.get("flush_interval_ms"))
+        main_window.store.set_retention(
+            max_packets=cfg.get("max_packets", 0),
+            max_bytes=cfg.get("max_mb", 0) * 1024 * 1024
+        )
+        main_window.spam_filter.set_cap(cfg.get("max_hidden", 0))
+        if cfg.get("capture_path"):
+            main_window.live_store.set_capture(CaptureWriter(cfg["capture_path"]))
+        main_window.show()
+        config_window.hide()
+
+        metrics = ProxyMetrics()
+        pipeline = InspectionPipeline(
+            on_packet=main_window.add_packet,
+            on_log=main_window.add_log,
+            policy=cfg.get("queue_policy", POLICY_DROP),
+            metrics=metrics
+        )
+        metrics.set_gauge("inspect_queue_depth", pipeline.depth, "Frames waiting in the inspection queue.")
+        metrics.set_gauge("inspect_dropped", lambda: pipeline.dropped, "Inspection copies dropped by the queue policy.")
+
+        main_window.set_pipeline(pipeline)
+        main_window.set_metrics(metrics)
+
+        if cfg.get("metrics_port") or cfg.get("metrics_file"):
+            exporter = MetricsExporter(
+                metrics,
+                path=cfg.get("metrics_file") or None,
+                port=cfg.get("metrics_port", 0),
+                on_log=main_window.add_log
+            )
+            try:
+                exporter.start()
+                proxy_holder["exporter"] = exporter
+            except OSError as e:
+                main_window.add_log(f"[ERROR] Metrics export failed: {e}")
+
+        upstream_pool = None
+        if cfg.get("preconnect", 0) > 0:
+            upstream_pool = UpstreamPool(cfg["server_ip"], cfg["server_port"], size=cfg["preconnect"],
+                                         on_log=main_window.add_log)
+            metrics.set_gauge("upstream_preconnected", upstream_pool.ready, "Upstream connections open and waiting for a client.")
+
+        proxy = ProxyEngine(
+            listen_host=cfg["client_ip"],
+            listen_port=cfg["client_port"],
+            server_host=cfg["server_ip"],
+            server_port=cfg["server_port"],
+            on_packet=main_window.add_packet,
+            on_log=main_window.add_log,
+            on_close=main_window.proxy_closed,
+            pipeline=pipeline,
+            metrics=metrics,
+            upstream_pool=upstream_pool
+        )
+        proxy_holder["proxy"] = proxy
+        proxy.start()
+
+    config_window = ConfigWindow(on_start=on_start, lang=lang, on_open_capture=on_open_capture)
+    config_window.show()
+
+    # fecha a captura e apaga o arquivo de spill temporario
+    app.aboutToQuit.connect(main_window.shutdown)
+
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
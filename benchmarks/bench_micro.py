@@ -0,0 +1,219 @@
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import BSON
+from NetGarden.CORE.Framing import FrameBuffer
+from NetGarden.CORE.Packet import scan_packet_id
+
+# Microbenchmarks dos caminhos quentes, com payloads sinteticos fixos:
+# framing, decode BSON x scan so do ID, arvore do inspector (InspectorModel +
+# auto_expand) e json.dumps do modo decode. Reporta tempo por operacao e alocacao (pico do tracemalloc).
+#
+#   python benchmarks/bench_micro.py
+#   python benchmarks/bench_micro.py --only bson --output micro.json
+
+
+def encode_frame(doc):
+    body = BSON.encode(doc)
+    return (len(body) + 4).to_bytes(4, "little") + body
+
+
+def world_doc(blocks=20000):
+    return {
+        "ID": "GWC",
+        "WN": "BENCHWORLD",
+        "W": {
+            "size": {"x": 200, "y": 100},
+            "blocks": [{"x": i % 200, "y": i // 200, "t": i % 37, "bg": i % 5} for i in range(blocks)],
+            "items": {str(i): {"id": i, "amount": i % 99, "name": "item-%d" % i} for i in range(blocks // 20)},
+        },
+        "raw": bytes(range(256)) * 64,
+    }
+
+
+PING = encode_frame({"ID": "p", "T": 123456})
+POSITION = encode_frame({"ID": "mP", "x": 12.5, "y": 33.25, "a": 3, "d": 1, "t": 99, "U": "bench-player-000001"})
+WORLD = encode_frame(world_doc())
+
+# stream com mix fixo, recortado em pedacos de 4096 como o recv antigo
+STREAM = (PING + POSITION) * 2000 + WORLD + (POSITION * 500)
+CHUNK = 4096
+
+
+def frame_legacy(stream):
+    # copia do loop original do Proxy._pipe (extend + bytes(slice) + del)
+    buffer = bytearray()
+    count = 0
+    for pos in range(0, len(stream), CHUNK):
+        buffer.extend(stream[pos:pos + CHUNK])
+        while True:
+            if len(buffer) < 4:
+                break
+            length = int.from_bytes(buffer[0:4], "little", signed=False)
+            if len(buffer) < length:
+                break
+            frame = bytes(buffer[:length])
+            del buffer[:length]
+            count += 1
+    return count
+
+
+def frame_buffer(stream):
+    framer = FrameBuffer()
+    count = 0
+    view = memoryview(stream)
+    for pos in range(0, len(stream), CHUNK):
+        framer.feed(view[pos:pos + CHUNK])
+        for _ in framer.frames():
+            count += 1
+    return count
+
+
+def _json_safe_default():
+    # mesmo default do JsonRenderer.json_safe, sem importar o GUI
+    import datetime
+
+    def _json_safe(obj):
+        if isinstance(obj, (datetime.datetime, datetime.date)):
+            return obj.isoformat()
+        if isinstance(obj, (bytes, bytearray)):
+            return obj.hex()
+        return str(obj)
+    return _json_safe
+
+
+def _bench(name, fn, number, repeat=5):
+    gc.collect()
+    fn()
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = (time.perf_counter() - start) / number
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "name": name,
+        "us_per_op": round(best * 1e6, 3),
+        "peak_alloc_bytes": peak - before,
+        "retained_bytes": current - before,
+    }
+    print(f"{name:>34}: {result['us_per_op']:>12.3f} us/op  peak {result['peak_alloc_bytes']:>11} B  retained {result['retained_bytes']:>9} B", flush=True)
+    return result
+
+
+def bench_framing():
+    return [
+        _bench("framing.legacy_bytearray", lambda: frame_legacy(STREAM), 3),
+        _bench("framing.FrameBuffer", lambda: frame_buffer(STREAM), 3),
+    ]
+
+
+def bench_bson():
+    results = []
+    for label, frame in (("ping", PING), ("position", POSITION), ("world", WORLD)):
+        number = 20 if frame is WORLD else 20000
+        body = frame[4:]
+        results.append(_bench(f"bson.decode.{label}", lambda body=body: BSON(body).decode(), number))
+        results.append(_bench(f"bson.scan_id.{label}", lambda frame=frame: scan_packet_id(frame), number * 10 if frame is WORLD else number))
+    return results
+
+
+def _qt_app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def bench_inspector():
+    app = _qt_app()
+    from PySide6.QtCore import Qt, QModelIndex
+    from PySide6.QtWidgets import QTreeView
+    from NetGarden.GUI.InspectorModel import InspectorModel, auto_expand
+
+    model = InspectorModel()
+    view = QTreeView()
+    view.setModel(model)
+    view.setUniformRowHeights(True)
+    small = BSON(POSITION[4:]).decode()
+    world = world_doc(5000)
+
+    # o que a view faz ao mostrar um pacote: monta a raiz, expande e pinta as linhas abertas
+    def show(doc):
+        model.set_items([("ID", "x", doc), ("Direction", "client", None), ("Time", "00:00:00", None)])
+        auto_expand(view, model)
+        pending = [QModelIndex()]
+        while pending:
+            parent = pending.pop()
+            for row in range(model.rowCount(parent)):
+                index = model.index(row, 0, parent)
+                model.data(index, Qt.DisplayRole)
+                model.data(model.index(row, 1, parent), Qt.DisplayRole)
+                if view.isExpanded(index):
+                    pending.append(index)
+
+    results = [
+        _bench("inspector.model.position", lambda: show(small), 200),
+        _bench("inspector.model.world_5k", lambda: show(world), 20, repeat=3),
+    ]
+    model.clear()
+    app.processEvents()
+    return results
+
+
+def bench_render_text():
+    default = _json_safe_default()
+    small = BSON(POSITION[4:]).decode()
+    world = BSON(WORLD[4:]).decode()
+    return [
+        _bench("render_text.json_dumps.position",
+               lambda: json.dumps(small, indent=2, ensure_ascii=False, default=default), 5000),
+        _bench("render_text.json_dumps.world",
+               lambda: json.dumps(world, indent=2, ensure_ascii=False, default=default), 3),
+    ]
+
+
+GROUPS = {
+    "framing": bench_framing,
+    "bson": bench_bson,
+    "inspector": bench_inspector,
+    "render": bench_render_text,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NetGarden hot-path microbenchmarks")
+    parser.add_argument("--only", action="append", choices=sorted(GROUPS), help="run only these groups (repeatable)")
+    parser.add_argument("--output", help="save results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.only or list(GROUPS):
+        results.extend(GROUPS[name]())
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+        print(f"saved {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
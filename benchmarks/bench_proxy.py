@@ -0,0 +1,325 @@
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import platform
+import threading
+import importlib
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import BSON
+from NetGarden.CORE.Framing import FrameBuffer
+from NetGarden.CORE.Proxy import Proxy
+from NetGarden.CORE.Engine import ProxyEngine
+from NetGarden.CORE.Pipeline import InspectionPipeline
+
+# Benchmark ponta a ponta: servidor falso + client sintetico em loopback,
+# trafego length-prefixed BSON com mixes realistas, medindo frames/s, MB/s e
+# latencia adicionada (p50/p99) por direcao. Resultado em JSON pra comparar
+# entre commits:
+#
+#   python benchmarks/bench_proxy.py --output bench-$(git rev-parse --short HEAD).json
+#   python benchmarks/bench_proxy.py --compare bench-old.json bench-new.json
+
+HOST = "127.0.0.1"
+
+
+def encode_frame(doc):
+    body = BSON.encode(doc)
+    return (len(body) + 4).to_bytes(4, "little") + body
+
+
+def make_ping(rng, i):
+    return encode_frame({"ID": "p", "T": i})
+
+
+def make_position(rng, i):
+    return encode_frame({
+        "ID": "mP", "x": rng.uniform(0, 100), "y": rng.uniform(0, 60),
+        "a": rng.randrange(8), "d": rng.randrange(4), "t": i, "U": "bench-player-%06d" % rng.randrange(10 ** 6)
+    })
+
+
+def make_world(rng, i, size=3 * 1024 * 1024):
+    return encode_frame({"ID": "GWC", "W": rng.randbytes(size), "WN": "BENCHWORLD%d" % i})
+
+
+# nome -> (gerador, quantidade, quantidade no --quick, taxa do passo de latencia em frames/s)
+SCENARIOS = {
+    "pings": (lambda rng, i: make_ping(rng, i), 20000, 4000, 2000),
+    "positions": (lambda rng, i: make_position(rng, i), 20000, 4000, 2000),
+    "world": (lambda rng, i: make_world(rng, i), 12, 4, 4),
+    "mixed": (lambda rng, i: make_world(rng, i) if i % 2500 == 2499 else
+              (make_ping(rng, i) if i % 3 == 0 else make_position(rng, i)), 10000, 2500, 1000),
+}
+
+
+def build_traffic(scenario, count, seed):
+    gen = SCENARIOS[scenario][0]
+    rng = random.Random(seed)
+    return [gen(rng, i) for i in range(count)]
+
+
+def _send_frames(sock, frames, times, rate):
+    interval = 1.0 / rate if rate else 0.0
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        if interval:
+            target = start + i * interval
+            delay = target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        times.append(time.perf_counter())
+        sock.sendall(frame)
+
+
+def _recv_frames(sock, expected, times):
+    framer = FrameBuffer()
+    while len(times) < expected:
+        if not framer.recv_into(sock):
+            break
+        now = time.perf_counter()
+        for _ in framer.frames():
+            times.append(now)
+
+
+class FakeGameServer:
+    def __init__(self, to_client, rate):
+        self.to_client = to_client
+        self.rate = rate
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((HOST, 0))
+        self.sock.listen(8)
+        self.port = self.sock.getsockname()[1]
+        self.recv_times = []
+        self.send_times = []
+        self._thread = None
+
+    def start(self, expected_from_client):
+        self._thread = threading.Thread(target=self._serve, args=(expected_from_client,), daemon=True)
+        self._thread.start()
+
+    def _serve(self, expected):
+        conn, _ = self.sock.accept()
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        writer = threading.Thread(target=_send_frames, args=(conn, self.to_client, self.send_times, self.rate), daemon=True)
+        writer.start()
+        _recv_frames(conn, expected, self.recv_times)
+        writer.join()
+        conn.close()
+
+    def join(self, timeout):
+        self._thread.join(timeout)
+        self.sock.close()
+
+
+def _engine_factory(name):
+    if name == "threaded":
+        return Proxy
+    if name == "event":
+        return ProxyEngine
+    # modulo:Classe com a mesma assinatura do Proxy, pra engines futuras
+    module, _, cls = name.partition(":")
+    return getattr(importlib.import_module(module), cls)
+
+
+def _free_port():
+    s = socket.socket()
+    s.bind((HOST, 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def run_once(engine, to_server, to_client, rate, use_pipeline, timeout=120):
+    server = FakeGameServer(to_client, rate)
+    server.start(len(to_server))
+
+    proxy = None
+    port = server.port
+    if engine != "direct":
+        port = _free_port()
+        pipeline = InspectionPipeline(lambda pkt: None) if use_pipeline else None
+        proxy = _engine_factory(engine)(HOST, port, HOST, server.port, lambda pkt: None, lambda msg: None, pipeline=pipeline)
+        proxy.start()
+
+    client = None
+    for _ in range(100):
+        try:
+            client = socket.create_connection((HOST, port))
+            break
+        except ConnectionRefusedError:
+            time.sleep(0.02)
+    client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    client_send, client_recv = [], []
+    started = time.perf_counter()
+    reader = threading.Thread(target=_recv_frames, args=(client, len(to_client), client_recv), daemon=True)
+    reader.start()
+    _send_frames(client, to_server, client_send, rate)
+    reader.join(timeout)
+    server.join(timeout)
+    elapsed = time.perf_counter() - started
+
+    client.close()
+    if proxy is not None:
+        proxy.stop()
+
+    return {
+        "client": (client_send, server.recv_times, sum(len(f) for f in to_server)),
+        "server": (server.send_times, client_recv, sum(len(f) for f in to_client)),
+        "elapsed": elapsed,
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def _latencies(sent, received):
+    n = min(len(sent), len(received))
+    return [(received[i] - sent[i]) * 1000.0 for i in range(n)]
+
+
+def bench(engines, scenarios, quick, use_pipeline, seed):
+    results = []
+    for scenario in scenarios:
+        _, count, quick_count, rate = SCENARIOS[scenario]
+        n = quick_count if quick else count
+        to_server = build_traffic(scenario, n, seed)
+        to_client = build_traffic(scenario, n, seed + 1)
+
+        # latencia base sem proxy, pra calcular a latencia adicionada
+        direct = run_once("direct", to_server, to_client, rate, False)
+        base = {d: percentile(_latencies(direct[d][0], direct[d][1]), 50) for d in ("client", "server")}
+        base99 = {d: percentile(_latencies(direct[d][0], direct[d][1]), 99) for d in ("client", "server")}
+
+        for engine in engines:
+            throughput = run_once(engine, to_server, to_client, 0, use_pipeline)
+            latency = run_once(engine, to_server, to_client, rate, use_pipeline)
+            for direction in ("client", "server"):
+                sent, received, nbytes = throughput[direction]
+                span = (received[-1] - sent[0]) if received and sent else 0.0
+                lat = _latencies(*latency[direction][:2])
+                p50 = percentile(lat, 50)
+                p99 = percentile(lat, 99)
+                result = {
+                    "engine": engine,
+                    "pipeline": use_pipeline,
+                    "scenario": scenario,
+                    "direction": direction,
+                    "frames": len(received),
+                    "expected_frames": n,
+                    "bytes": nbytes,
+                    "seconds": round(span, 6),
+                    "frames_per_s": round(len(received) / span, 1) if span else None,
+                    "mb_per_s": round(nbytes / span / 1e6, 2) if span else None,
+                    "latency_ms": {"p50": _round(p50), "p99": _round(p99)},
+                    "added_latency_ms": {
+                        "p50": _round(p50 - base[direction]) if p50 is not None and base[direction] is not None else None,
+                        "p99": _round(p99 - base99[direction]) if p99 is not None and base99[direction] is not None else None,
+                    },
+                }
+                results.append(result)
+                print(_format(result), flush=True)
+    return results
+
+
+def _round(v):
+    return None if v is None else round(v, 4)
+
+
+def _format(r):
+    return (
+        f"{r['engine']:>8} {r['scenario']:>9} {r['direction']:>6}: "
+        f"{r['frames']}/{r['expected_frames']} frames, {r['frames_per_s']} frames/s, {r['mb_per_s']} MB/s, "
+        f"latency p50={r['latency_ms']['p50']}ms p99={r['latency_ms']['p99']}ms, "
+        f"added p50={r['added_latency_ms']['p50']}ms p99={r['added_latency_ms']['p99']}ms"
+    )
+
+
+def _git_commit():
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=root, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(old_path, new_path):
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    def key(r):
+        return (r["engine"], r.get("pipeline"), r["scenario"], r["direction"])
+
+    old_by_key = {key(r): r for r in old["results"]}
+    for r in new["results"]:
+        o = old_by_key.get(key(r))
+        if not o:
+            continue
+        parts = []
+        for name, get in (
+            ("frames/s", lambda x: x["frames_per_s"]),
+            ("p50", lambda x: x["latency_ms"]["p50"]),
+            ("p99", lambda x: x["latency_ms"]["p99"]),
+        ):
+            a, b = get(o), get(r)
+            if a and b is not None:
+                parts.append(f"{name} {a} -> {b} ({(b - a) / a * 100:+.1f}%)")
+        print(f"{r['engine']:>8} {r['scenario']:>9} {r['direction']:>6}: " + ", ".join(parts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NetGarden proxy throughput/latency benchmark")
+    parser.add_argument("--engine", action="append",
+                        help="threaded, event or module:Class (repeatable; default: threaded and event)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="traffic mix (repeatable; default: all)")
+    parser.add_argument("--pipeline", action="store_true", help="run the engines in forward-first pipeline mode")
+    parser.add_argument("--quick", action="store_true", help="smaller traffic for a fast smoke run")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two saved result files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    engines = args.engine or ["threaded", "event"]
+    scenarios = args.scenario or list(SCENARIOS)
+    results = bench(engines, scenarios, args.quick, args.pipeline, args.seed)
+
+    if args.output:
+        report = {
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": args.quick,
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import pytest
+from bson import BSON
+from NetGarden.CORE.Capture import CaptureReader, CaptureWriter
+from NetGarden.CORE.Packet import decode_frame
+
+
+def encode_frame(doc):
+    body = BSON.encode(doc)
+    return (len(body) + 4).to_bytes(4, "little") + body
+
+
+def test_capture_round_trip(tmp_path):
+    path = str(tmp_path / "test.ngcap")
+    frames = [encode_frame({"ID": packet_id, "n": i}) for i, packet_id in enumerate(["mP", "WCM", "mP"])]
+    writer = CaptureWriter(path)
+    writer.append("client", frames[0], "mP", wall_time=1000.0, session=1, seq=10)
+    writer.append("server", frames[1], "WCM", wall_time=1001.5, session=None, seq=11)
+    writer.append("client", frames[2], "mP", wall_time=1002.0, session=2, seq=12)
+    writer.close()
+
+    reader = CaptureReader(path)
+    try:
+        assert len(reader) == 3
+        assert [bytes(reader.frame(row)) for row in range(3)] == frames
+        assert [reader.id_of(row) for row in range(3)] == ["mP", "WCM", "mP"]
+        assert [reader.seq_of(row) for row in range(3)] == [10, 11, 12]
+        assert [reader.session_of(row) for row in range(3)] == [1, None, 2]
+        assert [reader.direction_of(row) for row in range(3)] == ["client", "server", "client"]
+        assert reader.wall_time_of(1) == 1001.5
+        assert reader.row_of_seq(12) == 2
+        assert reader.row_of_seq(13) == -1
+        assert list(reader.rows_for_id(reader.id_code("mP"), "client")) == [0, 2]
+
+        packet = reader.packet(1)
+        assert packet.seq == 11
+        assert decode_frame(packet.raw)["n"] == 1
+    finally:
+        reader.close()
+
+
+def test_capture_ignores_truncated_record(tmp_path):
+    path = str(tmp_path / "cut.ngcap")
+    writer = CaptureWriter(path)
+    for i in range(2):
+        writer.append("client", encode_frame({"ID": "p", "n": i}), "p")
+    writer.close()
+    with open(path + ".idx", "r+b") as f:
+        f.seek(-10, 2)
+        f.truncate()
+
+    reader = CaptureReader(path)
+    try:
+        assert len(reader) == 1
+    finally:
+        reader.close()
+
+
+def test_capture_reopens_while_still_being_written(tmp_path):
+    path = str(tmp_path / "live.ngcap")
+    writer = CaptureWriter(path)
+    for i in range(4):
+        writer.append("client" if i % 2 else "server", encode_frame({"ID": "p", "n": i}), "p")
+    writer.flush()
+
+    reader = CaptureReader(path)
+    try:
+        assert len(reader) == 4
+        assert list(reader.rows_for_direction("client")) == [1, 3]
+        assert list(reader.rows_for_direction("server", end=2)) == [0]
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_capture_drops_records_without_data(tmp_path):
+    path = str(tmp_path / "ahead.ngcap")
+    writer = CaptureWriter(path)
+    frames = [encode_frame({"ID": "p", "n": i}) for i in range(3)]
+    for frame in frames:
+        writer.append("client", frame, "p")
+    writer.close()
+    # indice foi pro disco antes do ultimo frame
+    with open(path, "r+b") as f:
+        f.seek(-5, 2)
+        f.truncate()
+
+    reader = CaptureReader(path)
+    try:
+        assert len(reader) == 2
+        assert bytes(reader.frame(1)) == frames[1]
+    finally:
+        reader.close()
+
+
+def test_capture_rejects_other_files(tmp_path):
+    path = tmp_path / "other.ngcap"
+    path.write_bytes(b"not a capture")
+    with pytest.raises(ValueError):
+        CaptureReader(str(path))
@@ -0,0 +1,65 @@
+import json
+import pickle
+import pytest
+from NetGarden.CORE.DecodeCache import DecodeCache, FrozenDoc, freeze
+
+
+class CountingDecode:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, frame):
+        self.calls += 1
+        return {"frame": bytes(frame), "list": [1, {"x": 2}]}
+
+
+def test_admits_on_the_second_sighting():
+    cache = DecodeCache(max_entries=8)
+    decode = CountingDecode()
+    first = cache.get_or_decode(b"frame-a", decode)
+    assert type(first) is dict and len(cache) == 0
+    second = cache.get_or_decode(b"frame-a", decode)
+    assert isinstance(second, FrozenDoc) and len(cache) == 1
+    third = cache.get_or_decode(memoryview(b"frame-a"), decode)
+    assert third is second
+    assert decode.calls == 2
+    assert cache.hits == 1 and cache.misses == 2
+    assert cache.hit_rate() == pytest.approx(1 / 3)
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = DecodeCache(max_entries=2)
+    decode = CountingDecode()
+    for frame in (b"a", b"a", b"b", b"b"):
+        cache.get_or_decode(frame, decode)
+    cache.get_or_decode(b"a", decode)
+    for frame in (b"c", b"c"):
+        cache.get_or_decode(frame, decode)
+    assert len(cache) == 2
+    calls = decode.calls
+    cache.get_or_decode(b"a", decode)
+    assert decode.calls == calls
+    cache.get_or_decode(b"b", decode)
+    assert decode.calls == calls + 1
+
+
+def test_large_frames_bypass_the_cache():
+    cache = DecodeCache(max_frame_bytes=4)
+    decode = CountingDecode()
+    for _ in range(3):
+        cache.get_or_decode(b"too-large", decode)
+    assert decode.calls == 3 and len(cache) == 0
+    assert cache.hits == 0 and cache.misses == 0
+
+
+def test_frozen_docs_are_read_only_but_still_plain_data():
+    doc = freeze({"a": [1, {"b": 2}], "c": "d"})
+    with pytest.raises(TypeError):
+        doc["a"] = 1
+    with pytest.raises(TypeError):
+        doc["a"].append(3)
+    with pytest.raises(TypeError):
+        doc["a"][1]["b"] = 3
+    assert isinstance(doc, dict) and isinstance(doc["a"], list)
+    assert json.loads(json.dumps(doc)) == {"a": [1, {"b": 2}], "c": "d"}
+    assert pickle.loads(pickle.dumps(doc)) == doc
@@ -0,0 +1,90 @@
+from bson import BSON
+from NetGarden.CORE.FieldIndex import FieldIndex
+from NetGarden.CORE.Packet import decode_frame
+from NetGarden.CORE.PacketStore import PacketStore
+from NetGarden.CORE.PacketView import PacketView, FIELD_DECODE_ROWS
+from NetGarden.CORE.Query import parse_query, match_fields, matches
+
+
+def encode_frame(doc):
+    body = BSON.encode(doc)
+    return (len(body) + 4).to_bytes(4, "little") + body
+
+
+def make_store(count=60):
+    store = PacketStore()
+    for i in range(count):
+        doc = {"ID": "mP", "x": i, "name": f"p{i % 7}", "on": i % 2 == 0, "W": {"blocks": [{"t": i % 5}, {"t": 9}]}}
+        store.append("client", encode_frame(doc), "mP")
+    return store
+
+
+def test_lookup_agrees_with_decoding():
+    store = make_store()
+    index = FieldIndex(store)
+    index.index_rows(0, len(store))
+    assert index.indexed == len(store)
+    assert not index.partial
+
+    for text in ("x=10..20", "x>50", "x!=3", "name=p3", "name~P1", "on=true", "W.blocks.t=4", "missing=1"):
+        (term,) = parse_query(text, aliases={}).groups[0]
+        expected = {row for row in range(len(store)) if match_fields([term], decode_frame(store.frame(row)))}
+        with index.lock:
+            assert index.lookup(term) == expected, text
+    store.close()
+
+
+def test_oversized_frames_go_to_partial():
+    store = make_store(4)
+    index = FieldIndex(store, max_frame_bytes=10)
+    index.index_rows(0, len(store))
+    assert index.partial == {0, 1, 2, 3}
+    store.close()
+
+
+def test_stops_growing_at_max_bytes():
+    store = make_store()
+    index = FieldIndex(store, max_bytes=1)
+    index.index_rows(0, 10)
+    assert index.full
+    # cheio, start() nao sobe o indexador
+    index.start()
+    index.notify()
+    assert index.indexed == 10
+    store.close()
+
+
+def test_search_streams_as_the_index_advances():
+    store = make_store()
+    index = FieldIndex(store)
+    view = PacketView(store, index=index)
+    view.set_text("x>10 W.blocks.t=2 or name=p3")
+    expected = {row for row in range(len(store)) if matches(view.query, "mP", decode_frame(store.frame(row)))}
+
+    # nada indexado ainda: a busca nao decodifica o resto, so para no 0
+    split, stop = view.search(0, len(store))
+    assert stop == 0 and not split[0]
+
+    found = set()
+    start = 0
+    for indexed in (20, 45, len(store)):
+        index.index_rows(index.indexed, indexed)
+        split, start = view.search(start, len(store))
+        assert start == indexed
+        found.update(split[0])
+    assert found == expected
+    store.close()
+
+
+def test_search_past_a_full_index_decodes_in_steps():
+    store = make_store(FIELD_DECODE_ROWS + 100)
+    index = FieldIndex(store, max_bytes=1)
+    index.index_rows(0, 10)
+    view = PacketView(store, index=index)
+    view.set_text("name=p3")
+    split, stop = view.search(0, len(store))
+    assert stop == 10 + FIELD_DECODE_ROWS
+    split, stop = view.search(stop, len(store))
+    assert stop == len(store)
+    assert split[0] and all(row % 7 == 3 for row in split[0])
+    store.close()
@@ -0,0 +1,70 @@
+import socket
+import threading
+from bson import BSON
+from NetGarden.CORE.Framing import FrameBuffer
+
+
+def encode_frame(doc):
+    body = BSON.encode(doc)
+    return (len(body) + 4).to_bytes(4, "little") + body
+
+
+def test_frame_buffer_split_chunks():
+    frames = [encode_frame({"ID": "p", "n": i}) for i in range(5)]
+    data = b"".join(frames)
+    buf = FrameBuffer(initial_size=16)
+    out = []
+    for i in range(0, len(data), 7):
+        buf.feed(data[i:i + 7])
+        out.extend(bytes(frame) for frame in buf.frames())
+    assert out == frames
+    assert len(buf) == 0
+
+
+def test_frame_buffer_invalid_length_resets():
+    bad = []
+    buf = FrameBuffer(max_frame=64, on_invalid=bad.append)
+    buf.feed((1000).to_bytes(4, "little") + b"x" * 10)
+    assert list(buf.frames()) == []
+    assert bad == [1000]
+    assert buf.resets == 1 and len(buf) == 0
+
+    frame = encode_frame({"ID": "p"})
+    buf.feed(frame)
+    assert [bytes(f) for f in buf.frames()] == [frame]
+
+
+def test_frame_buffer_recv_into_and_large_frame():
+    big = encode_frame({"ID": "GWC", "blob": b"\x01" * 300000})
+    small = encode_frame({"ID": "p"})
+    a, b = socket.socketpair()
+    try:
+        # o socketpair nao segura 300 KB: manda de outra thread
+        sender = threading.Thread(target=b.sendall, args=(big + small,))
+        sender.start()
+        buf = FrameBuffer(initial_size=1024)
+        out = []
+        while len(out) < 2:
+            assert buf.recv_into(a, 65536) > 0
+            out.extend(bytes(frame) for frame in buf.frames())
+        sender.join()
+        assert out == [big, small]
+        assert buf.capacity >= len(big)
+
+        # buffer vazio depois do frame gigante volta pro tamanho inicial
+        b.sendall(small)
+        buf.recv_into(a, 512)
+        assert buf.capacity == 1024
+        assert [bytes(frame) for frame in buf.frames()] == [small]
+    finally:
+        a.close()
+        b.close()
+
+
+def test_frame_views_are_zero_copy():
+    frame = encode_frame({"ID": "p"})
+    buf = FrameBuffer()
+    buf.feed(frame * 2)
+    views = list(buf.frames())
+    assert all(isinstance(view, memoryview) for view in views)
+    assert [bytes(view) for view in views] == [frame, frame]
@@ -0,0 +1,38 @@
+from bson import BSON
+from NetGarden.CORE.Metrics import ProxyMetrics
+from NetGarden.CORE.Pipeline import InspectionPipeline
+
+
+def encode_frame(doc):
+    body = BSON.encode(doc)
+    return (len(body) + 4).to_bytes(4, "little") + body
+
+
+def test_inline_pipeline_records_scan_not_decode():
+    metrics = ProxyMetrics()
+    pipeline = InspectionPipeline(on_packet=lambda packet: None, metrics=metrics)
+    pipeline.start()
+    for i in range(5):
+        pipeline.submit("client", encode_frame({"ID": "p", "n": i}), "0", session=1)
+    pipeline.close()
+    assert pipeline.join(5)
+    m = metrics.totals()["client"]
+    assert m.scan_times.count == 5
+    assert m.decode_times.count == 0
+
+
+def test_export_keeps_totals_and_sessions_apart():
+    metrics = ProxyMetrics()
+    metrics.on_frame(1, "client", 100)
+    metrics.on_scan(1, "client", 0.00002)
+    metrics.on_frame(2, "client", 50)
+    metrics.close_session(2)
+    # decode atrasado de uma sessao ja fechada nao recria a sessao
+    metrics.on_decode(2, "client", 0.01)
+    assert set(metrics.sessions()) == {(1, "client")}
+
+    text = metrics.to_prometheus()
+    assert 'netgarden_bytes_total{direction="client"} 150' in text
+    assert 'netgarden_session_bytes_total{session="1",direction="client"} 100' in text
+    assert 'netgarden_id_scan_seconds_count{direction="client"} 1' in text
+    assert 'netgarden_decode_seconds_count{direction="client"} 0' in text
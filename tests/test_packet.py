@@ -0,0 +1,49 @@
+import struct
+import pytest
+from bson import BSON
+from NetGarden.CORE.Packet import scan_packet_id, decode_frame
+
+
+def encode_frame(doc):
+    body = BSON.encode(doc)
+    return (len(body) + 4).to_bytes(4, "little") + body
+
+
+def raw_frame(elements):
+    body = elements + b"\x00"
+    doc = struct.pack("<i", len(body) + 4) + body
+    return struct.pack("<I", len(doc) + 4) + doc
+
+
+@pytest.mark.parametrize("doc, expected", [
+    ({"ID": "mP", "x": 1}, "mP"),
+    ({"a": {"b": [1, 2]}, "s": "text", "bin": b"\x00\x01", "ID": "WCM"}, "WCM"),
+    ({"ID": 7}, "7"),
+    ({"ID": 1 << 40}, str(1 << 40)),
+    ({"x": 1}, "?"),
+])
+def test_scan_matches_decode(doc, expected):
+    frame = encode_frame(doc)
+    assert scan_packet_id(frame) == expected
+    assert scan_packet_id(memoryview(frame)) == expected
+    assert decode_frame(frame) == doc
+
+
+@pytest.mark.parametrize("element", [
+    b"\x03d\x00" + struct.pack("<i", -3) + b"\x00" * 8,
+    b"\x02s\x00" + struct.pack("<i", -3) + b"\x00" * 8,
+    b"\x05b\x00" + struct.pack("<i", -9) + b"\x00" * 8,
+    b"\x03d\x00" + struct.pack("<i", 0) + b"\x00" * 8,
+    b"\x02s\x00" + struct.pack("<i", 1000) + b"\x00",
+])
+def test_scan_rejects_bad_lengths(element):
+    with pytest.raises(ValueError):
+        scan_packet_id(raw_frame(element))
+
+
+def test_scan_rejects_bad_document_length():
+    frame = encode_frame({"ID": "mP"})
+    with pytest.raises(ValueError):
+        scan_packet_id(frame[:-1])
+    with pytest.raises(ValueError):
+        scan_packet_id(b"\x05\x00\x00\x00\x00")
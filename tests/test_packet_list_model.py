@@ -0,0 +1,76 @@
+import pytest
+from bson import BSON
+from NetGarden.CORE.PacketStore import PacketStore
+
+# unico teste que importa o GUI: sem PySide6 instalado fica de fora
+model_module = pytest.importorskip("NetGarden.GUI.PacketListModel")
+PacketListModel = model_module.PacketListModel
+COLLAPSE_ID = model_module.COLLAPSE_ID
+COLLAPSE_CONTENT = model_module.COLLAPSE_CONTENT
+
+
+def encode_frame(doc):
+    body = BSON.encode(doc)
+    return (len(body) + 4).to_bytes(4, "little") + body
+
+
+class CountingStore(PacketStore):
+    def __init__(self):
+        super().__init__()
+        self.frame_reads = 0
+
+    def frame(self, row):
+        self.frame_reads += 1
+        return super().frame(row)
+
+
+def make_model(packets):
+    store = CountingStore()
+    for packet_id, session, doc in packets:
+        store.append("client", encode_frame(doc), packet_id, session=session)
+    model = PacketListModel(store, colors={}, direction="client")
+    model.reset(range(len(store)))
+    return store, model
+
+
+def test_runs_never_mix_sessions():
+    store, model = make_model([("p", 1, {"ID": "p"})] * 2 + [("p", 2, {"ID": "p"})] * 3)
+    model.set_collapse(COLLAPSE_ID)
+    assert model.rowCount() == 2
+    assert [model.run_length(i) for i in range(2)] == [2, 3]
+    assert model.toggle_run(1) == 1
+    assert model.rowCount() == 4
+    assert model.is_expanded(3)
+    model.toggle_run(3)
+    assert model.rowCount() == 2
+    store.close()
+
+
+def test_content_mode_compares_bytes():
+    packets = [("p", 1, {"ID": "p", "x": 1})] * 3 + [("p", 1, {"ID": "p", "x": 2})] + [("p", 1, {"ID": "p", "x": 2})]
+    store, model = make_model(packets)
+    model.set_collapse(COLLAPSE_CONTENT)
+    assert [model.run_length(i) for i in range(model.rowCount())] == [3, 2]
+    store.close()
+
+
+def test_content_mode_only_reads_frames_when_the_key_matches():
+    store, model = make_model([(f"id{n % 50}", 1, {"ID": f"id{n % 50}"}) for n in range(500)])
+    store.frame_reads = 0
+    model.set_collapse(COLLAPSE_CONTENT)
+    assert model.rowCount() == 500
+    assert store.frame_reads == 0
+    store.close()
+
+
+def test_append_continues_the_last_run():
+    store, model = make_model([("p", 1, {"ID": "p"})] * 2)
+    model.set_collapse(COLLAPSE_CONTENT)
+    row = store.append("client", encode_frame({"ID": "p"}), "p", session=1)
+    model.append_rows([row])
+    assert model.rowCount() == 1 and model.run_length(0) == 3
+    row = store.append("client", encode_frame({"ID": "p", "x": 1}), "p", session=1)
+    model.append_rows([row])
+    assert model.rowCount() == 2
+    assert model.model_row(row) == 1
+    store.close()
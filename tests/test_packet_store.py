@@ -0,0 +1,86 @@
+from bson import BSON
+from NetGarden.CORE.PacketStore import PacketStore
+
+
+def encode_frame(doc):
+    body = BSON.encode(doc)
+    return (len(body) + 4).to_bytes(4, "little") + body
+
+
+def test_seq_index_with_gaps_and_late_seqs():
+    store = PacketStore()
+    for seq in (100, 101, 105, 103, 98):
+        store.append("client", encode_frame({"ID": "p", "seq": seq}), "p", seq=seq)
+    assert [store.row_of_seq(seq) for seq in (100, 101, 103, 105)] == [0, 1, 3, 2]
+    # buraco (frame descartado pela fila) e seq que nunca passou por aqui
+    assert store.row_of_seq(102) == -1
+    assert store.row_of_seq(200) == -1
+    # mais velho que o primeiro seq visto: cai na busca linear
+    assert store.row_of_seq(98) == 4
+    assert store.row_of_seq(97) == -1
+    store.close()
+
+
+def test_seq_index_survives_spill():
+    frames = [encode_frame({"ID": "p", "n": n, "pad": "x" * 200}) for n in range(200)]
+    store = PacketStore(chunk_size=4096, max_packets=20)
+    for n, frame in enumerate(frames):
+        store.append("client" if n % 2 else "server", frame, "p", seq=1000 + n)
+    assert store.spilled > 0
+    pinned = 3
+    store.pin(pinned)
+    for n in (0, pinned, 57, 199):
+        row = store.row_of_seq(1000 + n)
+        assert row == n
+        assert bytes(store.frame(row)) == frames[n]
+        packet = store.packet(row)
+        assert packet.seq == 1000 + n and packet.parsed["n"] == n
+    assert store.is_resident(pinned)
+    assert not store.is_resident(0)
+    store.close()
+
+
+def test_generated_seqs_are_increasing():
+    store = PacketStore()
+    rows = [store.append("client", encode_frame({"ID": "p"}), "p") for _ in range(5)]
+    seqs = [store.seq_of(row) for row in rows]
+    assert seqs == sorted(seqs) and len(set(seqs)) == 5
+    assert [store.row_of_seq(seq) for seq in seqs] == rows
+    store.close()
+
+
+def resident_frames(store):
+    return sum(1 for row in range(len(store)) if store.offsets[row] >= 0)
+
+
+def test_byte_budget_below_the_default_chunk_is_honoured():
+    frame = encode_frame({"ID": "p", "pad": "x" * 1000})
+    store = PacketStore(max_bytes=1024 * 1024)
+    for _ in range(5000):
+        store.append("client", frame, "p")
+    # chunks de 1/4 do limite: no pior caso passa 25%
+    assert store.resident_bytes() <= 1024 * 1024 * 5 // 4
+    assert store.spilled > 0
+    assert bytes(store.frame(0)) == frame
+    store.close()
+
+
+def test_packet_budget_below_a_chunk_is_honoured():
+    store = PacketStore(max_packets=100)
+    for n in range(1000):
+        store.append("client", encode_frame({"ID": "p", "n": n}), "p")
+    assert resident_frames(store) <= 125
+    assert store.packet(10).parsed["n"] == 10
+    store.close()
+
+
+def test_lowering_retention_seals_the_current_chunk():
+    store = PacketStore()
+    for n in range(500):
+        store.append("client", encode_frame({"ID": "p", "n": n}), "p")
+    store.set_retention(max_packets=40)
+    for n in range(500, 600):
+        store.append("client", encode_frame({"ID": "p", "n": n}), "p")
+    assert resident_frames(store) <= 50
+    assert store.packet(0).parsed["n"] == 0
+    store.close()
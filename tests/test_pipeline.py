@@ -0,0 +1,168 @@
+import time
+import threading
+import pytest
+from bson import BSON
+from NetGarden.CORE.Packet import decode_frame
+from NetGarden.CORE.Pipeline import InspectionPipeline, POLICY_DROP, POLICY_SAMPLE, POLICY_BLOCK
+
+
+def encode_frame(doc):
+    body = BSON.encode(doc)
+    return (len(body) + 4).to_bytes(4, "little") + body
+
+
+def test_join_waits_for_queued_packets():
+    seen = []
+
+    def slow(packet):
+        time.sleep(0.005)
+        seen.append(packet.seq)
+
+    pipeline = InspectionPipeline(on_packet=slow)
+    pipeline.start()
+    for i in range(50):
+        pipeline.submit("client", encode_frame({"ID": "p", "n": i}), "0")
+    pipeline.close()
+    assert pipeline.join(5)
+    assert len(seen) == 50 and seen == sorted(seen)
+    assert pipeline.delivered == 50
+
+
+def test_join_times_out_while_still_delivering():
+    pipeline = InspectionPipeline(on_packet=lambda packet: time.sleep(0.05))
+    pipeline.start()
+    for i in range(20):
+        pipeline.submit("client", encode_frame({"ID": "p"}), "0")
+    pipeline.close()
+    assert not pipeline.join(0.05)
+    assert pipeline.join(5)
+
+
+class Gate:
+    # segura o consumidor no primeiro pacote ate release()
+    def __init__(self):
+        self.entered = threading.Event()
+        self.opened = threading.Event()
+        self.seen = []
+        self.seqs = []
+
+    def __call__(self, packet):
+        self.entered.set()
+        self.opened.wait(5)
+        self.seen.append(decode_frame(packet.raw)["n"])
+        self.seqs.append(packet.seq)
+
+    def release(self):
+        self.opened.set()
+
+
+def held_pipeline(policy, maxsize, sample_every=10):
+    gate = Gate()
+    pipeline = InspectionPipeline(on_packet=gate, maxsize=maxsize, policy=policy, sample_every=sample_every)
+    pipeline.start()
+    pipeline.submit("client", encode_frame({"ID": "p", "n": 0}), "0")
+    assert gate.entered.wait(5)
+    return pipeline, gate
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        InspectionPipeline(on_packet=print, policy="bogus")
+
+
+def test_drop_policy_rejects_new_frames_when_full():
+    pipeline, gate = held_pipeline(POLICY_DROP, 5)
+    accepted = [pipeline.submit("client", encode_frame({"ID": "p", "n": n}), "0") for n in range(1, 11)]
+    assert accepted == [True] * 5 + [False] * 5
+    assert pipeline.depth() == 5 and pipeline.dropped == 5
+    gate.release()
+    pipeline.close()
+    assert pipeline.join(5)
+    assert gate.seen == [0, 1, 2, 3, 4, 5]
+    assert pipeline.submitted == 11 and pipeline.delivered == 6
+
+
+def test_sample_policy_keeps_every_nth_overflow_frame():
+    pipeline, gate = held_pipeline(POLICY_SAMPLE, 5, sample_every=2)
+    for n in range(1, 11):
+        pipeline.submit("client", encode_frame({"ID": "p", "n": n}), "0")
+    # 6..10 transbordam: 7 e 9 entram no lugar dos mais velhos
+    assert pipeline.dropped == 5
+    gate.release()
+    pipeline.close()
+    assert pipeline.join(5)
+    assert gate.seen == [0, 3, 4, 5, 7, 9]
+
+
+def test_block_policy_waits_for_room():
+    pipeline, gate = held_pipeline(POLICY_BLOCK, 2)
+    producer = threading.Thread(target=lambda: [
+        pipeline.submit("client", encode_frame({"ID": "p", "n": n}), "0") for n in range(1, 8)
+    ])
+    producer.start()
+    time.sleep(0.1)
+    assert producer.is_alive() and pipeline.depth() == 2
+    gate.release()
+    producer.join(5)
+    pipeline.close()
+    assert pipeline.join(5)
+    assert gate.seen == list(range(8)) and pipeline.dropped == 0
+
+
+def test_seqs_follow_submit_order_with_gaps_for_drops():
+    pipeline, gate = held_pipeline(POLICY_DROP, 2)
+    for n in range(1, 5):
+        pipeline.submit("client", encode_frame({"ID": "p", "n": n}), "0")
+    gate.release()
+    while pipeline.depth():
+        time.sleep(0.01)
+    pipeline.submit("client", encode_frame({"ID": "p", "n": 5}), "0")
+    pipeline.close()
+    assert pipeline.join(5)
+    first = gate.seqs[0]
+    # 3 e 4 foram descartados: o seq deles vira buraco
+    assert gate.seen == [0, 1, 2, 5]
+    assert gate.seqs == [first, first + 1, first + 2, first + 5]
+
+
+def pooled_pipeline(on_packet, logs):
+    # threshold baixo: frames com "pad" vao pro pool, os outros ficam inline
+    pipeline = InspectionPipeline(on_packet=on_packet, on_log=logs.append, decode_workers=2, decode_threshold=200)
+    pipeline.start()
+    return pipeline
+
+
+def submit_mixed(pipeline, numbers):
+    for n in numbers:
+        doc = {"ID": "p", "n": n, "pad": "a" * 400} if n % 3 == 0 else {"ID": "p", "n": n}
+        pipeline.submit("client", encode_frame(doc), "0")
+
+
+def test_pooled_decode_delivers_in_seq_order():
+    got = []
+    logs = []
+    pipeline = pooled_pipeline(lambda packet: got.append((packet.seq, packet.parsed["n"])), logs)
+    submit_mixed(pipeline, range(60))
+    pipeline.close()
+    assert pipeline.join(30)
+    assert [n for _, n in got] == list(range(60))
+    assert [seq for seq, _ in got] == sorted(seq for seq, _ in got)
+    assert pipeline.pooled == 20
+    assert not logs
+
+
+def test_broken_pool_falls_back_inline_in_order():
+    got = []
+    logs = []
+    pipeline = pooled_pipeline(lambda packet: got.append(packet.parsed["n"]), logs)
+    submit_mixed(pipeline, range(6))
+    deadline = time.monotonic() + 30
+    while len(got) < 6 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pipeline._pool.shutdown()
+    submit_mixed(pipeline, range(6, 12))
+    pipeline.close()
+    assert pipeline.join(10)
+    assert got == list(range(12))
+    assert any("Decode pool unavailable" in line for line in logs)
+    assert pipeline._pool is None
@@ -0,0 +1,75 @@
+import pytest
+from NetGarden.CORE.Query import QueryError, parse_query, matches, match_fields
+
+ALIASES = {"POSITION_X_KEY": "x", "MY_POSITION_KEY": "mP"}
+
+
+def parse(text):
+    return parse_query(text, aliases=ALIASES)
+
+
+def test_spaces_are_and_or_splits_groups():
+    query = parse('WCM msg~"hello" or SB')
+    assert len(query.groups) == 2
+    first, second = query.groups
+    assert [(t.path, t.op, t.value) for t in first] == [(None, "~", "WCM"), (("msg",), "~", "hello")]
+    assert [(t.path, t.value) for t in second] == [(None, "SB")]
+    assert query.has_fields
+
+
+def test_empty_groups_are_dropped():
+    assert not parse("")
+    assert len(parse("or p or").groups) == 1
+
+
+def test_values():
+    (a, b, c, d), = parse("x=10..20 y>=1.5 ok=true name=null").groups
+    assert a.value == (10.0, 20.0)
+    assert b.op == ">=" and b.value == 1.5
+    assert c.value is True
+    assert d.value is None
+
+
+def test_negation_and_paths():
+    (term,), = parse("-W.size.x>100").groups
+    assert term.negate
+    assert term.path == ("W", "size", "x")
+
+
+def test_aliases():
+    (key, packet_id), = parse("POSITION_X_KEY=3 ID=MY_POSITION_KEY").groups
+    assert key.path == ("x",)
+    assert packet_id.path == ("ID",) and packet_id.is_id
+    assert packet_id.value == "mP"
+
+
+@pytest.mark.parametrize("text", ["x>1..2", "=5", "x=", "x=>", 'a"'])
+def test_errors(text):
+    with pytest.raises(QueryError):
+        parse(text)
+
+
+def test_matches_ids_and_fields():
+    doc = {"ID": "WCM", "msg": "Hello World", "x": 15, "W": {"size": {"x": 200}}}
+    assert matches(parse('WCM msg~"hello"'), "WCM", doc)
+    assert matches(parse("x=10..20"), "WCM", doc)
+    assert matches(parse("W.size.x>100"), "WCM", doc)
+    assert not matches(parse("-W.size.x>100"), "WCM", doc)
+    assert not matches(parse("SB x=15"), "WCM", doc)
+    assert matches(parse("SB or x=15"), "WCM", doc)
+
+
+def test_matches_label():
+    query = parse("position")
+    assert not matches(query, "mP", {})
+    assert matches(query, "mP", {}, label=lambda packet_id: "MY_POSITION")
+
+
+def test_match_fields_lists_and_types():
+    doc = {"blocks": [{"t": 1}, {"t": 7}], "on": False, "n": 10.0}
+    assert match_fields(parse("blocks.t=7").groups[0], doc)
+    assert match_fields(parse("on=false").groups[0], doc)
+    assert match_fields(parse('n="10"').groups[0], doc)
+    assert not match_fields(parse("missing=1").groups[0], doc)
+    assert match_fields(parse("-missing=1").groups[0], doc)
+    assert not match_fields(parse("x=1").groups[0], None)
@@ -0,0 +1,103 @@
+from NetGarden.CORE.SpamFilter import SpamFilter
+
+
+def offer_burst(spam_filter, packet_id, count, start, interval, first_row=0):
+    return [spam_filter.offer(packet_id, start + i * interval, first_row + i) for i in range(count)]
+
+
+def test_off_by_default():
+    spam_filter = SpamFilter(threshold_per_sec=5)
+    assert all(offer_burst(spam_filter, "p", 50, 0.0, 0.001))
+    assert not spam_filter.hidden_ids
+
+
+def test_burst_over_threshold_hides_the_id():
+    spam_filter = SpamFilter(threshold_per_sec=5, auto=True)
+    delivered = offer_burst(spam_filter, "p", 8, 0.0, 0.01)
+    # o balde comeca cheio: 5 passam, o sexto vira spam e o resto fica guardado
+    assert delivered == [True] * 5 + [False] * 3
+    assert spam_filter.is_hidden("p")
+    assert spam_filter.take_new() == ["p"]
+    assert spam_filter.take_new() == []
+    assert list(spam_filter.suppressed["p"]) == [5, 6, 7]
+    assert spam_filter.suppressed_count() == 3
+
+
+def test_steady_rate_under_threshold_passes():
+    spam_filter = SpamFilter(threshold_per_sec=10, auto=True)
+    # 8/s por 5 segundos: o balde repoe mais rapido do que gasta
+    assert all(offer_burst(spam_filter, "p", 40, 0.0, 0.125))
+    assert not spam_filter.hidden_ids
+
+
+def test_burst_across_a_second_boundary_is_caught():
+    spam_filter = SpamFilter(threshold_per_sec=10, auto=True)
+    # 8 no fim de um segundo e 8 no comeco do proximo: janela fixa deixaria passar
+    delivered = offer_burst(spam_filter, "p", 8, 0.92, 0.01) + offer_burst(spam_filter, "p", 8, 1.0, 0.01, 8)
+    assert not all(delivered)
+    assert spam_filter.is_hidden("p")
+
+
+def test_ids_are_counted_apart():
+    spam_filter = SpamFilter(threshold_per_sec=3, auto=True)
+    for i in range(3):
+        assert spam_filter.offer("a", i * 0.01, 2 * i)
+        assert spam_filter.offer("b", i * 0.01, 2 * i + 1)
+    assert not spam_filter.offer("a", 0.05, 6)
+    assert spam_filter.hidden_ids == {"a"}
+
+
+def test_manual_hide_suppresses_without_auto():
+    spam_filter = SpamFilter()
+    spam_filter.hide("p")
+    assert not spam_filter.offer("p", 0.0, 0)
+    assert spam_filter.offer("q", 0.0, 1)
+    assert spam_filter.take_new() == []
+
+
+def test_hidden_rows_are_capped_per_id():
+    spam_filter = SpamFilter(max_rows_per_id=10)
+    spam_filter.hide("p")
+    for row in range(100):
+        spam_filter.offer("p", 0.0, row)
+    rows = spam_filter.suppressed["p"]
+    # corta com folga de 25%, guardando sempre as mais recentes
+    assert 10 <= len(rows) <= 12
+    assert list(rows) == list(range(100 - len(rows), 100))
+    assert spam_filter.counts["p"] == 100
+    assert spam_filter.discarded == 100 - len(rows)
+
+
+def test_lowering_the_cap_trims_what_is_kept():
+    spam_filter = SpamFilter()
+    spam_filter.hide("p")
+    for row in range(50):
+        spam_filter.offer("p", 0.0, row)
+    spam_filter.set_cap(5)
+    assert list(spam_filter.suppressed["p"]) == [45, 46, 47, 48, 49]
+    assert spam_filter.discarded == 45
+
+
+def test_restore_returns_rows_in_order_and_resets():
+    spam_filter = SpamFilter(threshold_per_sec=2, auto=True)
+    spam_filter.hide("a")
+    for row in range(12):
+        spam_filter.offer("a" if row % 3 else "b", row * 0.001, row)
+    # linha do GUI mais velha que as suprimidas no core entra no lugar certo
+    assert list(spam_filter.suppressed["b"]) == [6, 9]
+    spam_filter.suppress("b", 3)
+    assert list(spam_filter.suppressed["b"]) == [3, 6, 9]
+    assert list(spam_filter.restore()) == list(range(1, 12))
+    assert not spam_filter.hidden_ids and not spam_filter.suppressed
+    assert spam_filter.suppressed_count() == 0 and spam_filter.discarded == 0
+    # depois do restore o balde recomeca cheio
+    assert spam_filter.offer("b", 10.0, 12)
+
+
+def test_clear_rows_keeps_hidden_ids():
+    spam_filter = SpamFilter()
+    spam_filter.hide("p")
+    spam_filter.offer("p", 0.0, 0)
+    spam_filter.clear_rows()
+    assert spam_filter.is_hidden("p")
+    assert not spam_filter.suppressed and spam_filter.suppressed_count() == 0